@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.base_params import PaginationQueryParam
 from app.core.dependencies import AuthPermission
 from app.core.logger import log
@@ -125,6 +125,7 @@ async def delete_obj_controller(
 @JobRouter.post('/export', summary="导出定时任务", description="导出定时任务")
 async def export_obj_list_controller(
     search: JobQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_application:job:export"]))
 ) -> StreamingResponse:
     """
@@ -132,20 +133,20 @@ async def export_obj_list_controller(
     
     参数:
     - search (JobQueryParam): 查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含导出定时任务结果的流式响应
     """
-    result_dict_list = await JobService.get_job_list_service(search=search, auth=auth)
-    export_result = await JobService.export_job_service(data_list=result_dict_list)
+    export_result = await JobService.export_job_service(auth=auth, search=search, export_format=export_format)
     log.info('导出定时任务成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=job.xlsx'
+            'Content-Disposition': f'attachment; filename=job.{export_format}'
         }
     )
 
@@ -302,6 +303,7 @@ async def clear_job_log_controller(
 @JobRouter.post('/log/export', summary="导出定时任务日志", description="导出定时任务日志")
 async def export_job_log_list_controller(
     search: JobLogQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_application:job:export"]))
 ) -> StreamingResponse:
     """
@@ -309,19 +311,19 @@ async def export_job_log_list_controller(
     
     参数:
     - search (JobLogQueryParam): 查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含导出定时任务日志结果的流式响应
     """
-    result_dict_list = await JobLogService.get_job_log_list_service(search=search, auth=auth)
-    export_result = await JobLogService.export_job_log_service(data_list=result_dict_list)
+    export_result = await JobLogService.export_job_log_service(auth=auth, search=search, export_format=export_format)
     log.info('导出定时任务日志成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers={
-            'Content-Disposition': 'attachment; filename=job_log.xlsx'
+            'Content-Disposition': f'attachment; filename=job_log.{export_format}'
         }
     )
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
 from app.core.exceptions import CustomException
 from app.core.base_params import PaginationQueryParam
 from app.utils.cron_util import CronUtil
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.api.v1.module_system.auth.schema import AuthSchema
 from .tools.ap_scheduler import SchedulerUtil
 from .crud import JobCRUD, JobLogCRUD
@@ -182,15 +183,18 @@ class JobService:
                 await JobCRUD(auth).set_obj_field_crud(ids=[id], status=True)
 
     @classmethod
-    async def export_job_service(cls, data_list: list[dict]) -> bytes:
+    async def export_job_service(cls, auth: AuthSchema, search: JobQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出定时任务列表
         
         参数:
-        - data_list (list[dict]): 定时任务列表
+        - auth (AuthSchema): 认证信息模型
+        - search (JobQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -213,12 +217,12 @@ class JobService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             item['status'] = '已完成' if item['status'] == '0' else '运行中' if item['status'] == '1' else '暂停'
-    
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+            return item
+
+        rows = JobCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=JobOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
 
 
 class JobLogService:
@@ -305,15 +309,18 @@ class JobLogService:
             await JobLogCRUD(auth).delete_obj_log_crud(ids=ids)
 
     @classmethod
-    async def export_job_log_service(cls, data_list: list[dict]) -> bytes:
+    async def export_job_log_service(cls, auth: AuthSchema, search: JobLogQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出定时任务日志列表
         
         参数:
-        - data_list (List[Dict[str, Any]]): 定时任务日志列表
+        - auth (AuthSchema): 认证信息模型
+        - search (JobLogQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -331,10 +338,10 @@ class JobLogService:
             'updated_time': '更新时间',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             item['status'] = '成功' if item.get('status') == '0' else '失败'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        rows = JobLogCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=JobLogOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
     
\ No newline at end of file
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Depends, Request, Path
+from fastapi import APIRouter, Depends, Request, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 from redis.asyncio.client import Redis
 import urllib.parse
@@ -10,7 +10,7 @@ from app.core.router_class import OperationLogRoute
 from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_params import PaginationQueryParam
 from app.core.logger import log
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.api.v1.module_generator.gencode.service import GenTableService, GenTableColumnService
 from app.api.v1.module_generator.gencode.schema import GenTableQueryParam
@@ -99,6 +99,7 @@ async def get_meta_table_data_controller(
 async def export_meta_table_data_controller(
     request: Request,
     table_id: int = Path(..., description="表ID"),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_dataset:dataset:export"])),
     redis: Redis = Depends(redis_getter)
 ) -> StreamingResponse:
@@ -108,26 +109,21 @@ async def export_meta_table_data_controller(
     参数:
     - request (Request): 请求对象
     - table_id (int): 表ID
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
-    - StreamingResponse: 包含导出数据的Excel文件流响应
+    - StreamingResponse: 包含导出数据的文件流响应
     """
     args = dict(request.query_params)
+    args.pop('export_format', None)
 
     gen_table = await GenTableService.get_gen_table_by_id_service(auth, table_id)
     gen_columns = await GenTableColumnService.get_gen_table_column_list_by_table_id_service(auth, table_id)
 
-    # 获取相关字典
-    dict_map = {}
-    dict_types = {col.get('dict_type') for col in gen_columns if col.get('dict_type')}
-    
-    # 批量获取字典数据
-    for dict_type in dict_types:
-        if not dict_type:
-            continue
-        dict_data = await DictDataService.get_init_dict_service(redis=redis, dict_type=dict_type)
-        dict_map[dict_type] = dict_data
+    # 一次批量获取相关字典的标签查找表
+    dict_types = [col.get('dict_type') for col in gen_columns if col.get('dict_type')]
+    dict_map = await DictDataService.get_dict_label_service(redis=redis, dict_types=dict_types)
 
     # 导出数据
     export_result = await DatasetService.export_dataset_list_service(
@@ -135,14 +131,15 @@ async def export_meta_table_data_controller(
         args=args, 
         table_name=gen_table.table_name, 
         columns=gen_columns, 
-        dict_map=dict_map
+        dict_map=dict_map,
+        export_format=export_format
     )
 
     # 返回导出结果
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers={
-            'Content-Disposition': f'attachment; filename={urllib.parse.quote(gen_table.table_name)}.xlsx'
+            'Content-Disposition': f'attachment; filename={urllib.parse.quote(gen_table.table_name)}.{export_format}'
         }
     )
\ No newline at end of file
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
 from sqlalchemy import text
 from app.core.exceptions import CustomException
 from app.core.base_params import PaginationQueryParam
+from app.core.database import async_db_session
 from app.utils.raw_sql_util import build_dataset_query
 from app.core.logger import log
 
@@ -25,27 +27,24 @@ class DatasetCRUD:
             log.info(f'查询元数据表 SQL: {sql}')
             log.info(f'查询元数据表参数: {params}')
             
-            # 构建 count SQL
-            # 简单的替换 SELECT * 为 SELECT COUNT(*)
-            # 或者重新调用 build_query 但只获取 count
-            # 这里简单处理：
-            count_sql = f"SELECT COUNT(*) FROM ({sql}) AS count_table"
-            count_res = await self.auth.db.execute(text(count_sql), params)
-            total = count_res.scalar()
-            
             # 添加分页
             offset = (page.page_no - 1) * page.page_size
             limit = page.page_size
             has_next = False
 
-            # page_size = -1 表示不分页，获取所有数据
+            # page_size = -1 表示不分页，获取所有数据，总数即结果行数，无需单独统计
             if page.page_size > 0:
+                count_sql = f"SELECT COUNT(*) FROM ({sql}) AS count_table"
+                count_res = await self.auth.db.execute(text(count_sql), params)
+                total = count_res.scalar()
                 sql += f" LIMIT {limit} OFFSET {offset}"
                 has_next = offset + limit < total
 
             # 执行查询
             result = await self.auth.db.execute(text(sql), params)
             rows = [dict(row) for row in result.mappings().all()]
+            if page.page_size <= 0:
+                total = len(rows)
             
             return {
                 "page_no": page.page_no,
@@ -57,3 +56,32 @@ class DatasetCRUD:
                 
         except Exception as e:
             raise CustomException(msg=f"查询数据失败: {str(e)}")
+
+    async def stream_dataset_data_crud(self, args: dict, table_name: str, columns: list, chunk_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """
+        按块流式读取元数据表数据(服务端游标)，不统计总数、不一次性加载结果集
+
+        使用独立数据库会话：StreamingResponse 在请求依赖(及其会话)释放后才消费数据。
+
+        参数:
+        - args (dict): 查询参数
+        - table_name (str): 表名
+        - columns (list): 字段定义列表
+        - chunk_size (int): 每块行数
+
+        返回:
+        - AsyncIterator[list[dict]]: 数据块迭代器
+        """
+        try:
+            sql, params = build_dataset_query(args, columns, table_name)
+        except Exception as e:
+            raise CustomException(msg=f"查询数据失败: {str(e)}")
+        log.info(f'流式查询元数据表 SQL: {sql}')
+
+        async with async_db_session() as session:
+            try:
+                result = await session.stream(text(sql), params, execution_options={"yield_per": chunk_size})
+            except Exception as e:
+                raise CustomException(msg=f"查询数据失败: {str(e)}")
+            async for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
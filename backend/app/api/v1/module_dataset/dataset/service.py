@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
 from app.core.logger import log
 from app.core.base_params import PaginationQueryParam
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ExportFormat
+from app.core.dict_cache import DictLabelCache
 from app.api.v1.module_system.auth.schema import AuthSchema
 from .crud import DatasetCRUD
 
@@ -23,53 +25,27 @@ class DatasetService:
         return data_result
 
     @classmethod
-    async def export_dataset_list_service(cls, auth: AuthSchema, args: dict, table_name: str, columns: list, dict_map: dict = None):
+    async def export_dataset_list_service(cls, auth: AuthSchema, args: dict, table_name: str, columns: list, dict_map: dict = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
-        导出元数据表数据服务
+        导出元数据表数据服务，按块读取并流式写出，内存占用与表大小无关
         :param auth: 认证信息
         :param args: 查询参数
         :param table_name: 表名
         :param columns: 字段定义列表
-        :param dict_map: 字典映射
-        :return: excel 二进制数据
+        :param dict_map: 字典标签查找表 {dict_type: {dict_value: dict_label}}
+        :param export_format: 导出格式(xlsx/csv/ndjson)
+        :return: 导出文件字节流
         """
-        # 查询数据
-        page = PaginationQueryParam(page_no=1, page_size=-1)
-        data_result = await DatasetCRUD(auth).get_dataset_data_crud(page, args, table_name, columns)
-        rows = data_result.get('items', []) if isinstance(data_result, dict) else data_result
-
-        # 构建 mapping_dict: {python_field: columnComment}
-        mapping_dict = {col.get('python_field'): (col.get('column_comment') or col.get('column_name')) for col in columns}
-
-        log.info(f'导出数据条数: {len(rows)}')
-        if rows:
-            log.info(f'导出示例: {rows[0]}')
+        # 查询结果以数据库列名为键，构建 mapping_dict: {column_name: columnComment}
+        mapping_dict = {col.get('column_name'): (col.get('column_comment') or col.get('column_name')) for col in columns}
         log.info(f'导出字段映射: {mapping_dict}')
 
-        # 转换为字典列表以便修改
-        rows = [dict(row) for row in rows]
-
-        # 处理字典字段
-        if dict_map:
-            for row in rows:
-                for col in columns:
-                    dict_type = col.get('dict_type')
-                    python_field = col.get('python_field')
-                    
-                    if dict_type and dict_type in dict_map and python_field in row:
-                        # dict_map[dict_type] is a list of objects
-                        dict_options = {str(item.dict_value): item.dict_label for item in dict_map[dict_type]}
-                        val = str(row[python_field])
-                        if val in dict_options:
-                            row[python_field] = dict_options[val]
-
-        # 导出 excel 二进制
-        binary_data = ExcelUtil.export_list2excel(rows, mapping_dict)
-        return binary_data
-
-    
-    
-    
-    
+        # 字典字段对应的查找表
+        label_columns = {
+            col.get('column_name'): dict_map[col.get('dict_type')]
+            for col in columns if dict_map and col.get('dict_type') in dict_map
+        }
 
-    
\ No newline at end of file
+        rows = DatasetCRUD(auth).stream_dataset_data_crud(args, table_name, columns)
+        rows = DictLabelCache.translate_chunks(rows, label_columns)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format)
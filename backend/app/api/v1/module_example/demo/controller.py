@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path, UploadFile
+from fastapi import APIRouter, Body, Depends, Path, UploadFile, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 import urllib.parse
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.router_class import OperationLogRoute
 from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.base_params import PaginationQueryParam
 from app.core.dependencies import AuthPermission
 from app.core.base_schema import BatchSetAvailable
@@ -148,6 +149,7 @@ async def batch_set_available_obj_controller(
 @DemoRouter.post('/export', summary="导出示例", description="导出示例")
 async def export_obj_list_controller(
     search: DemoQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_example:demo:export"]))
 ) -> StreamingResponse:
     """
@@ -155,20 +157,20 @@ async def export_obj_list_controller(
     
     参数:
     - search (DemoQueryParam): 查询参数
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含示例列表的Excel文件流响应
     """
-    result_dict_list = await DemoService.list_service(search=search, auth=auth)
-    export_result = await DemoService.batch_export_service(obj_list=result_dict_list)
+    export_result = await DemoService.batch_export_service(auth=auth, search=search, export_format=export_format)
     log.info('导出示例成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers={
-            'Content-Disposition': 'attachment; filename=example.xlsx'
+            'Content-Disposition': f'attachment; filename=example.{export_format}'
         }
     )
 
@@ -1,13 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import io
-from typing import Any
+from typing import AsyncIterator
 from fastapi import UploadFile
 import pandas as pd
 
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.base_params import PaginationQueryParam
 from app.core.logger import log
 
@@ -157,15 +157,18 @@ class DemoService:
         await DemoCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
     
     @classmethod
-    async def batch_export_service(cls, obj_list: list[dict[str, Any]]) -> bytes:
+    async def batch_export_service(cls, auth: AuthSchema, search: DemoQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         批量导出
         
         参数:
-        - obj_list (list[dict[str, Any]]): 示例模型实例字典列表
+        - auth (AuthSchema): 认证信息模型
+        - search (DemoQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -177,9 +180,7 @@ class DemoService:
             'created_id': '创建者',
         }
 
-        # 复制数据并转换状态
-        data = obj_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             # 处理状态
             item['status'] = '启用' if item.get('status') == '0' else '停用'
             # 处理创建者
@@ -188,8 +189,10 @@ class DemoService:
                 item['created_id'] = creator_info.get('name', '未知')
             else:
                 item['created_id'] = '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        rows = DemoCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=DemoOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
 
     @classmethod
     async def batch_import_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False) -> str:
@@ -580,6 +580,30 @@ class GenTableColumnCRUD(CRUDBase[GenTableColumnModel, GenTableColumnSchema, Gen
         """
         return await self.create(data=data)
 
+    async def create_gen_table_column_batch_crud(self, data: list[GenTableColumnSchema]) -> list[int]:
+        """批量创建业务表字段（多行 INSERT，不逐行回读）。
+
+        参数:
+        - data (list[GenTableColumnSchema]): 业务表字段模型列表。
+
+        返回:
+        - list[int]: 新建业务表字段ID列表。
+        """
+        fields = set(GenTableColumnSchema.model_fields)
+        return await self.bulk_create(rows=[column.model_dump(include=fields) for column in data])
+
+    async def update_gen_table_column_batch_crud(self, data: list[GenTableColumnOutSchema]) -> list[int]:
+        """按ID批量更新业务表字段。
+
+        参数:
+        - data (list[GenTableColumnOutSchema]): 包含ID的业务表字段模型列表。
+
+        返回:
+        - list[int]: 已更新的业务表字段ID列表。
+        """
+        fields = set(GenTableColumnSchema.model_fields)
+        return await self.bulk_update(rows=[{**column.model_dump(exclude_unset=True, include=fields), "id": column.id} for column in data])
+
     async def update_gen_table_column_crud(self, id: int, data: GenTableColumnSchema) -> GenTableColumnModel | None:
         """更新业务表字段。
 
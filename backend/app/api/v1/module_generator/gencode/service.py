@@ -131,6 +131,7 @@ class GenTableService:
                 gen_table_columns = await GenTableColumnCRUD(auth).get_gen_db_table_columns_by_name(table_name)
                 if len(gen_table_columns) > 0:
                     table.id = add_gen_table.id
+                    column_schemas = []
                     for column in gen_table_columns:
                         column_schema = GenTableColumnSchema(
                             table_id=table.id,
@@ -148,7 +149,8 @@ class GenTableService:
                             python_field=column.python_field,
                         )
                         GenUtils.init_column_field(column_schema, table)
-                        await GenTableColumnCRUD(auth).create_gen_table_column_crud(column_schema)
+                        column_schemas.append(column_schema)
+                    await GenTableColumnCRUD(auth).create_gen_table_column_batch_crud(column_schemas)
             return True
         except Exception as e:
             raise CustomException(msg=f'导入失败, {str(e)}')
@@ -426,6 +428,8 @@ class GenTableService:
         db_table_columns = [col for col in db_table_columns if col is not None]
         db_table_column_names = [column.column_name for column in db_table_columns]
         try:
+            create_columns = []
+            update_columns = []
             for column in db_table_columns:
                 # 仅在缺省时初始化默认属性（包含 table_id 关联）
                 GenUtils.init_column_field(column, table)
@@ -462,18 +466,24 @@ class GenTableService:
                         column.python_field = prev_column.python_field or column.python_field
 
                     if hasattr(column, 'id') and column.id:
-                        await GenTableColumnCRUD(auth).update_gen_table_column_crud(column.id, column)
+                        update_columns.append(column)
                     else:
-                        await GenTableColumnCRUD(auth).create_gen_table_column_crud(column)
+                        create_columns.append(column)
                 else:
                     # 设置table_id以确保新字段能正确关联到表
                     column.table_id = table.id
-                    await GenTableColumnCRUD(auth).create_gen_table_column_crud(column)
-            del_columns = [column for column in table_columns if column.column_name not in db_table_column_names]
-            if del_columns:
-                for column in del_columns:
-                    if hasattr(column, 'id') and column.id:
-                        await GenTableColumnCRUD(auth).delete_gen_table_column_by_column_id_crud([column.id])
+                    create_columns.append(column)
+            # 新增、更新、删除各一次批量写入
+            if update_columns:
+                await GenTableColumnCRUD(auth).update_gen_table_column_batch_crud(update_columns)
+            if create_columns:
+                await GenTableColumnCRUD(auth).create_gen_table_column_batch_crud(create_columns)
+            del_column_ids = [
+                column.id for column in table_columns
+                if column.column_name not in db_table_column_names and getattr(column, 'id', None)
+            ]
+            if del_column_ids:
+                await GenTableColumnCRUD(auth).delete_gen_table_column_by_column_id_crud(del_column_ids)
         except Exception as e:
             raise CustomException(msg=f'同步失败: {str(e)}')
 
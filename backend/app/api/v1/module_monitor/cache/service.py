@@ -68,7 +68,8 @@ class CacheService:
         返回:
         - list: 缓存键名列表信息。
         """
-        cache_keys = await RedisCURD(redis).get_keys(f'{cache_name}*')
+        # 已索引的命名空间只读取索引集合，其余按前缀 SCAN
+        cache_keys = await RedisCURD(redis).index_members(cache_name)
         cache_key_list = [key.split(':', 1)[1] for key in cache_keys if key.startswith(f'{cache_name}:')]
 
         return cache_key_list
@@ -102,9 +103,10 @@ class CacheService:
         返回:
         - bool: 是否清理成功。
         """
-        cache_keys = await RedisCURD(redis).get_keys(f'{cache_name}*')
-        if cache_keys:
-            await RedisCURD(redis).delete(*cache_keys)
+        if cache_name in RedisCURD.INDEXED_NAMESPACES:
+            await RedisCURD(redis).clear_namespace(cache_name)
+        else:
+            await RedisCURD(redis).clear(f'{cache_name}*')
 
         return True
 
@@ -120,9 +122,7 @@ class CacheService:
         返回:
         - bool: 是否清理成功。
         """
-        cache_keys = await RedisCURD(redis).get_keys(f'*{cache_key}')
-        if cache_keys:
-            await RedisCURD(redis).delete(*cache_keys)
+        await RedisCURD(redis).clear(f'*{cache_key}')
 
         return True
 
@@ -137,11 +137,6 @@ class CacheService:
         返回:
         - bool: 是否清理成功。
         """
-        cache_keys = await RedisCURD(redis).get_keys()
-        if cache_keys:
-            await RedisCURD(redis).delete(*cache_keys)
+        await RedisCURD(redis).clear()
 
         return True
-
-        # 避免清除所有的缓存，而采用上面的方式，只清除本系统内指定的所有缓存
-        # return await RedisCURD(redis).clear()
@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import json
 from redis.asyncio.client import Redis
 
 from app.common.enums import RedisInitKeyConfig
 from app.core.redis_crud import RedisCURD
-from app.core.security import decode_access_token
+from app.core.session_registry import SessionRegistry
+from app.core.exceptions import CustomException
 from app.core.logger import log
 
 from .schema import OnlineQueryParam
@@ -15,37 +15,32 @@ class OnlineService:
     """在线用户管理模块服务层"""
 
     @classmethod
-    async def get_online_list_service(cls, redis: Redis, search: OnlineQueryParam | None = None) ->  list[dict]:
+    async def get_online_list_service(cls, redis: Redis, search: OnlineQueryParam | None = None, page_no: int = 1, page_size: int = 10) -> dict:
         """
-        获取在线用户列表信息（支持分页和搜索）
+        获取在线用户列表信息（支持分页和搜索，按登录时间倒序）
         
         参数:
         - redis (Redis): Redis异步客户端实例。
         - search (OnlineQueryParam | None): 查询参数模型。
+        - page_no (int): 当前页码。
+        - page_size (int): 每页数量。
         
         返回:
-        - list[dict]: 在线用户详情字典列表。
+        - dict: 分页数据对象。
         """
+        if page_no < 1 or page_size < 1:
+            raise CustomException(msg="分页参数不合法")
+        has_condition = search is not None and any([search.name, search.ipaddr, search.login_location])
+        matcher = (lambda info: cls._match_search_conditions(info, search)) if has_condition else None
+        total, online_users = await SessionRegistry.page(redis, page_no=page_no, page_size=page_size, matcher=matcher)
 
-        keys = await RedisCURD(redis).get_keys(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
-        tokens = await RedisCURD(redis).mget(keys)
-
-        online_users = []
-        for token in tokens:
-            if not token:
-                continue
-            try:
-                payload = decode_access_token(token=token)
-                session_info = json.loads(payload.sub)  
-                if cls._match_search_conditions(session_info, search):
-                    online_users.append(session_info)
-            except Exception as e:
-                log.error(f"解析在线用户数据失败: {e}")
-                continue
-        # 按照 login_time 倒序排序
-        online_users.sort(key=lambda x: x.get('login_time', ''), reverse=True)
-        
-        return online_users
+        return {
+            "items": online_users,
+            "total": total,
+            "page_no": page_no,
+            "page_size": page_size,
+            "has_next": page_no * page_size < total
+        }
 
 
     @classmethod
@@ -60,14 +55,28 @@ class OnlineService:
         返回:
         - bool: 如果操作成功则返回True，否则返回False。
         """
-        # 删除 token
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
-
+        # 删除 token、权限快照与会话登记
+        await SessionRegistry.terminate(redis, session_id)
 
         log.info(f"强制下线用户会话: {session_id}")
         return True
     
+    @classmethod
+    async def delete_user_online_service(cls, redis: Redis, user_ids: list[int]) -> int:
+        """
+        强制下线指定用户的全部会话
+        
+        参数:
+        - redis (Redis): Redis异步客户端实例。
+        - user_ids (list[int]): 用户ID列表。
+        
+        返回:
+        - int: 下线的会话数量。
+        """
+        count = await SessionRegistry.terminate_user(redis, *user_ids)
+        log.info(f"强制下线用户 {user_ids} 的会话: {count} 个")
+        return count
+
     @classmethod
     async def clear_online_service(cls, redis: Redis) -> bool:
         """
@@ -80,8 +89,10 @@ class OnlineService:
         - bool: 如果操作成功则返回True，否则返回False。
         """
         # 删除 token
-        await RedisCURD(redis).clear(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
-        await RedisCURD(redis).clear(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:*")
+        await RedisCURD(redis).clear_namespace(RedisInitKeyConfig.ACCESS_TOKEN.key)
+        await RedisCURD(redis).clear_namespace(RedisInitKeyConfig.REFRESH_TOKEN.key)
+        await RedisCURD(redis).clear(f"{RedisInitKeyConfig.PRINCIPAL.key}:*")
+        await SessionRegistry.clear(redis)
 
         log.info(f"清除所有在线用户会话成功")
         return True
@@ -10,6 +10,7 @@ from fastapi import UploadFile
 from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.utils.excel_util import ExcelUtil
+from app.utils.compress_util import CompressUtil
 from app.config.setting import settings
 
 from .schema import (
@@ -257,6 +258,9 @@ class ResourceService:
                         continue
                         
                     item_path = os.path.join(safe_path, item_name)
+                    # 跳过静态资源的预压缩文件
+                    if CompressUtil.is_sidecar(item_path):
+                        continue
                     file_info = cls._get_file_info(item_path, base_url)
                     
                     if file_info:
@@ -323,6 +327,9 @@ class ResourceService:
                         continue
                     
                     item_path = os.path.join(resource_root, item_name)
+                    # 跳过静态资源的预压缩文件
+                    if CompressUtil.is_sidecar(item_path):
+                        continue
                     file_info = cls._get_file_info(item_path, base_url)
                     
                     if file_info:
@@ -594,6 +601,7 @@ class ResourceService:
                 
                 if os.path.isfile(safe_path):
                     os.remove(safe_path)
+                    CompressUtil.remove_sidecars(safe_path)
                     log.info(f"删除文件成功: {safe_path}")
                 elif os.path.isdir(safe_path):
                     shutil.rmtree(safe_path)
@@ -630,6 +638,7 @@ class ResourceService:
                 
                 if os.path.isfile(safe_path):
                     os.remove(safe_path)
+                    CompressUtil.remove_sidecars(safe_path)
                     success_paths.append(path)
                     log.info(f"删除文件成功: {safe_path}")
                 elif os.path.isdir(safe_path):
@@ -672,6 +681,7 @@ class ResourceService:
                     # 删除目标路径
                     if os.path.isfile(target_path):
                         os.remove(target_path)
+                        CompressUtil.remove_sidecars(target_path)
                     else:
                         shutil.rmtree(target_path)
             
@@ -679,8 +689,11 @@ class ResourceService:
             target_dir = os.path.dirname(target_path)
             os.makedirs(target_dir, exist_ok=True)
             
-            # 移动文件
+            # 移动文件，源文件的预压缩文件随之失效
+            is_file = os.path.isfile(source_path)
             shutil.move(source_path, target_path)
+            if is_file:
+                CompressUtil.remove_sidecars(source_path)
             log.info(f"移动成功: {source_path} -> {target_path}")
             
         except CustomException:
@@ -715,9 +728,10 @@ class ResourceService:
             target_dir = os.path.dirname(target_path)
             os.makedirs(target_dir, exist_ok=True)
             
-            # 复制文件或目录
+            # 复制文件或目录，覆盖的目标文件的预压缩文件随之失效
             if os.path.isfile(source_path):
                 shutil.copy2(source_path, target_path)
+                CompressUtil.remove_sidecars(target_path)
             else:
                 shutil.copytree(source_path, target_path, dirs_exist_ok=data.overwrite)
             
@@ -754,7 +768,10 @@ class ResourceService:
                 raise CustomException(msg='目标名称已存在')
             
             # 重命名
+            is_file = os.path.isfile(old_path)
             os.rename(old_path, new_path)
+            if is_file:
+                CompressUtil.remove_sidecars(old_path)
             log.info(f"重命名成功: {old_path} -> {new_path}")
             
         except CustomException:
@@ -1,19 +1,47 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
-from pydantic import ConfigDict, Field, BaseModel, model_validator
+from typing import Any
+from pydantic import ConfigDict, Field, BaseModel, PrivateAttr, model_validator
+from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..user.model import UserModel
+
+class PrincipalSchema(BaseModel):
+    """当前用户权限快照模型(缓存于Redis,鉴权热路径不再查询数据库)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description='用户ID')
+    username: str = Field(..., description='用户名')
+    name: str = Field(..., description='昵称')
+    status: str = Field(default='0', description='状态')
+    is_superuser: bool = Field(default=False, description='是否超管')
+    dept_id: int | None = Field(default=None, description='部门ID')
+    role_ids: list[int] = Field(default_factory=list, description='可用角色ID列表')
+    position_ids: list[int] = Field(default_factory=list, description='可用岗位ID列表')
+    data_scopes: list[int] = Field(default_factory=list, description='角色数据权限范围集合')
+    dept_ids: list[int] = Field(default_factory=list, description='自定义数据权限部门ID集合')
+    dept_subtree_ids: list[int] = Field(default_factory=list, description='本部门及以下部门ID集合(仅数据权限范围含3时填充)')
+    permissions: list[str] = Field(default_factory=list, description='扁平化权限标识集合')
+    version: int = Field(default=0, description='快照版本号')
 
 
 class AuthSchema(BaseModel):
     """权限认证模型"""
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    user: UserModel | None = Field(default=None, description='用户信息')
+    user: PrincipalSchema | None = Field(default=None, description='用户信息')
     check_data_scope: bool = Field(default=True, description='是否检查数据权限')
     db: AsyncSession = Field(description='数据库会话')
+    redis: Redis | None = Field(default=None, description='Redis客户端(分页总数缓存)')
+
+    # 请求内数据权限条件缓存: {模型类: 过滤表达式}，随认证对象(即请求)释放
+    _permission_cache: dict[Any, Any] = PrivateAttr(default_factory=dict)
+
+    @property
+    def permission_cache(self) -> dict[Any, Any]:
+        """请求内数据权限条件缓存"""
+        return self._permission_cache
 
 
 class JWTPayloadSchema(BaseModel):
@@ -15,6 +15,7 @@ from app.utils.captcha_util import CaptchaUtil
 from app.utils.ip_local_util import IpLocalUtil
 from app.utils.hash_bcrpy_util import PwdUtil
 from app.core.redis_crud import RedisCURD
+from app.core.session_registry import SessionRegistry
 from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.config.setting import settings
@@ -70,15 +71,20 @@ class LoginService:
             await CaptchaService.check_captcha_service(redis=redis, key=login_form.captcha_key, captcha=login_form.captcha)
 
         # 用户认证
-        auth = AuthSchema(db=db)
+        auth = AuthSchema(db=db, redis=redis)
         user = await UserCRUD(auth).get_by_username_crud(username=login_form.username)
 
         if not user:
             raise CustomException(msg="用户不存在")
 
-        if not PwdUtil.verify_password(plain_password=login_form.password, password_hash=user.password):
+        verified, new_password_hash = await PwdUtil.verify_and_update_async(plain_password=login_form.password, password_hash=user.password)
+        if not verified:
             raise CustomException(msg="账号或密码错误")
 
+        # 加密参数变化时透明升级密码哈希
+        if new_password_hash:
+            await UserCRUD(auth).change_password_crud(id=user.id, password_hash=new_password_hash)
+
         if not user.status:
             raise CustomException(msg="用户已被停用")
         
@@ -128,7 +134,8 @@ class LoginService:
             else:
                 request_ip = "127.0.0.1"
 
-        login_location = await IpLocalUtil.get_ip_location(request_ip)
+        # 仅查缓存与本地IP库,远程接口在后台补全,不阻塞登录
+        login_location = await IpLocalUtil.get_ip_location(request_ip, redis=redis)
         request.scope["login_location"] = login_location
         
         # 确保在请求上下文中设置用户名
@@ -180,6 +187,9 @@ class LoginService:
             expire=int(refresh_expires.total_seconds())
         )
 
+        # 登记在线会话
+        await SessionRegistry.register(redis, json.loads(session_info), expire_at=(now + access_expires).timestamp())
+
         return JWTOutSchema(
             access_token=access_token,
             refresh_token=refresh_token,
@@ -217,7 +227,7 @@ class LoginService:
             raise CustomException(msg="非法凭证,无法获取会话编号或用户ID")
 
         # 用户认证
-        auth = AuthSchema(db=db)
+        auth = AuthSchema(db=db, redis=redis)
         user = await UserCRUD(auth).get_by_id_crud(id=user_id)
         if not user:
             raise CustomException(msg="刷新token失败，用户不存在")
@@ -256,6 +266,9 @@ class LoginService:
             value=refresh_token_new,
             expire=int(refresh_expires.total_seconds())
         )
+
+        # 续期在线会话登记
+        await SessionRegistry.register(redis, session_info, expire_at=(now + access_expires).timestamp())
         
         return JWTOutSchema(
             access_token=access_token,
@@ -287,8 +300,7 @@ class LoginService:
             raise CustomException(msg="非法凭证,无法获取会话编号")
 
         # 删除Redis中的在线用户、访问令牌、刷新令牌
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
-        await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
+        await SessionRegistry.terminate(redis, session_id)
         
         log.info(f"用户退出登录成功,会话编号:{session_id}")
 
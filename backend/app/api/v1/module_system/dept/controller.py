@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter, Body, Depends, Path
 from fastapi.responses import JSONResponse
+from redis.asyncio.client import Redis
 
 from app.common.response import SuccessResponse
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
 from app.core.router_class import OperationLogRoute
@@ -71,7 +72,8 @@ async def get_obj_detail_controller(
 @DeptRouter.post("/create", summary="创建部门", description="创建部门")
 async def create_obj_controller(
     data: DeptCreateSchema,
-    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:create"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:create"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     创建部门
@@ -79,6 +81,7 @@ async def create_obj_controller(
     参数:
     - data (DeptCreateSchema): 创建部门负载模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
         
     返回:
     - JSONResponse: 包含创建部门结果的响应模型
@@ -86,7 +89,7 @@ async def create_obj_controller(
     异常:
     - CustomException: 创建部门失败时抛出异常。
     """
-    result_dict = await DeptService.create_dept_service(data=data, auth=auth)
+    result_dict = await DeptService.create_dept_service(data=data, auth=auth, redis=redis)
     log.info(f"创建部门成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="创建部门成功")
 
@@ -95,7 +98,8 @@ async def create_obj_controller(
 async def update_obj_controller(
     data: DeptUpdateSchema,
     id: int = Path(..., description="部门ID"),
-    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:update"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:update"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     修改部门
@@ -104,6 +108,7 @@ async def update_obj_controller(
     - data (DeptUpdateSchema): 修改部门负载模型
     - id (int): 部门ID
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
         
     返回:
     - JSONResponse: 包含修改部门结果的响应模型
@@ -111,7 +116,7 @@ async def update_obj_controller(
     异常:
     - CustomException: 修改部门失败时抛出异常。
     """
-    result_dict = await DeptService.update_dept_service(auth=auth, id=id, data=data)
+    result_dict = await DeptService.update_dept_service(auth=auth, redis=redis, id=id, data=data)
     log.info(f"修改部门成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="修改部门成功")
 
@@ -119,7 +124,8 @@ async def update_obj_controller(
 @DeptRouter.delete("/delete", summary="删除部门", description="删除部门")
 async def delete_obj_controller(
     ids: list[int] = Body(..., description="ID列表"),
-    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:delete"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:delete"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     删除部门
@@ -127,6 +133,7 @@ async def delete_obj_controller(
     参数:
     - ids (list[int]): 部门ID列表
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
         
     返回:
     - JSONResponse: 包含删除部门结果的响应模型
@@ -134,7 +141,7 @@ async def delete_obj_controller(
     异常:
     - CustomException: 删除部门失败时抛出异常。
     """
-    await DeptService.delete_dept_service(ids=ids, auth=auth)
+    await DeptService.delete_dept_service(ids=ids, auth=auth, redis=redis)
     log.info(f"删除部门成功: {ids}")
     return SuccessResponse(msg="删除部门成功")
 
@@ -142,7 +149,8 @@ async def delete_obj_controller(
 @DeptRouter.patch("/available/setting", summary="批量修改部门状态", description="批量修改部门状态")
 async def batch_set_available_obj_controller(
     data: BatchSetAvailable,
-    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:patch"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:dept:patch"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     批量修改部门状态
@@ -150,6 +158,7 @@ async def batch_set_available_obj_controller(
     参数:
     - data (BatchSetAvailable): 批量修改部门状态负载模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
         
     返回:
     - JSONResponse: 包含批量修改部门状态结果的响应模型
@@ -157,6 +166,6 @@ async def batch_set_available_obj_controller(
     异常:
     - CustomException: 批量修改部门状态失败时抛出异常。
     """
-    await DeptService.batch_set_available_service(data=data, auth=auth)
+    await DeptService.batch_set_available_service(data=data, auth=auth, redis=redis)
     log.info(f"批量修改部门状态成功: {data.ids}")
     return SuccessResponse(msg="批量修改部门状态成功")
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from typing import Sequence
+from sqlalchemy import select
 
 from app.core.base_crud import CRUDBase
 
@@ -85,4 +86,14 @@ class DeptCRUD(CRUDBase[DeptModel, DeptCreateSchema, DeptUpdateSchema]):
         - str | None: 部门名称，未找到返回 None。
         """
         obj = await self.get(id=id)
-        return obj.name if obj else None
\ No newline at end of file
+        return obj.name if obj else None
+
+    async def get_parent_map_crud(self) -> dict[int, int | None]:
+        """
+        获取全部部门的 id -> parent_id 映射(仅查询两列，不加载模型及关系)。
+        
+        返回:
+        - dict[int, int | None]: 部门ID到父部门ID的映射。
+        """
+        result = await self.auth.db.execute(select(DeptModel.id, DeptModel.parent_id))
+        return {id: parent_id for id, parent_id in result.all()}
@@ -45,13 +45,14 @@ class DeptModel(ModelMixin):
         foreign_keys=[parent_id],
         lazy="selectin"
     )
+    # 反向关联仅用于维护关系，禁止隐式加载，需要时通过 preload 显式声明
     roles: Mapped[list["RoleModel"]] = relationship(
         secondary="sys_role_depts", 
         back_populates="depts", 
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
     users: Mapped[list["UserModel"]] = relationship(
         back_populates="dept",
         foreign_keys="UserModel.dept_id",
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
@@ -1,14 +1,12 @@
 # -*- coding: utf-8 -*-
 
+from redis.asyncio.client import Redis
+
 from app.core.base_schema import BatchSetAvailable
+from app.core.database import after_commit
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_parent_id_map,
-    get_parent_recursion,
-    get_child_id_map,
-    get_child_recursion,
-    traversal_to_tree
-)
+from app.core.principal import DeptClosure, PrincipalCache
+from app.utils.common_util import build_tree
 
 from ..auth.schema import AuthSchema
 from .crud import DeptCRUD
@@ -62,16 +60,17 @@ class DeptService:
         dept_list = await DeptCRUD(auth).get_tree_list_crud(search=search.__dict__, order_by=order_by)
         # 转换为字典列表
         dept_dict_list = [DeptOutSchema.model_validate(dept).model_dump() for dept in dept_list]
-        # 使用traversal_to_tree构建树形结构
-        return traversal_to_tree(dept_dict_list)
+        # 按ID索引构建树形结构
+        return build_tree(dept_dict_list)
 
     @classmethod
-    async def create_dept_service(cls, auth: AuthSchema, data: DeptCreateSchema) -> dict:
+    async def create_dept_service(cls, auth: AuthSchema, redis: Redis, data: DeptCreateSchema) -> dict:
         """
         创建部门。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - data (DeptCreateSchema): 部门创建对象。
         
         返回:
@@ -90,15 +89,19 @@ class DeptService:
         if data.parent_id:
             await cls._check_circular_reference(auth, data.parent_id, id=None)
         dept = await DeptCRUD(auth).create(data=data)
+        # 刷新部门闭包与用户权限快照
+        after_commit(auth.db, DeptClosure.invalidate, redis)
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
         return DeptOutSchema.model_validate(dept).model_dump()
 
     @classmethod
-    async def update_dept_service(cls, auth: AuthSchema, id:int, data: DeptUpdateSchema) -> dict:
+    async def update_dept_service(cls, auth: AuthSchema, redis: Redis, id:int, data: DeptUpdateSchema) -> dict:
         """
         更新部门。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - id (int): 部门 ID。
         - data (DeptUpdateSchema): 部门更新对象。
         
@@ -118,6 +121,9 @@ class DeptService:
         if data.parent_id is not None:
             await cls._check_circular_reference(auth, data.parent_id, id=id)
         dept = await DeptCRUD(auth).update(id=id, data=data)
+        # 刷新部门闭包与用户权限快照
+        after_commit(auth.db, DeptClosure.invalidate, redis)
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
         return DeptOutSchema.model_validate(dept).model_dump()
 
     @classmethod
@@ -136,30 +142,18 @@ class DeptService:
         if parent_id == id:
             raise CustomException(msg='更新失败，不能将部门设置为自己的子部门')
         
-        # 获取所有部门信息用于检测循环引用
-        all_depts = await DeptCRUD(auth).get_list_crud()
-        parent_map = {dept.id: dept.parent_id for dept in all_depts}
-        
-        # 检查循环引用
-        current_id = parent_id
-        visited = set()
-        
-        while current_id and current_id not in visited:
-            visited.add(current_id)
-            if current_id == id:
-                raise CustomException(msg='更新失败，检测到部门层级循环引用')
-            current_id = parent_map.get(current_id)
-        
-        if current_id == id:
+        # 新父部门的祖先链中包含当前部门即构成循环引用
+        if id is not None and id in await DeptCRUD(auth).hierarchy_ids(ids=[parent_id], direction='ancestors'):
             raise CustomException(msg='更新失败，检测到部门层级循环引用')
 
     @classmethod
-    async def delete_dept_service(cls, auth: AuthSchema, ids: list[int]) -> None:
+    async def delete_dept_service(cls, auth: AuthSchema, redis: Redis, ids: list[int]) -> None:
         """
         删除部门。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - ids (List[int]): 部门 ID 列表。
         
         返回:
@@ -170,43 +164,33 @@ class DeptService:
         """
         if len(ids) < 1:
             raise CustomException(msg='删除失败，删除对象不能为空')
-        for id in ids:
-            dept = await DeptCRUD(auth).get_by_id_crud(id=id)
-            if not dept:
-                raise CustomException(msg='删除失败，该部门不存在')
+        if len(await DeptCRUD(auth).exist_ids(ids=ids)) < len(set(ids)):
+            raise CustomException(msg='删除失败，该部门不存在')
         # 校验是否存在子级部门，存在则禁止删除
-        dept_list = await DeptCRUD(auth).get_list_crud()
-        id_map = get_child_id_map(model_list=dept_list)
-        for id in ids:
-            descendants = get_child_recursion(id=id, id_map=id_map)
-            if len(descendants) > 1:
-                raise CustomException(msg='删除失败，存在子级部门，请先删除子级部门')
+        if await DeptCRUD(auth).has_children(ids=ids):
+            raise CustomException(msg='删除失败，存在子级部门，请先删除子级部门')
         await DeptCRUD(auth).delete(ids=ids)
+        # 刷新部门闭包与用户权限快照
+        after_commit(auth.db, DeptClosure.invalidate, redis)
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
 
     @classmethod
-    async def batch_set_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
+    async def batch_set_available_service(cls, auth: AuthSchema, redis: Redis, data: BatchSetAvailable) -> None:
         """
         批量设置部门可用状态。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - data (BatchSetAvailable): 批量设置可用状态对象。
         
         返回:
         - None
         """
-        dept_list = await DeptCRUD(auth).get_list_crud()
-        total_ids = []
-        
-        if data.status:
-            id_map = get_parent_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                enable_ids = get_parent_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(enable_ids)
-        else:
-            id_map = get_child_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                disable_ids = get_child_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(disable_ids)
+        # 启用时级联启用全部上级部门，禁用时级联禁用全部下级部门
+        direction = 'ancestors' if data.status == '0' else 'descendants'
+        total_ids = await DeptCRUD(auth).hierarchy_ids(ids=data.ids, direction=direction)
 
-        await DeptCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
\ No newline at end of file
+        await DeptCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
\ No newline at end of file
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 from redis.asyncio.client import Redis
 
@@ -10,7 +10,7 @@ from app.core.base_schema import BatchSetAvailable
 from app.core.dependencies import AuthPermission, redis_getter
 from app.core.logger import log
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 
 from ..auth.schema import AuthSchema
 from .service import DictTypeService, DictDataService
@@ -191,6 +191,7 @@ async def batch_set_available_dict_type_controller(
 @DictRouter.post('/type/export', summary="导出字典类型", description="导出字典类型")
 async def export_type_list_controller(
     search: DictTypeQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:dict_type:export"]))
 ) -> StreamingResponse:
     """
@@ -198,6 +199,7 @@ async def export_type_list_controller(
 
     参数:
     - search (DictTypeQueryParam): 查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
         
     返回:
@@ -207,15 +209,14 @@ async def export_type_list_controller(
     - CustomException: 导出字典类型失败时抛出异常。
     """
     # 获取全量数据
-    result_dict_list = await DictTypeService.get_obj_list_service(search=search, auth=auth)
-    export_result = await DictTypeService.export_obj_service(data_list=result_dict_list)
+    export_result = await DictTypeService.export_obj_service(auth=auth, search=search, export_format=export_format)
     log.info('导出字典类型成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=dict_type.xlsx'
+            'Content-Disposition': f'attachment; filename=dict_type.{export_format}'
         }
     )
 
@@ -367,6 +368,7 @@ async def batch_set_available_dict_data_controller(
 @DictRouter.post('/data/export', summary="导出字典数据", description="导出字典数据")
 async def export_data_list_controller(
     search: DictDataQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     page: PaginationQueryParam = Depends(),
     auth: AuthSchema = Depends(AuthPermission(["module_system:dict_data:export"]))
 ) -> StreamingResponse:
@@ -375,6 +377,7 @@ async def export_data_list_controller(
 
     参数:
     - search (DictDataQueryParam): 查询参数模型
+    - export_format (ExportFormat): 导出格式
     - page (PaginationQueryParam): 分页参数模型
     - auth (AuthSchema): 认证信息模型
         
@@ -384,15 +387,14 @@ async def export_data_list_controller(
     异常:
     - CustomException: 导出字典数据失败时抛出异常。
     """
-    result_dict_list = await DictDataService.get_obj_list_service(auth=auth, search=search, order_by=page.order_by)
-    export_result = await DictDataService.export_obj_service(data_list=result_dict_list)
+    export_result = await DictDataService.export_obj_service(auth=auth, search=search, order_by=page.order_by, export_format=export_format)
     log.info('导出字典数据成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=dice_data.xlsx'
+            'Content-Disposition': f'attachment; filename=dice_data.{export_format}'
         }
     )
 
@@ -1,14 +1,17 @@
 # -*- coding: utf-8 -*-
 
 import json
+import asyncio
+from typing import Any, AsyncIterator, Mapping
 from redis.asyncio.client import Redis
 
 from app.common.enums import RedisInitKeyConfig
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.database import async_db_session
 from app.core.base_schema import BatchSetAvailable
 from app.core.base_params import PaginationQueryParam
 from app.core.redis_crud import RedisCURD
+from app.core.dict_cache import DictLabelCache
 from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -106,6 +109,7 @@ class DictTypeService:
                     key=redis_key,
                     value="",
                 )
+            await DictLabelCache.publish(redis)
             log.info(f"创建字典类型成功: {new_obj_dict}")
         except Exception as e:
             log.error(f"创建字典类型失败: {e}")
@@ -172,6 +176,7 @@ class DictTypeService:
                     key=redis_key,
                     value=value,
                 )
+            await DictLabelCache.publish(redis)
             log.info(f"更新字典类型成功并刷新缓存: {new_obj_dict}")
         except Exception as e:
             log.error(f"更新字典类型缓存失败: {e}")
@@ -207,6 +212,7 @@ class DictTypeService:
             redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{exist_obj.dict_type}"
             try:
                 await RedisCURD(redis).delete(redis_key)
+                await DictLabelCache.publish(redis)
                 log.info(f"删除字典类型成功: {id}")
             except Exception as e:
                 log.error(f"删除字典类型失败: {e}")
@@ -228,15 +234,18 @@ class DictTypeService:
         await DictTypeCRUD(auth).set_obj_available_crud(ids=data.ids, status=data.status)
 
     @classmethod
-    async def export_obj_service(cls, data_list: list[dict]) -> bytes:
+    async def export_obj_service(cls, auth: AuthSchema, search: DictTypeQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出数据字典类型列表
         
         参数:
-        - data_list (list[dict]): 数据字典类型列表
+        - auth (AuthSchema): 认证信息模型
+        - search (DictTypeQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -250,20 +259,23 @@ class DictTypeService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             # 处理状态
             item['status'] = '启用' if item.get('status') == '0' else '停用'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        rows = DictTypeCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=DictTypeOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
     
 
 class DictDataService:
     """
     字典数据管理模块服务层
     """
+
+    # 进行中的单字典类型缓存加载任务
+    _reloading: dict[str, asyncio.Task] = {}
     
     @classmethod
     async def get_obj_detail_service(cls, auth: AuthSchema, id: int) -> dict:
@@ -319,6 +331,8 @@ class DictDataService:
         """
         应用初始化: 获取所有字典类型对应的字典数据信息并缓存service
         
+        一次查询全部字典数据并按类型分组，通过单次流水线 MSET 写入Redis。
+        
         参数:
         - redis (Redis): Redis客户端
         
@@ -335,35 +349,73 @@ class DictDataService:
                         log.warning("未找到任何字典类型数据")
                         return
                     
-                    success_count = 0
-                    fail_count = 0
-                    
-                    for obj in obj_list:
-                        dict_type = obj.dict_type
-                        try:
-                            dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': dict_type})
-                            dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
-                            # 保存到Redis并设置过期时间
-                            redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"
-                            value = json.dumps(dict_data, ensure_ascii=False)
-                            await RedisCURD(redis).set(
-                                    key=redis_key,
-                                    value=value,
-                            )
-                            success_count += 1
-                            log.info(f"✅ 字典数据缓存成功: {dict_type}")
-                            
-                        except Exception as e:
-                            fail_count += 1
-                            log.error(f"❌ 初始化字典数据失败 [{dict_type}]: {e}")
-                            # 继续处理其他字典类型，不中断整个初始化过程
-                    
-                    log.info(f"字典数据初始化完成 - 成功: {success_count}, 失败: {fail_count}")
+                    # 无字典数据的类型同样缓存为空列表
+                    grouped: dict[str, list[dict]] = {obj.dict_type: [] for obj in obj_list}
+                    for row in await DictDataCRUD(auth).get_obj_list_crud():
+                        if row and row.dict_type in grouped:
+                            grouped[row.dict_type].append(DictDataOutSchema.model_validate(row).model_dump())
+
+            mapping = {
+                f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}": json.dumps(dict_data, ensure_ascii=False)
+                for dict_type, dict_data in grouped.items()
+            }
+            if not await RedisCURD(redis).mset(mapping):
+                raise CustomException(msg="字典数据写入缓存失败")
+            await DictLabelCache.publish(redis)
+            log.info(f"字典数据初始化完成 - 字典类型: {len(mapping)}")
                     
         except Exception as e:
             log.error(f"字典初始化过程发生错误: {e}")
-            # 只在严重错误时抛出异常，允许单个字典加载失败
             raise CustomException(msg=f"字典数据初始化失败: {str(e)}")
+
+    @classmethod
+    async def reload_dict_type_service(cls, redis: Redis, dict_type: str) -> list[dict] | None:
+        """
+        重新加载单个字典类型的缓存
+        
+        同一字典类型的并发加载合并为一次数据库查询(single-flight)。
+        
+        参数:
+        - redis (Redis): Redis客户端
+        - dict_type (str): 字典类型
+        
+        返回:
+        - list[dict] | None: 字典数据列表，字典类型不存在时返回None
+        """
+        task = cls._reloading.get(dict_type)
+        if task is None:
+            task = asyncio.ensure_future(cls.__load_dict_type(redis, dict_type))
+            cls._reloading[dict_type] = task
+            task.add_done_callback(lambda _: cls._reloading.pop(dict_type, None))
+        # 单个等待方取消时不影响其他等待方
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def __load_dict_type(cls, redis: Redis, dict_type: str) -> list[dict] | None:
+        """
+        从数据库加载单个字典类型的字典数据并写入缓存
+        
+        参数:
+        - redis (Redis): Redis客户端
+        - dict_type (str): 字典类型
+        
+        返回:
+        - list[dict] | None: 字典数据列表，字典类型不存在时返回None
+        """
+        async with async_db_session() as session:
+            async with session.begin():
+                auth = AuthSchema(db=session, check_data_scope=False)
+                if not await DictTypeCRUD(auth).get(dict_type=dict_type):
+                    return None
+                dict_data_list = await DictDataCRUD(auth).get_obj_list_crud(search={'dict_type': dict_type})
+                dict_data = [DictDataOutSchema.model_validate(row).model_dump() for row in dict_data_list if row]
+
+        redis_key = f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}"
+        await RedisCURD(redis).set(key=redis_key, value=json.dumps(dict_data, ensure_ascii=False))
+        # 只是补写缺失的缓存键，数据未变更，无需递增全局版本号
+        DictLabelCache.discard(dict_type)
+        log.info(f"字典数据缓存重新加载: {dict_type}")
+        return dict_data
     
     @classmethod
     async def get_init_dict_service(cls, redis: Redis, dict_type: str)->list[dict]:
@@ -387,22 +439,14 @@ class DictDataService:
                     try:
                         return json.loads(obj_list_dict)
                     except json.JSONDecodeError:
-                        log.warning(f"字典数据反序列化失败，尝试重新初始化缓存: {dict_type}")
+                        log.warning(f"字典数据反序列化失败，尝试重新加载缓存: {dict_type}")
                 elif isinstance(obj_list_dict, list):
                     return obj_list_dict
                 
-            # 缓存不存在或格式错误时重新初始化
-            await cls.init_dict_service(redis)
-            obj_list_dict = await RedisCURD(redis).get(redis_key)
-            if not obj_list_dict:
+            # 缓存不存在或格式错误时只重新加载该字典类型
+            obj_list_dict = await cls.reload_dict_type_service(redis, dict_type)
+            if obj_list_dict is None:
                 raise CustomException(msg="数据字典不存在")
-            
-            # 再次确保返回数据正确序列化
-            if isinstance(obj_list_dict, str):
-                try:
-                    return json.loads(obj_list_dict)
-                except json.JSONDecodeError:
-                    raise CustomException(msg="字典数据格式错误")
             return obj_list_dict
         except CustomException:
             raise
@@ -410,6 +454,25 @@ class DictDataService:
             log.error(f"获取字典缓存失败: {str(e)}")
             raise CustomException(msg=f"获取字典数据失败: {str(e)}")
 
+    @classmethod
+    async def get_dict_label_service(cls, redis: Redis, dict_types: list[str]) -> dict[str, Mapping[str, Any]]:
+        """
+        批量获取字典标签查找表(一次 MGET)，缓存缺失的字典类型单独重新加载
+        
+        参数:
+        - redis (Redis): Redis客户端
+        - dict_types (list[str]): 字典类型列表
+        
+        返回:
+        - dict[str, Mapping[str, Any]]: {字典类型: {字典键值: 字典标签}}
+        """
+        tables = await DictLabelCache.tables(redis, dict_types)
+        missing = list(dict.fromkeys(dict_type for dict_type in dict_types if dict_type and dict_type not in tables))
+        if missing:
+            await asyncio.gather(*(cls.reload_dict_type_service(redis, dict_type) for dict_type in missing))
+            tables.update(await DictLabelCache.tables(redis, missing))
+        return tables
+    
     @classmethod
     async def create_obj_service(cls, auth: AuthSchema, redis: Redis, data: DictDataCreateSchema) -> dict:
         """
@@ -439,6 +502,7 @@ class DictDataService:
                     key=redis_key,
                     value=value,
                 )
+            await DictLabelCache.publish(redis)
             log.info(f"创建字典数据写入缓存成功: {obj}")
         except Exception as e:
             log.error(f"创建字典数据写入缓存失败: {e}")
@@ -495,6 +559,7 @@ class DictDataService:
                     key=redis_key,
                     value=value,
                 )
+            await DictLabelCache.publish(redis)
             log.info(f"更新字典数据写入缓存成功: {obj}")
         except Exception as e:
             log.error(f"更新字典数据写入缓存失败: {e}")
@@ -547,6 +612,7 @@ class DictDataService:
                 except Exception as e:
                     log.warning(f"清除字典缓存失败: {e}")
                     # 缓存清除失败不影响删除操作
+            await DictLabelCache.publish(redis)
             
             log.info(f"删除字典数据成功，ID列表: {ids}")
             
@@ -571,15 +637,18 @@ class DictDataService:
         await DictDataCRUD(auth).set_obj_available_crud(ids=data.ids, status=data.status)
 
     @classmethod
-    async def export_obj_service(cls, data_list: list[dict]) -> bytes:
+    async def export_obj_service(cls, auth: AuthSchema, search: DictDataQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出数据字典数据列表
         
         参数:
-        - data_list (list[dict]): 数据字典数据列表
+        - auth (AuthSchema): 认证信息模型
+        - search (DictDataQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -598,13 +667,13 @@ class DictDataService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             # 处理状态
             item['status'] = '启用' if item.get('status') == '0' else '停用'
             # 处理是否默认
             item['is_default'] = '是' if item.get('is_default') else '否'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        rows = DictDataCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=DictDataOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.common.response import SuccessResponse, StreamResponse
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.dependencies import AuthPermission
 from app.core.base_params import PaginationQueryParam
 from app.core.logger import log
@@ -86,6 +86,7 @@ async def delete_obj_log_controller(
 @LogRouter.post("/export", summary="导出日志", description="导出日志")
 async def export_obj_list_controller(
     search: OperationLogQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:log:export"]))
 ) -> StreamingResponse:
     """ 
@@ -93,19 +94,19 @@ async def export_obj_list_controller(
     
     参数:
     - search (OperationLogQueryParam): 日志查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含导出日志的流式响应模型
     """
-    operation_log_list = await OperationLogService.get_log_list_service(search=search, auth=auth)
-    operation_log_export_result = await OperationLogService.export_log_list_service(operation_log_list=operation_log_list)
+    operation_log_export_result = await OperationLogService.export_log_list_service(auth=auth, search=search, export_format=export_format)
     log.info('导出日志成功')
 
     return StreamResponse(
-        data=bytes2file_response(operation_log_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=operation_log_export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=log.xlsx'
+            'Content-Disposition': f'attachment; filename=log.{export_format}'
         }
     )
@@ -34,6 +34,19 @@ class OperationLogCRUD(CRUDBase[OperationLogModel, OperationLogCreateSchema, Ope
         """
         return await self.create(data=data)
 
+    async def create_batch_crud(self, rows: list[dict]) -> int:
+        """
+        批量写入操作日志记录(单条多行 INSERT，不回读对象)。
+        
+        参数:
+        - rows (list[dict]): 日志字段字典列表，需已包含 uuid、created_time 等默认值。
+        
+        返回:
+        - int: 写入的记录数。
+        """
+        await self.bulk_create(rows=rows, return_ids=False)
+        return len(rows)
+
     async def get_by_id_crud(self, id: int, preload: list | None = None) -> OperationLogModel | None:
         """
         根据ID获取操作日志详情。
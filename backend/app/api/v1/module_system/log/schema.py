@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import re
+import ipaddress
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from fastapi import Query
 
@@ -50,9 +50,10 @@ class OperationLogCreateSchema(BaseModel):
     def _validate_ip(cls, value: str | None):
         if value is None or value == "":
             return value
-        ipv4 = r"^(25[0-5]|2[0-4]\d|1\d{2}|[1-9]?\d)(\.(25[0-5]|2[0-4]\d|1\d{2}|[1-9]?\d)){3}$"
-        ipv6 = r"^([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}$"
-        if not re.match(ipv4, value) and not re.match(ipv6, value):
+        # ipaddress 同时支持压缩写法的IPv6(如 ::1)
+        try:
+            ipaddress.ip_address(value)
+        except ValueError:
             raise ValueError("请求IP必须为有效的IPv4或IPv6地址")
         return value
 
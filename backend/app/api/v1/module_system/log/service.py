@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
 from app.core.exceptions import CustomException
 from app.core.base_params import PaginationQueryParam
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ExportFormat
 
 from ..auth.schema import AuthSchema
 from .crud import OperationLogCRUD
@@ -100,15 +101,18 @@ class OperationLogService:
         await OperationLogCRUD(auth).delete(ids=ids)
 
     @classmethod
-    async def export_log_list_service(cls, operation_log_list: list[dict]) -> bytes:
+    async def export_log_list_service(cls, auth: AuthSchema, search: OperationLogQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出日志信息
-
+        
         参数:
-        - operation_log_list (list[dict]): 操作日志信息列表
+        - auth (AuthSchema): 认证信息模型
+        - search (OperationLogQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: 操作日志信息excel的二进制数据
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         # 操作日志字段映射
         mapping_dict = {
@@ -131,13 +135,13 @@ class OperationLogService:
             'updated_id': '更新者ID',
         }
 
-        # 处理数据
-        data = operation_log_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             # 处理状态
             item['response_code'] = '成功' if item.get('response_code') == 200 else '失败'
             # 处理日志类型 - 修正与schema.py保持一致
             item['type'] = '登录日志' if item.get('type') == 1 else '操作日志'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        rows = OperationLogCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=OperationLogOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
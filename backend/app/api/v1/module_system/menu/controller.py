@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter, Body, Depends, Path
 from fastapi.responses import JSONResponse
+from redis.asyncio.client import Redis
 
 from app.common.response import SuccessResponse
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
 from app.core.router_class import OperationLogRoute
@@ -62,18 +63,20 @@ async def get_obj_detail_controller(
 @MenuRouter.post("/create", summary="创建菜单", description="创建菜单")
 async def create_obj_controller(
     data: MenuCreateSchema,
-    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:create"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:create"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     创建菜单。
     
     参数:
     - data (MenuCreateSchema): 菜单创建模型。
+    - redis (Redis): Redis 客户端实例。
     
     返回:
     - JSONResponse: 包含创建菜单的 JSON 响应。
     """
-    result_dict = await MenuService.create_menu_service(data=data, auth=auth)
+    result_dict = await MenuService.create_menu_service(data=data, auth=auth, redis=redis)
     log.info(f"创建菜单成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="创建菜单成功")
 
@@ -82,7 +85,8 @@ async def create_obj_controller(
 async def update_obj_controller(
     data: MenuUpdateSchema,
     id: int = Path(..., description="菜单ID"),
-    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:update"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:update"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     修改菜单。
@@ -90,11 +94,12 @@ async def update_obj_controller(
     参数:
     - id (int): 菜单ID。
     - data (MenuUpdateSchema): 菜单更新模型。
+    - redis (Redis): Redis 客户端实例。
     
     返回:
     - JSONResponse: 包含修改菜单的 JSON 响应。
     """
-    result_dict = await MenuService.update_menu_service(id=id, data=data, auth=auth)
+    result_dict = await MenuService.update_menu_service(id=id, data=data, auth=auth, redis=redis)
     log.info(f"修改菜单成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="修改菜单成功")
 
@@ -102,18 +107,20 @@ async def update_obj_controller(
 @MenuRouter.delete("/delete", summary="删除菜单", description="删除菜单")
 async def delete_obj_controller(
     ids: list[int] = Body(..., description="ID列表"),
-    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:delete"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:delete"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     删除菜单。
     
     参数:
     - ids (list[int]): 菜单ID列表。
+    - redis (Redis): Redis 客户端实例。
     
     返回:
     - JSONResponse: 包含删除菜单的 JSON 响应。
     """
-    await MenuService.delete_menu_service(ids=ids, auth=auth)
+    await MenuService.delete_menu_service(ids=ids, auth=auth, redis=redis)
     log.info(f"删除菜单成功: {ids}")
     return SuccessResponse(msg="删除菜单成功")
 
@@ -121,17 +128,19 @@ async def delete_obj_controller(
 @MenuRouter.patch("/available/setting", summary="批量修改菜单状态", description="批量修改菜单状态")
 async def batch_set_available_obj_controller(
     data: BatchSetAvailable,
-    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:patch"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:menu:patch"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     批量修改菜单状态。
     
     参数:
     - data (BatchSetAvailable): 批量修改菜单状态模型。
+    - redis (Redis): Redis 客户端实例。
     
     返回:
     - JSONResponse: 批量修改菜单状态的 JSON 响应。
     """
-    await MenuService.set_menu_available_service(data=data, auth=auth)
+    await MenuService.set_menu_available_service(data=data, auth=auth, redis=redis)
     log.info(f"批量修改菜单状态成功: {data.ids}")
     return SuccessResponse(msg="批量修改菜单状态成功")
\ No newline at end of file
@@ -22,7 +22,7 @@ class MenuModel(ModelMixin):
     """
     __tablename__: str = "sys_menu"
     __table_args__: dict[str, str] = ({'comment': '菜单表'})
-    __loader_options__: list[str] = ["roles"]
+    __loader_options__: list[str] = []
 
     name: Mapped[str] = mapped_column(String(50), nullable=False, comment='菜单名称')
     type: Mapped[int] = mapped_column(Integer, nullable=False, default=2, comment='菜单类型(1:目录 2:菜单 3:按钮/权限 4:链接)')
@@ -61,8 +61,9 @@ class MenuModel(ModelMixin):
         foreign_keys="MenuModel.parent_id",
         order_by="MenuModel.order"
     )
+    # 反向关联仅用于维护关系，禁止隐式加载，需要时通过 preload 显式声明
     roles: Mapped[list["RoleModel"]] = relationship(
         secondary="sys_role_menus", 
         back_populates="menus", 
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
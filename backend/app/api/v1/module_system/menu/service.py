@@ -1,17 +1,17 @@
 # -*- coding: utf-8 -*-
 
+from redis.asyncio.client import Redis
+
 from app.core.base_schema import BatchSetAvailable
+from app.core.database import after_commit
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_parent_id_map,
-    get_parent_recursion,
-    get_child_id_map,
-    get_child_recursion,
-    traversal_to_tree
-)
+from app.core.principal import PrincipalCache, RolePermissionIndex
+from app.core.menu_cache import MenuTreeCache
+from app.utils.common_util import build_tree
 
 from ..auth.schema import AuthSchema
 from .crud import MenuCRUD
+from ..role.crud import RoleCRUD
 from .schema import (
     MenuCreateSchema,
     MenuUpdateSchema,
@@ -64,16 +64,17 @@ class MenuService:
         menu_list = await MenuCRUD(auth).get_tree_list_crud(search=search.__dict__, order_by=order_by)
         # 转换为字典列表
         menu_dict_list = [MenuOutSchema.model_validate(menu).model_dump() for menu in menu_list]
-        # 使用traversal_to_tree构建树形结构
-        return traversal_to_tree(menu_dict_list)
+        # 按ID索引构建树形结构
+        return build_tree(menu_dict_list)
 
     @classmethod
-    async def create_menu_service(cls, auth: AuthSchema, data: MenuCreateSchema) -> dict:
+    async def create_menu_service(cls, auth: AuthSchema, redis: Redis, data: MenuCreateSchema) -> dict:
         """
         创建菜单。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - data (MenuCreateSchema): 创建参数对象。
         
         返回:
@@ -84,16 +85,18 @@ class MenuService:
             raise CustomException(msg='创建失败，该菜单已存在')
 
         new_menu = await MenuCRUD(auth).create(data=data)
+        after_commit(auth.db, MenuTreeCache.publish, redis)
         new_menu_dict = MenuOutSchema.model_validate(new_menu).model_dump()
         return new_menu_dict
 
     @classmethod
-    async def update_menu_service(cls, auth: AuthSchema,id:int, data: MenuUpdateSchema) -> dict:
+    async def update_menu_service(cls, auth: AuthSchema, redis: Redis, id:int, data: MenuUpdateSchema) -> dict:
         """
         更新菜单。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - id (int): 菜单ID。
         - data (MenuUpdateSchema): 更新参数对象。
         
@@ -114,18 +117,19 @@ class MenuService:
             data.parent_name = parent_menu.name
         new_menu = await MenuCRUD(auth).update(id=id, data=data)
         
-        await cls.set_menu_available_service(auth=auth, data=BatchSetAvailable(ids=[id], status=data.status))
+        await cls.set_menu_available_service(auth=auth, redis=redis, data=BatchSetAvailable(ids=[id], status=data.status))
         
         new_menu_dict = MenuOutSchema.model_validate(new_menu).model_dump()
         return new_menu_dict
     
     @classmethod
-    async def delete_menu_service(cls, auth: AuthSchema, ids: list[int]) -> None:
+    async def delete_menu_service(cls, auth: AuthSchema, redis: Redis, ids: list[int]) -> None:
         """
         删除菜单。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - ids (list[int]): 菜单ID列表。
         
         返回:
@@ -133,45 +137,38 @@ class MenuService:
         """
         if len(ids) < 1:
             raise CustomException(msg='删除失败，删除对象不能为空')
-        for id in ids:
-            menu = await MenuCRUD(auth).get_by_id_crud(id=id)
-            if not menu:
-                raise CustomException(msg='删除失败，该菜单不存在')
+        if len(await MenuCRUD(auth).exist_ids(ids=ids)) < len(set(ids)):
+            raise CustomException(msg='删除失败，该菜单不存在')
         # 校验是否存在子级菜单，存在则禁止删除
-        menu_list = await MenuCRUD(auth).get_list_crud()
-        id_map = get_child_id_map(model_list=menu_list)
-        for id in ids:
-            descendants = get_child_recursion(id=id, id_map=id_map)
-            if len(descendants) > 1:
-                raise CustomException(msg='删除失败，存在子级菜单，请先删除子级菜单')
+        if await MenuCRUD(auth).has_children(ids=ids):
+            raise CustomException(msg='删除失败，存在子级菜单，请先删除子级菜单')
+        role_ids = await RoleCRUD(auth).get_role_ids_by_menu_ids_crud(menu_ids=ids)
         await MenuCRUD(auth).delete(ids=ids)
+        # 刷新角色权限索引、用户权限快照与登录菜单树缓存
+        after_commit(auth.db, RolePermissionIndex.refresh, redis, auth, tuple(role_ids))
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
+        after_commit(auth.db, MenuTreeCache.publish, redis)
 
     @classmethod
-    async def set_menu_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
+    async def set_menu_available_service(cls, auth: AuthSchema, redis: Redis, data: BatchSetAvailable) -> None:
         """
-        递归获取所有父、子级菜单，然后批量修改菜单可用状态。
+        递归查询所有父、子级菜单，然后批量修改菜单可用状态。
         
         参数:
         - auth (AuthSchema): 认证对象。
+        - redis (Redis): Redis 客户端实例。
         - data (BatchSetAvailable): 批量设置可用参数对象。
         
         返回:
         - None
         """
-        menu_list = await MenuCRUD(auth).get_list_crud()
-        total_ids = []
-        
-        if data.status:
-            # 激活，则需要把所有父级菜单都激活
-            id_map = get_parent_id_map(model_list=menu_list)
-            for menu_id in data.ids:
-                enable_ids = get_parent_recursion(id=menu_id, id_map=id_map)
-                total_ids.extend(enable_ids)
-        else:
-            # 禁止，则需要把所有子级菜单都禁止
-            id_map = get_child_id_map(model_list=menu_list)
-            for menu_id in data.ids:
-                disable_ids = get_child_recursion(id=menu_id, id_map=id_map)
-                total_ids.extend(disable_ids)
+        # 启用时级联启用全部父级菜单，禁用时级联禁用全部子级菜单
+        direction = 'ancestors' if data.status == '0' else 'descendants'
+        total_ids = await MenuCRUD(auth).hierarchy_ids(ids=data.ids, direction=direction)
 
-        await MenuCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
\ No newline at end of file
+        await MenuCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
+        # 刷新角色权限索引、用户权限快照与登录菜单树缓存
+        role_ids = await RoleCRUD(auth).get_role_ids_by_menu_ids_crud(menu_ids=total_ids)
+        after_commit(auth.db, RolePermissionIndex.refresh, redis, auth, tuple(role_ids))
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
+        after_commit(auth.db, MenuTreeCache.publish, redis)
\ No newline at end of file
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.common.response import StreamResponse, SuccessResponse
@@ -9,7 +9,7 @@ from app.core.dependencies import AuthPermission, get_current_user
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 
 from ..auth.schema import AuthSchema
 from .service import NoticeService
@@ -143,6 +143,7 @@ async def batch_set_available_obj_controller(
 @NoticeRouter.post('/export', summary="导出公告", description="导出公告")
 async def export_obj_list_controller(
     search: NoticeQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:notice:export"]))
 ) -> StreamingResponse:
     """
@@ -150,19 +151,19 @@ async def export_obj_list_controller(
     
     参数:
     - search (NoticeQueryParam): 查询公告参数模型。
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型。
     
     返回:
     - StreamingResponse: 包含导出公告的流式响应模型。
     """
-    result_dict_list = await NoticeService.get_notice_list_service(search=search, auth=auth)
-    export_result = await NoticeService.export_notice_service(notice_list=result_dict_list)
+    export_result = await NoticeService.export_notice_service(auth=auth, search=search, export_format=export_format)
     log.info('导出公告成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers = {'Content-Disposition': 'attachment; filename=notice.xlsx'}
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
+        headers = {'Content-Disposition': f'attachment; filename=notice.{export_format}'}
     )
 
 @NoticeRouter.get("/available", summary="获取全局启用公告", description="获取全局启用公告")
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
 from app.core.base_schema import BatchSetAvailable
 from app.core.base_params import PaginationQueryParam
 from app.core.exceptions import CustomException
-from app.utils.excel_util import ExcelUtil
+from app.utils.excel_util import ExcelUtil, ExportFormat
 
 from ..auth.schema import AuthSchema
 from .schema import NoticeCreateSchema, NoticeUpdateSchema, NoticeOutSchema, NoticeQueryParam
@@ -156,15 +157,18 @@ class NoticeService:
         await NoticeCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
     
     @classmethod
-    async def export_notice_service(cls, notice_list: list[dict]) -> bytes:
+    async def export_notice_service(cls, auth: AuthSchema, search: NoticeQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出公告列表。
         
         参数:
-        - notice_list (list[dict]): 公告详情字典列表。
+        - auth (AuthSchema): 认证信息模型
+        - search (NoticeQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel 文件的字节流。
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -179,13 +183,13 @@ class NoticeService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换状态
-        data = notice_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             # 处理状态
             item['status'] = '启用' if item.get('status') == '0' else '停用'
             # 处理公告类型
             item['notice_type'] = '通知' if item.get('notice_type') == '1' else '公告'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        rows = NoticeCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=NoticeOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
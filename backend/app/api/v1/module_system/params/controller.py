@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path, Request, UploadFile
+from fastapi import APIRouter, Body, Depends, Path, Request, UploadFile, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.base_params import PaginationQueryParam
 from app.core.dependencies import AuthPermission, redis_getter
 from app.core.logger import log
@@ -171,6 +171,7 @@ async def delete_obj_controller(
 @ParamsRouter.post('/export', summary="导出参数", description="导出参数")
 async def export_obj_list_controller(
     search: ParamsQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:param:export"]))
 ) -> StreamingResponse:
     """
@@ -178,20 +179,20 @@ async def export_obj_list_controller(
     
     参数:
     - search (ParamsQueryParam): 参数查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 包含导出参数的 Excel 文件流响应
     """
-    result_dict_list = await ParamsService.get_obj_list_service(search=search, auth=auth)
-    export_result = await ParamsService.export_obj_service(data_list=result_dict_list)
+    export_result = await ParamsService.export_obj_service(auth=auth, search=search, export_format=export_format)
     log.info('导出参数成功')
 
     return StreamResponse(
-        data=bytes2file_response(export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=params.xlsx'
+            'Content-Disposition': f'attachment; filename=params.{export_format}'
         }
     )
 
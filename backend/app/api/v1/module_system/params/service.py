@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import json
+from typing import AsyncIterator
 from redis.asyncio.client import Redis
 from fastapi import UploadFile
 from redis.asyncio.client import Redis
@@ -9,7 +10,8 @@ from app.common.enums import RedisInitKeyConfig
 from app.core.database import async_db_session
 from app.core.base_params import PaginationQueryParam
 from app.core.redis_crud import RedisCURD
-from app.utils.excel_util import ExcelUtil
+from app.core.config_cache import SystemConfigCache
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.utils.upload_util import UploadUtil
 from app.core.base_schema import UploadResponseSchema
 from app.core.exceptions import CustomException
@@ -141,6 +143,7 @@ class ParamsService:
         except Exception as e:
             log.error(f"创建字典类型失败: {e}")
             raise CustomException(msg=f"创建字典类型失败 {e}")
+        await SystemConfigCache.publish(redis)
         
         return new_obj_dict
     
@@ -183,6 +186,7 @@ class ParamsService:
         except Exception as e:
             log.error(f"更新系统配置失败: {e}")
             raise CustomException(msg="更新系统配置失败")
+        await SystemConfigCache.publish(redis)
 
         return new_obj_dict
 
@@ -224,17 +228,21 @@ class ParamsService:
             except Exception as e:
                 log.error(f"删除系统配置失败: {e}")
                 raise CustomException(msg="删除字典类型失败")
+        await SystemConfigCache.publish(redis)
     
     @classmethod
-    async def export_obj_service(cls, data_list: list[dict]) -> bytes:
+    async def export_obj_service(cls, auth: AuthSchema, search: ParamsQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出系统配置列表
         
         参数:
-        - data_list (list[dict]): 系统配置模型实例字典列表表示
+        - auth (AuthSchema): 认证信息模型
+        - search (ParamsQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件二进制数据
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -249,14 +257,14 @@ class ParamsService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换状态
-        data = data_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             # 处理状态
             item['config_type'] = '是' if item.get('config_type') else '否'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        rows = ParamsCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=ParamsOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
     
     @classmethod
     async def upload_service(cls, base_url: str, file: UploadFile) -> dict:
@@ -314,6 +322,7 @@ class ParamsService:
                 except Exception as e:
                     log.error(f"❌️ 初始化系统配置失败: {e}")
                     raise CustomException(msg="初始化系统配置失败")
+        await SystemConfigCache.publish(redis)
 
     @classmethod
     async def get_init_config_service(cls, redis: Redis) -> list[dict]:
@@ -326,7 +335,7 @@ class ParamsService:
         返回:
         - list[dict]: 系统配置模型实例字典列表表示
         """
-        redis_keys = await RedisCURD(redis).get_keys(f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:*")
+        redis_keys = await RedisCURD(redis).index_members(RedisInitKeyConfig.SYSTEM_CONFIG.key)
         redis_configs = await RedisCURD(redis).mget(redis_keys)
         configs = []
         for config in redis_configs:
@@ -340,70 +349,3 @@ class ParamsService:
                 continue
         
         return configs
-    
-    @classmethod
-    async def get_system_config_for_middleware(cls, redis: Redis) -> dict:
-        """
-        获取中间件所需的系统配置
-        
-        参数:
-        - redis (Redis): Redis 客户端实例
-        
-        返回:
-        - dict: 包含演示模式、IP白名单、API白名单和IP黑名单的配置字典
-        """
-        # 定义需要获取的配置键
-        config_keys = [
-            f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:demo_enable",
-            f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:ip_white_list",
-            f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:white_api_list_path",
-            f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:ip_black_list"
-        ]
-        
-        # 批量获取配置
-        config_values = await RedisCURD(redis).mget(config_keys)
-        
-        # 初始化默认配置
-        config_result = {
-            "demo_enable": False,
-            "ip_white_list": [],
-            "white_api_list_path": [],
-            "ip_black_list": []
-        }
-        
-        # 解析演示模式配置
-        if config_values[0]:
-            try:
-                demo_config = json.loads(config_values[0])
-                config_result["demo_enable"] = demo_config.get("config_value", False) if isinstance(demo_config, dict) else False
-            except json.JSONDecodeError:
-                log.error(f"解析演示模式配置失败")
-        
-        # 解析IP白名单配置
-        if config_values[1]:
-            
-            try:
-                ip_white_config = json.loads(config_values[1])
-                # 确保是列表类型
-                config_result["ip_white_list"] = json.loads(ip_white_config.get("config_value", [])) 
-            except json.JSONDecodeError:
-                log.error(f"解析IP白名单配置失败")
-        # 解析IP黑名单
-        # 解析API路径白名单
-        if config_values[2]:
-            try:
-                white_api_config = json.loads(config_values[2])
-                # 确保是列表类型
-                config_result["white_api_list_path"] = json.loads(white_api_config.get("config_value", []))
-            except json.JSONDecodeError:
-                log.error(f"解析API白名单配置失败")
-        
-        # 解析IP黑名单
-        if config_values[3]:
-            try:
-                black_ip_config = json.loads(config_values[3])
-                # 确保是列表类型
-                config_result["ip_black_list"] = json.loads(black_ip_config.get("config_value", []))
-            except json.JSONDecodeError:
-                log.error(f"解析IP黑名单配置失败")
-        return config_result
\ No newline at end of file
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
+from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.base_params import PaginationQueryParam
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
 
@@ -114,6 +115,7 @@ async def update_obj_controller(
 async def delete_obj_controller(
     ids: list[int] = Body(..., description="ID列表"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:position:delete"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     删除岗位
@@ -121,11 +123,12 @@ async def delete_obj_controller(
     参数:
     - ids (list[int]): ID列表
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 成功消息
     """
-    await PositionService.delete_position_service(ids=ids, auth=auth)
+    await PositionService.delete_position_service(ids=ids, auth=auth, redis=redis)
     log.info(f"删除岗位成功: {ids}")
     return SuccessResponse(msg="删除岗位成功")
 
@@ -134,6 +137,7 @@ async def delete_obj_controller(
 async def batch_set_available_obj_controller(
     data: BatchSetAvailable,
     auth: AuthSchema = Depends(AuthPermission(["module_system:position:patch"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     批量修改岗位状态
@@ -141,11 +145,12 @@ async def batch_set_available_obj_controller(
     参数:
     - data (BatchSetAvailable): 批量修改岗位状态模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 成功消息
     """
-    await PositionService.set_position_available_service(data=data, auth=auth)
+    await PositionService.set_position_available_service(data=data, auth=auth, redis=redis)
     log.info(f"批量修改岗位状态成功: {data.ids}")
     return SuccessResponse(msg="批量修改岗位状态成功")
 
@@ -153,6 +158,7 @@ async def batch_set_available_obj_controller(
 @PositionRouter.post('/export', summary="导出岗位", description="导出岗位")
 async def export_obj_list_controller(
     search: PositionQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:position:export"])),
 ) -> StreamingResponse:
     """
@@ -160,19 +166,19 @@ async def export_obj_list_controller(
     
     参数:
     - search (PositionQueryParam): 查询参数
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 岗位Excel文件流
     """
-    position_query_result = await PositionService.get_position_list_service(search=search, auth=auth)
-    position_export_result = await PositionService.export_position_list_service(position_list=position_query_result)
+    position_export_result = await PositionService.export_position_list_service(auth=auth, search=search, export_format=export_format)
     log.info('导出岗位成功')
 
     return StreamResponse(
-        data=bytes2file_response(position_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=position_export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=position.xlsx'
+            'Content-Disposition': f'attachment; filename=position.{export_format}'
         }
     )
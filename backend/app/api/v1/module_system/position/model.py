@@ -17,14 +17,15 @@ class PositionModel(ModelMixin, UserMixin):
     """
     __tablename__: str = "sys_position"
     __table_args__: dict[str, str] = ({'comment': '岗位表'})
-    __loader_options__: list[str] = ["users", "created_by", "updated_by"]
+    __loader_options__: list[str] = ["created_by", "updated_by"]
     
     name: Mapped[str] = mapped_column(String(40), nullable=False, comment="岗位名称")
     order: Mapped[int] = mapped_column(Integer, nullable=False, default=1, comment="显示排序")
     
     # 关联关系
+    # 反向关联仅用于维护关系，禁止隐式加载，需要时通过 preload 显式声明
     users: Mapped[list["UserModel"]] = relationship(
         secondary="sys_user_positions", 
         back_populates="positions", 
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
+from redis.asyncio.client import Redis
+
 from app.core.base_schema import BatchSetAvailable
 from app.core.base_params import PaginationQueryParam
+from app.core.database import after_commit
 from app.core.exceptions import CustomException
-from app.utils.excel_util import ExcelUtil
+from app.core.principal import PrincipalCache
+from app.utils.excel_util import ExcelUtil, ExportFormat
 
 from ..auth.schema import AuthSchema
 from .crud import PositionCRUD
@@ -104,12 +109,13 @@ class PositionService:
         return PositionOutSchema.model_validate(updated_position).model_dump()
 
     @classmethod
-    async def delete_position_service(cls, auth: AuthSchema, ids: list[int]) -> None:
+    async def delete_position_service(cls, auth: AuthSchema, redis: Redis, ids: list[int]) -> None:
         """
         删除岗位
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - ids (list[int]): 岗位ID列表
         
         返回:
@@ -122,31 +128,39 @@ class PositionService:
             if not position:
                 raise CustomException(msg='删除失败，该岗位不存在')
         await PositionCRUD(auth).delete(ids=ids)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
 
     @classmethod
-    async def set_position_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
+    async def set_position_available_service(cls, auth: AuthSchema, redis: Redis, data: BatchSetAvailable) -> None:
         """
         设置岗位状态
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - data (BatchSetAvailable): 批量设置状态模型
         
         返回:
         - None
         """
         await PositionCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
 
     @classmethod
-    async def export_position_list_service(cls, position_list: list[dict]) -> bytes:
+    async def export_position_list_service(cls, auth: AuthSchema, search: PositionQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出岗位列表
         
         参数:
-        - position_list (list[dict]): 岗位列表对象
+        - auth (AuthSchema): 认证信息模型
+        - search (PositionQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: 导出的Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         mapping_dict = {
             'id': '编号',
@@ -160,10 +174,10 @@ class PositionService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换状态
-        data = position_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             item['status'] = '启用' if item.get('status') == '0' else '停用'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
\ No newline at end of file
+        rows = PositionCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, out_schema=PositionOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
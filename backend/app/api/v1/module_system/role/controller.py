@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query
 from fastapi.responses import JSONResponse, StreamingResponse
+from redis.asyncio.client import Redis
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.router_class import OperationLogRoute
-from app.utils.common_util import bytes2file_response
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.core.base_params import PaginationQueryParam
-from app.core.dependencies import AuthPermission
+from app.core.dependencies import AuthPermission, redis_getter
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
 
@@ -94,6 +95,7 @@ async def update_obj_controller(
     data: RoleUpdateSchema,
     id: int = Path(..., description="角色ID"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:role:update"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     修改角色
@@ -102,11 +104,12 @@ async def update_obj_controller(
     - data (RoleUpdateSchema): 修改角色模型
     - id (int): 角色ID
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 修改角色JSON响应
     """
-    result_dict = await RoleService.update_role_service(id=id, data=data, auth=auth)
+    result_dict = await RoleService.update_role_service(id=id, data=data, auth=auth, redis=redis)
     log.info(f"修改角色成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="修改角色成功")
 
@@ -115,6 +118,7 @@ async def update_obj_controller(
 async def delete_obj_controller(
     ids: list[int] = Body(..., description="ID列表"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:role:delete"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     删除角色
@@ -122,11 +126,12 @@ async def delete_obj_controller(
     参数:
     - ids (list[int]): ID列表
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 删除角色JSON响应
     """
-    await RoleService.delete_role_service(ids=ids, auth=auth)
+    await RoleService.delete_role_service(ids=ids, auth=auth, redis=redis)
     log.info(f"删除角色成功: {ids}")
     return SuccessResponse(msg="删除角色成功")
 
@@ -135,6 +140,7 @@ async def delete_obj_controller(
 async def batch_set_available_obj_controller(
     data: BatchSetAvailable,
     auth: AuthSchema = Depends(AuthPermission(["module_system:role:patch"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     批量修改角色状态
@@ -142,11 +148,12 @@ async def batch_set_available_obj_controller(
     参数:
     - data (BatchSetAvailable): 批量修改角色状态模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 批量修改角色状态JSON响应
     """
-    await RoleService.set_role_available_service(data=data, auth=auth)
+    await RoleService.set_role_available_service(data=data, auth=auth, redis=redis)
     log.info(f"批量修改角色状态成功: {data.ids}")
     return SuccessResponse(msg="批量修改角色状态成功")
 
@@ -155,6 +162,7 @@ async def batch_set_available_obj_controller(
 async def set_role_permission_controller(
     data: RolePermissionSettingSchema,
     auth: AuthSchema = Depends(AuthPermission(["module_system:role:permission"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     角色授权
@@ -162,11 +170,12 @@ async def set_role_permission_controller(
     参数:
     - data (RolePermissionSettingSchema): 角色授权模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 角色授权JSON响应
     """
-    await RoleService.set_role_permission_service(data=data, auth=auth)
+    await RoleService.set_role_permission_service(data=data, auth=auth, redis=redis)
     log.info(f"设置角色权限成功: {data}")
     return SuccessResponse(msg="授权角色成功")
 
@@ -174,6 +183,7 @@ async def set_role_permission_controller(
 @RoleRouter.post('/export', summary="导出角色", description="导出角色")
 async def export_obj_list_controller(
     search: RoleQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:role:export"])),
 ) -> StreamingResponse:
     """
@@ -181,19 +191,19 @@ async def export_obj_list_controller(
     
     参数:
     - search (RoleQueryParam): 查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 导出角色流响应
     """
-    role_query_result = await RoleService.get_role_list_service(search=search, auth=auth)
-    role_export_result = await RoleService.export_role_list_service(role_list=role_query_result)
+    role_export_result = await RoleService.export_role_list_service(auth=auth, search=search, export_format=export_format)
     log.info('导出角色成功')
 
     return StreamResponse(
-        data=bytes2file_response(role_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=role_export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=role.xlsx'
+            'Content-Disposition': f'attachment; filename=role.{export_format}'
         }
     )
@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from typing import Sequence
+from sqlalchemy import select
 
 from app.core.base_crud import CRUDBase
 from app.core.base_params import PaginationQueryParam
 
-from .model import RoleModel
+from .model import RoleModel, RoleMenusModel
 from .schema import RoleCreateSchema, RoleUpdateSchema, RoleOutSchema
 from ..auth.schema import AuthSchema
+from ..menu.model import MenuModel
 from ..menu.crud import MenuCRUD
 from ..dept.crud import DeptCRUD
 
@@ -25,20 +27,21 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
         self.auth = auth
         super().__init__(model=RoleModel, auth=auth)
 
-    async def get_by_id_crud(self, id: int, preload: list | None = None) -> RoleModel | None:
+    async def get_by_id_crud(self, id: int, preload: list | None = None, profile: str | None = None) -> RoleModel | None:
         """
         根据id获取角色信息
         
         参数:
         - id (int): 角色ID
         - preload (list | None): 预加载选项
+        - profile (str | None): 预加载配置名称
         
         返回:
         - RoleModel | None: 角色模型对象
         """
-        return await self.get(id=id, preload=preload)
+        return await self.get(id=id, preload=preload, profile=profile)
 
-    async def get_list_crud(self, search: dict | None = None, order_by: list | None = None, preload: list | None = None) -> Sequence[RoleModel]:
+    async def get_list_crud(self, search: dict | None = None, order_by: list | None = None, preload: list | None = None, profile: str | None = None) -> Sequence[RoleModel]:
         """
         获取角色列表
         
@@ -46,13 +49,14 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
         - search (dict | None): 查询参数
         - order_by (list | None): 排序参数
         - preload (list | None): 预加载选项
+        - profile (str | None): 预加载配置名称
         
         返回:
         - Sequence[RoleModel]: 角色模型对象列表
         """
-        return await self.list(search=search, order_by=order_by, preload=preload)
+        return await self.list(search=search, order_by=order_by, preload=preload, profile=profile)
     
-    async def get_page_crud(self, page: PaginationQueryParam, search: dict | None = None, preload: list | None = None) -> dict:   
+    async def get_page_crud(self, page: PaginationQueryParam, search: dict | None = None, preload: list | None = None, profile: str | None = None) -> dict:   
         """
         分页获取角色列表
         
@@ -60,11 +64,12 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
         - page (PaginationQueryParam): 分页参数
         - search (dict | None): 查询参数
         - preload (list | None): 预加载选项
+        - profile (str | None): 预加载配置名称
         
         返回:
         - dict: 分页结果字典
         """
-        return await self.page(page=page, search=search, out_schema=RoleOutSchema, preload=preload)
+        return await self.page(page=page, search=search, out_schema=RoleOutSchema, preload=preload, profile=profile)
 
     async def set_role_menus_crud(self, role_ids: list[int], menu_ids: list[int]) -> None:
         """
@@ -130,4 +135,60 @@ class RoleCRUD(CRUDBase[RoleModel, RoleCreateSchema, RoleUpdateSchema]):
         返回:
         - None
         """
-        await self.set(ids=ids, status=status)
\ No newline at end of file
+        await self.set(ids=ids, status=status)
+
+    async def get_role_permissions_crud(self, role_ids: list[int]) -> dict[int, list[str]]:
+        """
+        批量获取角色的权限标识(单次查询,不经过关系加载)
+        
+        参数:
+        - role_ids (list[int]): 角色ID列表
+        
+        返回:
+        - dict[int, list[str]]: {角色ID: 权限标识列表}
+        """
+        permission_map: dict[int, list[str]] = {role_id: [] for role_id in role_ids}
+        if not role_ids:
+            return permission_map
+        sql = (
+            select(RoleMenusModel.role_id, MenuModel.permission)
+            .join(MenuModel, MenuModel.id == RoleMenusModel.menu_id)
+            .where(RoleMenusModel.role_id.in_(role_ids), MenuModel.status == '0')
+        )
+        result = await self.auth.db.execute(sql)
+        for role_id, permission in result.all():
+            if permission:
+                permission_map[role_id].append(permission)
+        return permission_map
+
+    async def get_role_ids_by_menu_ids_crud(self, menu_ids: list[int]) -> list[int]:
+        """
+        获取关联了指定菜单的角色ID
+        
+        参数:
+        - menu_ids (list[int]): 菜单ID列表
+        
+        返回:
+        - list[int]: 角色ID列表
+        """
+        if not menu_ids:
+            return []
+        sql = select(RoleMenusModel.role_id).where(RoleMenusModel.menu_id.in_(menu_ids)).distinct()
+        result = await self.auth.db.execute(sql)
+        return list(result.scalars().all())
+
+    async def get_menu_ids_by_role_ids_crud(self, role_ids: list[int]) -> list[int]:
+        """
+        获取指定角色关联的菜单ID(单次查询,不经过关系加载)
+        
+        参数:
+        - role_ids (list[int]): 角色ID列表
+        
+        返回:
+        - list[int]: 菜单ID列表
+        """
+        if not role_ids:
+            return []
+        sql = select(RoleMenusModel.menu_id).where(RoleMenusModel.role_id.in_(role_ids)).distinct()
+        result = await self.auth.db.execute(sql)
+        return list(result.scalars().all())
@@ -66,6 +66,10 @@ class RoleModel(ModelMixin, UserMixin):
     __tablename__: str = "sys_role"
     __table_args__: dict[str, str] = ({'comment': '角色表'})
     __loader_options__: list[str] = ["menus", "depts", "created_by", "updated_by"]
+    __loader_profiles__: dict[str, list[str]] = {
+        "list": ["menus", "depts", "created_by", "updated_by"],
+        "detail": ["menus", "depts", "created_by", "updated_by"],
+    }
 
     name: Mapped[str] = mapped_column(String(40), nullable=False, comment="角色名称")
     code: Mapped[str | None] = mapped_column(String(20), nullable=True, index=True, comment="角色编码")
@@ -84,8 +88,9 @@ class RoleModel(ModelMixin, UserMixin):
         back_populates="roles", 
         lazy="selectin"
     )
+    # 反向关联仅用于维护关系，禁止隐式加载，需要时通过 preload 显式声明
     users: Mapped[list["UserModel"]] = relationship(
         secondary="sys_user_roles", 
         back_populates="roles", 
-        lazy="selectin"
+        lazy="raise_on_sql"
     )
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any
+from typing import AsyncIterator
+from redis.asyncio.client import Redis
+
 from app.core.base_schema import BatchSetAvailable
 from app.core.base_params import PaginationQueryParam
+from app.core.database import after_commit
 from app.core.exceptions import CustomException
-from app.utils.excel_util import ExcelUtil
+from app.core.principal import PrincipalCache, RolePermissionIndex
+from app.core.menu_cache import MenuTreeCache
+from app.utils.excel_util import ExcelUtil, ExportFormat
 
 from ..auth.schema import AuthSchema
 from .crud import RoleCRUD
@@ -32,7 +37,7 @@ class RoleService:
         返回:
         - dict: 角色详情字典
         """
-        role = await RoleCRUD(auth).get_by_id_crud(id=id)
+        role = await RoleCRUD(auth).get_by_id_crud(id=id, profile="detail")
         return RoleOutSchema.model_validate(role).model_dump()
 
     @classmethod
@@ -48,7 +53,7 @@ class RoleService:
         返回:
         - list[dict]: 角色详情字典列表
         """
-        role_list = await RoleCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
+        role_list = await RoleCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by, profile="list")
         return [RoleOutSchema.model_validate(role).model_dump() for role in role_list]
 
     @classmethod
@@ -64,7 +69,7 @@ class RoleService:
         返回:
         - dict: 分页查询结果字典
         """
-        return await RoleCRUD(auth).get_page_crud(page=page, search=search.__dict__)
+        return await RoleCRUD(auth).get_page_crud(page=page, search=search.__dict__, profile="list")
 
     @classmethod
     async def create_role_service(cls, auth: AuthSchema, data: RoleCreateSchema) -> dict:
@@ -88,12 +93,13 @@ class RoleService:
         return RoleOutSchema.model_validate(new_role).model_dump()
 
     @classmethod
-    async def update_role_service(cls, auth: AuthSchema, id: int, data: RoleUpdateSchema) -> dict:
+    async def update_role_service(cls, auth: AuthSchema, redis: Redis, id: int, data: RoleUpdateSchema) -> dict:
         """
         更新角色
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - id (int): 角色ID
         - data (RoleUpdateSchema): 更新角色模型
         
@@ -107,15 +113,18 @@ class RoleService:
         if exist_role and exist_role.id != id:
             raise CustomException(msg='更新失败，角色名称重复')
         updated_role = await RoleCRUD(auth).update(id=id, data=data)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
         return RoleOutSchema.model_validate(updated_role).model_dump()
 
     @classmethod
-    async def delete_role_service(cls, auth: AuthSchema, ids: list[int]) -> None:
+    async def delete_role_service(cls, auth: AuthSchema, redis: Redis, ids: list[int]) -> None:
         """
         删除角色
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - ids (list[int]): 角色ID列表
         
         返回:
@@ -128,14 +137,18 @@ class RoleService:
             if not role:
                 raise CustomException(msg='删除失败，该角色不存在')
         await RoleCRUD(auth).delete(ids=ids)
+        # 刷新角色权限索引与用户权限快照
+        after_commit(auth.db, RolePermissionIndex.remove, redis, tuple(ids))
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
 
     @classmethod
-    async def set_role_permission_service(cls, auth: AuthSchema, data: RolePermissionSettingSchema) -> None:
+    async def set_role_permission_service(cls, auth: AuthSchema, redis: Redis, data: RolePermissionSettingSchema) -> None:
         """
         设置角色权限
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - data (RolePermissionSettingSchema): 角色权限设置模型
         
         返回:
@@ -153,30 +166,41 @@ class RoleService:
         else:
             await RoleCRUD(auth).set_role_depts_crud(role_ids=data.role_ids, dept_ids=[])
 
+        # 刷新角色权限索引、用户权限快照与登录菜单树缓存
+        after_commit(auth.db, RolePermissionIndex.refresh, redis, auth, tuple(data.role_ids))
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
+        after_commit(auth.db, MenuTreeCache.publish, redis)
+
     @classmethod
-    async def set_role_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
+    async def set_role_available_service(cls, auth: AuthSchema, redis: Redis, data: BatchSetAvailable) -> None:
         """
         设置角色可用状态
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - data (BatchSetAvailable): 批量设置可用状态模型
         
         返回:
         - None
         """
         await RoleCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
 
     @classmethod
-    async def export_role_list_service(cls, role_list: list[dict[str, Any]]) -> bytes:
+    async def export_role_list_service(cls, auth: AuthSchema, search: RoleQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出角色列表
         
         参数:
-        - role_list (list[dict[str, Any]]): 角色详情字典列表
+        - auth (AuthSchema): 认证信息模型
+        - search (RoleQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
         # 字段映射配置
         mapping_dict = {
@@ -201,12 +225,12 @@ class RoleService:
             5: '自定义数据权限'
         }
 
-        # 处理数据
-        data = role_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             item['status'] = '启用' if item.get('status') == '0' else '停用'
             item['data_scope'] = data_scope_map.get(item.get('data_scope', 1), '')
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        rows = RoleCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, profile="list", out_schema=RoleOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
         
\ No newline at end of file
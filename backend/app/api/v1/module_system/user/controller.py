@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 
 import urllib.parse
-from fastapi import APIRouter, Depends, Body, Path, UploadFile, Request
+from fastapi import APIRouter, Depends, Body, Path, UploadFile, Request, Query
 from fastapi.responses import JSONResponse, StreamingResponse
+from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.router_class import OperationLogRoute
 from app.utils.common_util import bytes2file_response
-from app.core.dependencies import db_getter, get_current_user, AuthPermission
+from app.utils.excel_util import ExcelUtil, ExportFormat
+from app.core.dependencies import db_getter, get_current_user, AuthPermission, redis_getter
 from app.core.base_params import PaginationQueryParam
 from app.core.base_schema import BatchSetAvailable
 from app.core.logger import log
@@ -32,18 +34,20 @@ UserRouter = APIRouter(route_class=OperationLogRoute, prefix="/user", tags=["用
 
 @UserRouter.get("/current/info", summary="查询当前用户信息", description="查询当前用户信息")
 async def get_current_user_info_controller(
-    auth: AuthSchema = Depends(get_current_user)
+    auth: AuthSchema = Depends(get_current_user),
+    redis: Redis = Depends(redis_getter)
 ) -> JSONResponse:
     """
     查询当前用户信息
     
     参数:
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 当前用户信息JSON响应
     """
-    result_dict = await UserService.get_current_user_info_service(auth=auth)
+    result_dict = await UserService.get_current_user_info_service(auth=auth, redis=redis)
     log.info(f"获取当前用户信息成功")
     return SuccessResponse(data=result_dict, msg='获取当前用户信息成功')
 
@@ -71,7 +75,8 @@ async def user_avatar_upload_controller(
 @UserRouter.put("/current/info/update", summary="更新当前用户基本信息", description="更新当前用户基本信息")
 async def update_current_user_info_controller(
     data: CurrentUserUpdateSchema,
-    auth: AuthSchema = Depends(get_current_user)
+    auth: AuthSchema = Depends(get_current_user),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     更新当前用户基本信息
@@ -79,11 +84,12 @@ async def update_current_user_info_controller(
     参数:
     - data (CurrentUserUpdateSchema): 当前用户更新模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 更新当前用户基本信息JSON响应
     """
-    result_dict = await UserService.update_current_user_info_service(data=data, auth=auth)
+    result_dict = await UserService.update_current_user_info_service(data=data, auth=auth, redis=redis)
     log.info(f"更新当前用户基本信息成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg='更新当前用户基本信息成功')
 
@@ -130,6 +136,7 @@ async def reset_password_controller(
 async def register_user_controller(
     data: UserRegisterSchema, 
     db: AsyncSession = Depends(db_getter),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     注册用户
@@ -137,11 +144,12 @@ async def register_user_controller(
     参数:
     - data (UserRegisterSchema): 用户注册模型
     - db (AsyncSession): 异步数据库会话
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 注册用户JSON响应
     """
-    auth = AuthSchema(db=db)
+    auth = AuthSchema(db=db, redis=redis)
     user_register_result = await UserService.register_user_service(data=data, auth=auth)
     log.info(f"{data.username} 注册用户成功: {user_register_result}")
     return SuccessResponse(data=user_register_result, msg='注册用户成功')
@@ -151,6 +159,7 @@ async def register_user_controller(
 async def forget_password_controller(
     data: UserForgetPasswordSchema, 
     db: AsyncSession = Depends(db_getter),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     忘记密码
@@ -158,11 +167,12 @@ async def forget_password_controller(
     参数:
     - data (UserForgetPasswordSchema): 用户忘记密码模型
     - db (AsyncSession): 异步数据库会话
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 忘记密码JSON响应
     """
-    auth = AuthSchema(db=db)
+    auth = AuthSchema(db=db, redis=redis)
     user_forget_password_result = await UserService.forget_password_service(data=data, auth=auth)
     log.info(f"{data.username} 重置密码成功: {user_forget_password_result}")
     return SuccessResponse(data=user_forget_password_result, msg='重置密码成功')
@@ -239,6 +249,7 @@ async def update_obj_controller(
     data: UserUpdateSchema,
     id: int = Path(..., description="用户ID"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:user:update"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     修改用户
@@ -247,11 +258,12 @@ async def update_obj_controller(
     - data (UserUpdateSchema): 用户修改模型
     - id (int): 用户ID
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 修改用户JSON响应
     """
-    result_dict = await UserService.update_user_service(id=id, data=data, auth=auth)
+    result_dict = await UserService.update_user_service(id=id, data=data, auth=auth, redis=redis)
     log.info(f"修改用户成功: {result_dict}")
     return SuccessResponse(data=result_dict, msg="修改用户成功")
 
@@ -260,6 +272,7 @@ async def update_obj_controller(
 async def delete_obj_controller(
     ids: list[int] = Body(..., description="ID列表"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:user:delete"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     删除用户
@@ -267,11 +280,12 @@ async def delete_obj_controller(
     参数:
     - ids (list[int]): 用户ID列表
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 删除用户JSON响应
     """
-    await UserService.delete_user_service(ids=ids, auth=auth)
+    await UserService.delete_user_service(ids=ids, auth=auth, redis=redis)
     log.info(f"删除用户成功: {ids}")
     return SuccessResponse(msg="删除用户成功")
 
@@ -280,6 +294,7 @@ async def delete_obj_controller(
 async def batch_set_available_obj_controller(
     data: BatchSetAvailable,
     auth: AuthSchema = Depends(AuthPermission(["module_system:user:patch"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     批量修改用户状态
@@ -287,11 +302,12 @@ async def batch_set_available_obj_controller(
     参数:
     - data (BatchSetAvailable): 批量修改用户状态模型
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 批量修改用户状态JSON响应
     """
-    await UserService.set_user_available_service(data=data, auth=auth)
+    await UserService.set_user_available_service(data=data, auth=auth, redis=redis)
     log.info(f"批量修改用户状态成功: {data.ids}")
     return SuccessResponse(msg="批量修改用户状态成功")
 
@@ -321,6 +337,7 @@ async def export_obj_template_controller()-> StreamingResponse:
 async def export_obj_list_controller(
     page: PaginationQueryParam = Depends(),
     search: UserQueryParam = Depends(),
+    export_format: ExportFormat = Query('xlsx', description="导出格式(xlsx/csv/ndjson)"),
     auth: AuthSchema = Depends(AuthPermission(["module_system:user:export"])),
 ) -> StreamingResponse:
     """
@@ -329,20 +346,20 @@ async def export_obj_list_controller(
     参数:
     - page (PaginationQueryParam): 分页查询参数模型
     - search (UserQueryParam): 查询参数模型
+    - export_format (ExportFormat): 导出格式
     - auth (AuthSchema): 认证信息模型
     
     返回:
     - StreamingResponse: 用户导出模板流响应
     """
-    user_list = await UserService.get_user_list_service(auth=auth, search=search, order_by=page.order_by)
-    user_export_result = await UserService.export_user_list_service(user_list)
+    user_export_result = await UserService.export_user_list_service(auth=auth, search=search, order_by=page.order_by, export_format=export_format)
     log.info('导出用户成功')
 
     return StreamResponse(
-        data=bytes2file_response(user_export_result),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        data=user_export_result,
+        media_type=ExcelUtil.media_type(export_format),
         headers = {
-            'Content-Disposition': 'attachment; filename=user.xlsx'
+            'Content-Disposition': f'attachment; filename=user.{export_format}'
         }
     )
 
@@ -350,7 +367,8 @@ async def export_obj_list_controller(
 @UserRouter.post('/import/data', summary="导入用户", description="导入用户")
 async def import_obj_list_controller(
     file: UploadFile,
-    auth: AuthSchema = Depends(AuthPermission(["module_system:user:import"]))
+    auth: AuthSchema = Depends(AuthPermission(["module_system:user:import"])),
+    redis: Redis = Depends(redis_getter),
 ) -> JSONResponse:
     """
     导入用户
@@ -358,10 +376,11 @@ async def import_obj_list_controller(
     参数:
     - file (UploadFile): 用户导入文件
     - auth (AuthSchema): 认证信息模型
+    - redis (Redis): Redis 客户端实例
     
     返回:
     - JSONResponse: 导入用户JSON响应
     """
-    batch_import_result = await UserService.batch_import_user_service(file=file, auth=auth, update_support=True)
+    batch_import_result = await UserService.batch_import_user_service(file=file, auth=auth, redis=redis, update_support=True)
     log.info(f"导入用户成功: {batch_import_result}")
     return SuccessResponse(data=batch_import_result, msg="导入用户成功")
@@ -2,6 +2,7 @@
 
 from typing import Sequence, Any
 from datetime import datetime
+from sqlalchemy import select
 
 from app.core.base_crud import CRUDBase
 from app.core.base_params import PaginationQueryParam
@@ -25,35 +26,39 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
         self.auth = auth
         super().__init__(model=UserModel, auth=auth)
 
-    async def get_by_id_crud(self, id: int, preload: list[str | Any] | None = None) -> UserModel | None:
+    async def get_by_id_crud(self, id: int, preload: list[str | Any] | None = None, profile: str | None = None) -> UserModel | None:
         """
         根据id获取用户信息
         
         参数:
         - id (int): 用户ID
         - preload (list[str | Any] | None): 预加载关系，未提供时使用模型默认项
+        - profile (str | None): 预加载配置名称，见 UserModel.__loader_profiles__
         
         返回:
         - UserModel | None: 用户信息,如果不存在则为None
         """
         return await self.get(
             preload=preload,
+            profile=profile,
             id=id,
         )
 
-    async def get_by_username_crud(self, username: str, preload: list[str | Any] | None = None) -> UserModel | None:
+    async def get_by_username_crud(self, username: str, preload: list[str | Any] | None = None, profile: str | None = None) -> UserModel | None:
         """
         根据用户名获取用户信息
         
         参数:
         - username (str): 用户名
         - preload (list[str | Any] | None): 预加载关系，未提供时使用模型默认项
+        - profile (str | None): 预加载配置名称，见 UserModel.__loader_profiles__
         
         返回:
         - UserModel | None: 用户信息,如果不存在则为None
         """
         return await self.get(
             preload=preload,
+            profile=profile,
             username=username,
         )
     
@@ -73,7 +78,7 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
             mobile=mobile,
         )
 
-    async def get_list_crud(self, search: dict | None = None, order_by: list[dict[str, str]] | None = None, preload: list[str | Any] | None = None) -> Sequence[UserModel]:
+    async def get_list_crud(self, search: dict | None = None, order_by: list[dict[str, str]] | None = None, preload: list[str | Any] | None = None, profile: str | None = None) -> Sequence[UserModel]:
         """
         获取用户列表
         
@@ -81,6 +86,7 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
         - search (dict | None): 查询参数对象。
         - order_by (list[dict[str, str]] | None): 排序参数列表。
         - preload (list[str | Any] | None): 预加载关系，未提供时使用模型默认项
+        - profile (str | None): 预加载配置名称，见 UserModel.__loader_profiles__
         
         返回:
         - Sequence[UserModel]: 用户列表
@@ -89,9 +95,10 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
             search=search,
             order_by=order_by,
             preload=preload,
+            profile=profile,
         )
     
-    async def get_page_crud(self, page: PaginationQueryParam, search: dict | None = None, preload: list[str | Any] | None = None) -> dict:
+    async def get_page_crud(self, page: PaginationQueryParam, search: dict | None = None, preload: list[str | Any] | None = None, profile: str | None = None) -> dict:
         """
         分页获取用户列表
         
@@ -99,6 +106,7 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
         - page (PaginationQueryParam): 分页参数
         - search (dict | None): 查询参数对象。
         - preload (list[str | Any] | None): 预加载关系，未提供时使用模型默认项
+        - profile (str | None): 预加载配置名称，见 UserModel.__loader_profiles__
         
         返回:
         - dict: 分页数据
@@ -107,9 +115,59 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
             page=page,
             search=search or {},
             out_schema=UserOutSchema,
-            preload=preload
+            preload=preload,
+            profile=profile
         )
 
+    async def get_by_usernames_crud(self, usernames: list[str], chunk_size: int = 1000) -> dict[str, tuple[int, bool, bool]]:
+        """
+        根据用户名批量查询已存在的用户(仅查询必要列)
+        
+        用户名全局唯一，因此不按数据权限过滤存在性，而是单独标记该用户是否在当前数据权限范围内。
+        
+        参数:
+        - usernames (list[str]): 用户名列表
+        - chunk_size (int): 单次 IN 查询的最大条数
+        
+        返回:
+        - dict[str, tuple[int, bool, bool]]: {用户名: (用户ID, 是否超管, 是否在数据权限范围内)}
+        """
+        existing: dict[str, tuple[int, bool, bool]] = {}
+        for i in range(0, len(usernames), chunk_size):
+            sql = select(UserModel.username, UserModel.id, UserModel.is_superuser).where(
+                UserModel.username.in_(usernames[i:i + chunk_size])
+            )
+            rows = (await self.auth.db.execute(sql)).all()
+            visible = set(await self.exist_ids(ids=[id for _, id, _ in rows]))
+            for username, id, is_superuser in rows:
+                existing[username] = (id, is_superuser, id in visible)
+        return existing
+
+    async def create_batch_crud(self, rows: list[dict]) -> int:
+        """
+        批量新增用户(多行 INSERT，不回读对象)
+        
+        参数:
+        - rows (list[dict]): 用户字段字典列表
+        
+        返回:
+        - int: 新增条数
+        """
+        await self.bulk_create(rows=rows, return_ids=False)
+        return len(rows)
+
+    async def update_batch_crud(self, rows: list[dict]) -> int:
+        """
+        按主键批量更新用户(每行取各自的值)
+        
+        参数:
+        - rows (list[dict]): 包含 id 的用户字段字典列表
+        
+        返回:
+        - int: 更新条数
+        """
+        return len(await self.bulk_update(rows=rows))
+
     async def update_last_login_crud(self, id: int) -> UserModel | None:
         """
         更新用户最后登录时间
@@ -66,6 +66,19 @@ class UserModel(ModelMixin, UserMixin):
     __tablename__: str = "sys_user"
     __table_args__: dict[str, str] = ({'comment': '用户表'})
     __loader_options__: list[str] = ["dept", "roles", "positions", "created_by", "updated_by"]
+    __loader_profiles__: dict[str, list[str]] = {
+        # 鉴权: 仅构建权限快照所需的关系
+        "auth": ["dept", "roles", "roles.depts", "positions"],
+        # 列表/详情: 与 UserOutSchema 输出字段一一对应
+        "list": [
+            "dept", "positions", "created_by", "updated_by",
+            "roles", "roles.menus", "roles.depts", "roles.created_by", "roles.updated_by",
+        ],
+        "detail": [
+            "dept", "positions", "created_by", "updated_by",
+            "roles", "roles.menus", "roles.depts", "roles.created_by", "roles.updated_by",
+        ],
+    }
 
     username: Mapped[str] = mapped_column(String(32), nullable=False, unique=True, comment="用户名/登录账号")
     password: Mapped[str] = mapped_column(String(255), nullable=False, comment="密码哈希")
@@ -1,17 +1,25 @@
 # -*- coding: utf-8 -*-
 
 import io
-from typing import Any
+import time
+from typing import AsyncIterator, Awaitable, Callable
 from fastapi import UploadFile
+from redis.asyncio.client import Redis
 import pandas as pd
 
+from app.core.database import after_commit
 from app.core.exceptions import CustomException
+from app.core.principal import PrincipalCache
+from app.core.menu_cache import MenuTreeCache
+from app.core.session_registry import SessionRegistry
 from app.utils.hash_bcrpy_util import PwdUtil
 from app.core.base_schema import BatchSetAvailable, UploadResponseSchema
 from app.core.base_params import PaginationQueryParam
 from app.core.logger import log
-from app.utils.common_util import traversal_to_tree
-from app.utils.excel_util import ExcelUtil
+from app.core.validator import datetime_str
+from app.config.setting import settings
+from app.utils.common_util import build_tree
+from app.utils.excel_util import ExcelUtil, ExportFormat
 from app.utils.upload_util import UploadUtil
 
 from ..position.crud import PositionCRUD
@@ -49,16 +57,12 @@ class UserService:
         返回:
         - dict: 用户详情字典
         """
-        user = await UserCRUD(auth).get_by_id_crud(id=id)
+        user = await UserCRUD(auth).get_by_id_crud(id=id, profile="detail")
         if not user:
             raise CustomException(msg="用户不存在")
         
-        # 如果用户绑定了部门,则获取部门名称
-        if user.dept_id:
-            dept = await DeptCRUD(auth).get_by_id_crud(id=user.dept_id)
-            UserOutSchema.dept_name = dept.name if dept else None
-        else:
-            UserOutSchema.dept_name = None
+        # 部门已由 detail 预加载配置加载，无需再次查询
+        UserOutSchema.dept_name = user.dept.name if user.dept else None
         
         return UserOutSchema.model_validate(user).model_dump()
 
@@ -75,7 +79,7 @@ class UserService:
         返回:
         - list[dict]: 用户详情字典列表
         """
-        user_list = await UserCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by)
+        user_list = await UserCRUD(auth).get_list_crud(search=search.__dict__, order_by=order_by, profile="list")
         user_dict_list = []
         for user in user_list:
             user_dict = UserOutSchema.model_validate(user).model_dump()
@@ -96,7 +100,7 @@ class UserService:
         返回:
         - dict: 包含分页用户详情的字典
         """
-        return await UserCRUD(auth).get_page_crud(page=page, search=search.__dict__ if search else None)
+        return await UserCRUD(auth).get_page_crud(page=page, search=search.__dict__ if search else None, profile="list")
 
     @classmethod
     async def create_user_service(cls, data: UserCreateSchema, auth: AuthSchema) -> dict:
@@ -127,7 +131,7 @@ class UserService:
                 raise CustomException(msg='部门不存在')
         # 创建用户
         if data.password:
-            data.password = PwdUtil.set_password_hash(password=data.password)
+            data.password = await PwdUtil.set_password_hash_async(password=data.password)
         user_dict = data.model_dump(exclude_unset=True, exclude={"role_ids", "position_ids"})
         # 创建用户
         new_user = await UserCRUD(auth).create(data=user_dict)
@@ -142,7 +146,7 @@ class UserService:
         return new_user_dict
 
     @classmethod
-    async def update_user_service(cls, id: int, data: UserUpdateSchema, auth: AuthSchema) -> dict:
+    async def update_user_service(cls, id: int, data: UserUpdateSchema, auth: AuthSchema, redis: Redis) -> dict:
         """
         更新用户
         
@@ -150,6 +154,7 @@ class UserService:
         - id (int): 用户ID
         - data (UserUpdateSchema): 用户更新信息
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         
         返回:
         - Dict: 更新后的用户详情字典
@@ -191,7 +196,7 @@ class UserService:
         # 更新密码
         update_dict = {}
         if data.password:
-            update_dict['password'] = PwdUtil.set_password_hash(password=data.password)
+            update_dict['password'] = await PwdUtil.set_password_hash_async(password=data.password)
         
         # 更新用户 - 排除不应被修改的字段
         user_dict = data.model_dump(exclude_unset=True, exclude={"role_ids", "position_ids", "last_login", "password"})
@@ -217,16 +222,20 @@ class UserService:
                 raise CustomException(msg='部分岗位已被禁用')
             await UserCRUD(auth).set_user_positions_crud(user_ids=[id], position_ids=data.position_ids)
 
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
+
         user_dict = UserOutSchema.model_validate(new_user).model_dump()
         return user_dict
 
     @classmethod
-    async def delete_user_service(cls, auth: AuthSchema, ids: list[int]) -> None:
+    async def delete_user_service(cls, auth: AuthSchema, redis: Redis, ids: list[int]) -> None:
         """
         删除用户
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - ids (list[int]): 用户ID列表
         
         返回:
@@ -253,13 +262,18 @@ class UserService:
         # 删除用户
         await UserCRUD(auth).delete(ids=ids)
 
+        # 提交后刷新用户权限快照并下线已删除用户的会话
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
+        after_commit(auth.db, SessionRegistry.terminate_user, redis, *ids)
+
     @classmethod
-    async def get_current_user_info_service(cls, auth: AuthSchema) -> dict:
+    async def get_current_user_info_service(cls, auth: AuthSchema, redis: Redis) -> dict:
         """
         获取当前用户信息
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         
         返回:
         - Dict: 当前用户详情字典
@@ -267,42 +281,45 @@ class UserService:
         # 获取用户基本信息
         if not auth.user or not auth.user.id:
             raise CustomException(msg="用户不存在")
-        user = await UserCRUD(auth).get_by_id_crud(id=auth.user.id)
+        # 按输出字段加载关系，未声明的关系 raiseload，避免经由 lazy="selectin" 级联加载整个关系图
+        user = await UserCRUD(auth).get_by_id_crud(id=auth.user.id, profile="detail")
         # 获取部门名称
         if user and user.dept:
             UserOutSchema.dept_name = user.dept.name
         user_dict = UserOutSchema.model_validate(user).model_dump()
 
-        # 获取菜单权限
-        if auth.user and auth.user.is_superuser:
-            # 使用树形结构查询，预加载children关系
-            menu_all = await MenuCRUD(auth).get_tree_list_crud(search={'type': ('in', [1, 2, 4]), 'status': '0'}, order_by=[{"order": "asc"}])
-            menus = [MenuOutSchema.model_validate(menu).model_dump() for menu in menu_all]
-            
-        else:
-            # 收集用户所有角色的菜单ID，使用列表推导式优化代码
-            menu_ids = {
-                menu.id 
-                for role in auth.user.roles or [] 
-                for menu in role.menus 
-                if menu.status and menu.type in [1, 2, 4]
-            }
-            
-            # 使用树形结构查询，预加载children关系
-            menus = [
-                MenuOutSchema.model_validate(menu).model_dump() 
-                for menu in await MenuCRUD(auth).get_tree_list_crud(search={'id': ('in', list(menu_ids))}, order_by=[{"order": "asc"}])
-            ] if menu_ids else []
-        user_dict["menus"] = traversal_to_tree(menus)
+        # 获取菜单权限: 相同角色集合共用缓存的菜单树，超级管理员共用一份
+        active_role_ids = None if auth.user.is_superuser else set(auth.user.role_ids)
+
+        async def load_menu_tree() -> list[dict]:
+            if active_role_ids is None:
+                search = {'type': ('in', [1, 2, 4]), 'status': '0'}
+            else:
+                # 仅在缓存未命中时按有效角色查询关联菜单，不依赖已加载的 user.roles/role.menus
+                menu_ids = await RoleCRUD(auth).get_menu_ids_by_role_ids_crud(role_ids=sorted(active_role_ids))
+                if not menu_ids:
+                    return []
+                search = {'id': ('in', menu_ids), 'type': ('in', [1, 2, 4])}
+            # 按 parent_id 构造树，无需预加载children关系
+            menus = await MenuCRUD(auth).get_tree_list_crud(search=search, order_by=[{"order": "asc"}], preload=[])
+            # 直接读取ORM对象的字段构造菜单树，不逐个节点做模型校验与序列化，时间字段按 DateTimeStr 格式化
+            return build_tree(
+                menus,
+                fields=tuple(MenuOutSchema.model_fields),
+                formatters={'created_time': datetime_str, 'updated_time': datetime_str},
+            )
+
+        user_dict["menus"] = await MenuTreeCache.get(redis, active_role_ids, load_menu_tree)
         return user_dict
 
     @classmethod
-    async def update_current_user_info_service(cls, auth: AuthSchema, data: CurrentUserUpdateSchema) -> dict:
+    async def update_current_user_info_service(cls, auth: AuthSchema, redis: Redis, data: CurrentUserUpdateSchema) -> dict:
         """
         更新当前用户信息
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - data (CurrentUserUpdateSchema): 当前用户更新信息
         
         返回:
@@ -327,15 +344,18 @@ class UserService:
                 raise CustomException(msg='更新失败，邮箱已存在')
         user_update_data = UserUpdateSchema(**data.model_dump())
         new_user = await UserCRUD(auth).update(id=auth.user.id, data=user_update_data)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
         return UserOutSchema.model_validate(new_user).model_dump()
 
     @classmethod
-    async def set_user_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
+    async def set_user_available_service(cls, auth: AuthSchema, redis: Redis, data: BatchSetAvailable) -> None:
         """
         设置用户状态
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - data (BatchSetAvailable): 批量设置用户状态数据
         
         返回:
@@ -348,6 +368,8 @@ class UserService:
             if user.is_superuser:
                 raise CustomException(msg="超级管理员状态不能修改")
         await UserCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        # 刷新用户权限快照
+        after_commit(auth.db, PrincipalCache.invalidate, redis)
 
     @classmethod
     async def upload_avatar_service(cls, base_url: str, file: UploadFile) -> dict:
@@ -391,11 +413,11 @@ class UserService:
         user = await UserCRUD(auth).get_by_id_crud(id=auth.user.id)
         if not user:
             raise CustomException(msg="用户不存在")
-        if not PwdUtil.verify_password(plain_password=data.old_password, password_hash=user.password):
+        if not await PwdUtil.verify_password_async(plain_password=data.old_password, password_hash=user.password):
             raise CustomException(msg='原密码输入错误')
 
         # 更新密码
-        new_password_hash = PwdUtil.set_password_hash(password=data.new_password)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.new_password)
         new_user = await UserCRUD(auth).change_password_crud(id=user.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
     
@@ -424,7 +446,7 @@ class UserService:
             raise CustomException(msg="超级管理员密码不能重置")
 
         # 更新密码
-        new_password_hash = PwdUtil.set_password_hash(password=data.password)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.password)
         new_user = await UserCRUD(auth).change_password_crud(id=data.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
 
@@ -445,7 +467,7 @@ class UserService:
         if username_ok:
             raise CustomException(msg='账号已存在')
 
-        data.password = PwdUtil.set_password_hash(password=data.password)
+        data.password = await PwdUtil.set_password_hash_async(password=data.password)
         data.name = data.username
         create_dict = data.model_dump(exclude_unset=True, exclude={"role_ids", "position_ids"})
         
@@ -483,17 +505,18 @@ class UserService:
         if user.is_superuser:
             raise CustomException(msg="超级管理员密码不能重置")
 
-        new_password_hash = PwdUtil.set_password_hash(password=data.new_password)
+        new_password_hash = await PwdUtil.set_password_hash_async(password=data.new_password)
         new_user = await UserCRUD(auth).forget_password_crud(id=user.id, password_hash=new_password_hash)
         return UserOutSchema.model_validate(new_user).model_dump()
 
     @classmethod
-    async def batch_import_user_service(cls, auth: AuthSchema, file: UploadFile, update_support: bool = False) -> str:
+    async def batch_import_user_service(cls, auth: AuthSchema, redis: Redis, file: UploadFile, update_support: bool = False) -> str:
         """
         批量导入用户
         
         参数:
         - auth (AuthSchema): 认证信息模型
+        - redis (Redis): Redis 客户端实例
         - file (UploadFile): 上传的Excel文件
         - update_support (bool, optional): 是否支持更新已存在用户. 默认值为False.
         
@@ -512,6 +535,7 @@ class UserService:
         }
 
         try:
+            started = time.perf_counter()
             # 读取Excel文件
             contents = await file.read()
             df = pd.read_excel(io.BytesIO(contents))
@@ -525,71 +549,129 @@ class UserService:
             if missing_headers:
                 raise CustomException(msg=f"导入文件缺少必要的列: {', '.join(missing_headers)}")
             
-            # 重命名列名
-            df.rename(columns=header_dict, inplace=True)
-            
+            # 重命名列名并整列规范化
+            df = df.rename(columns=header_dict)[list(header_dict.values())]
+            df['row_no'] = range(1, len(df) + 1)
+            for field in ['username', 'name', 'email', 'mobile']:
+                df[field] = df[field].astype('string').str.strip().replace('', pd.NA)
+            df['dept_id'] = pd.to_numeric(df['dept_id'], errors='coerce')
+            df['gender'] = df['gender'].map({'男': '1', '女': '2'}).fillna('1')
+            df['status'] = df['status'].eq('正常').map({True: '0', False: '1'})
+
+            # 行级错误: {行号: 错误信息}
+            row_errors: dict[int, str] = {}
+
+            def reject(mask: pd.Series, msg: str) -> None:
+                for row_no in df.loc[mask & ~df['row_no'].isin(row_errors), 'row_no']:
+                    row_errors[int(row_no)] = msg
+
             # 验证必填字段
-            required_fields = ['username', 'name', 'dept_id']
-            for field in required_fields:
-                missing_rows = df[df[field].isnull()].index.tolist()
-                raise CustomException(msg=f"{[k for k,v in header_dict.items() if v == field][0]}不能为空，第{[i+1 for i in missing_rows]}行")
-            
-            error_msgs = []
-            success_count = 0
-            count = 0
-            
-            # 处理每一行数据
-            for index, row in df.iterrows():
+            for field in ['username', 'name', 'dept_id']:
+                label = [k for k, v in header_dict.items() if v == field][0]
+                reject(df[field].isna(), f"{label}不能为空")
+            reject(df['username'].duplicated(keep='first') & df['username'].notna(), "用户名在文件中重复")
+
+            # 一次查询校验部门是否存在
+            dept_ids = [int(i) for i in df['dept_id'].dropna().unique()]
+            exist_dept_ids = {dept.id for dept in await DeptCRUD(auth).get_list_crud(search={"id": ("in", dept_ids)}, preload=[])} if dept_ids else set()
+            reject(df['dept_id'].notna() & ~df['dept_id'].isin(exist_dept_ids), "部门不存在")
+
+            valid_df = df[~df['row_no'].isin(row_errors)]
+            # 一次 IN 查询获取已存在的用户名
+            existing = await UserCRUD(auth).get_by_usernames_crud(usernames=valid_df['username'].tolist())
+            # 默认密码只计算一次哈希
+            default_password_hash = await PwdUtil.get_default_password_hash(settings.PASSWORD_DEFAULT)
+
+            create_rows: list[tuple[int, dict]] = []
+            update_rows: list[tuple[int, dict]] = []
+            for record in valid_df.astype(object).where(valid_df.notna(), None).to_dict('records'):
+                row_no = record.pop('row_no')
+                record['dept_id'] = int(record['dept_id'])
+                exists_user = existing.get(record['username'])
+                if exists_user and exists_user[1]:
+                    row_errors[row_no] = "超级管理员不允许修改"
+                    continue
+                if exists_user and not update_support:
+                    row_errors[row_no] = f"用户 {record['username']} 已存在"
+                    continue
+                if exists_user and not exists_user[2]:
+                    row_errors[row_no] = f"用户 {record['username']} 已存在或无权限操作"
+                    continue
                 try:
-                    count = count + 1
-                    # 数据转换
-                    gender = 1 if row['gender'] == '男' else (2 if row['gender'] == '女' else 1)
-                    status = True if row['status'] == '正常' else False
-                    
-                    # 构建用户数据
-                    user_data = {
-                        "username": str(row['username']).strip(),
-                        "name": str(row['name']).strip(),
-                        "email": str(row['email']).strip(),
-                        "mobile": str(row['mobile']).strip(),
-                        "gender": gender,
-                        "status": status,
-                        "dept_id": int(row['dept_id']),
-                        "password": PwdUtil.set_password_hash(password="123456")  # 设置默认密码
-                    }
-
-                    # 处理用户导入
-                    exists_user = await UserCRUD(auth).get_by_username_crud(username=user_data["username"])
-                    if exists_user:
-                        # 检查是否是超级管理员
-                        if exists_user.is_superuser:
-                            error_msgs.append(f"第{count}行: 超级管理员不允许修改")
-                            continue
-                        if update_support:
-                            user_update_data = UserUpdateSchema(**user_data)
-                            await UserCRUD(auth).update(id=exists_user.id, data=user_update_data)
-                            success_count += 1
-                        else:
-                            error_msgs.append(f"第{count}行: 用户 {user_data['username']} 已存在")
-                    else:
-                        user_create_data = UserCreateSchema(**user_data)
-                        await UserCRUD(auth).create(data=user_create_data)
-                        success_count += 1
-                        
+                    user_data = UserCreateSchema(**record, password=default_password_hash).model_dump(
+                        exclude_unset=True, exclude={"role_ids", "position_ids"}
+                    )
                 except Exception as e:
-                    error_msgs.append(f"第{count}行: 异常{str(e)}")
+                    row_errors[row_no] = f"异常{str(e)}"
                     continue
+                if exists_user:
+                    # 更新已有用户时保留其原密码，空单元格不覆盖原有值
+                    user_data.pop("password", None)
+                    user_data = {key: value for key, value in user_data.items() if value is not None}
+                    update_rows.append((row_no, {"id": exists_user[0], **user_data}))
+                else:
+                    create_rows.append((row_no, user_data))
+
+            # 分块批量写入，块失败时逐行定位错误
+            success_count = await cls._write_import_chunks(auth, UserCRUD(auth).create_batch_crud, create_rows, row_errors)
+            success_count += await cls._write_import_chunks(auth, UserCRUD(auth).update_batch_crud, update_rows, row_errors)
+
+            # 刷新用户权限快照
+            if success_count:
+                after_commit(auth.db, PrincipalCache.invalidate, redis)
 
             # 返回详细的导入结果
-            result = f"成功导入 {success_count} 条数据"
-            if error_msgs:
-                result += "\n错误信息:\n" + "\n".join(error_msgs)
+            elapsed = time.perf_counter() - started
+            result = f"成功导入 {success_count} 条数据，耗时 {elapsed:.2f} 秒({len(df) / elapsed if elapsed else 0:.0f} 行/秒)"
+            if row_errors:
+                result += "\n错误信息:\n" + "\n".join(f"第{row_no}行: {msg}" for row_no, msg in sorted(row_errors.items()))
             return result
             
+        except CustomException:
+            raise
         except Exception as e:
             log.error(f"批量导入用户失败: {str(e)}")
             raise CustomException(msg=f"导入失败: {str(e)}")
 
+    @classmethod
+    async def _write_import_chunks(
+        cls,
+        auth: AuthSchema,
+        writer: Callable[[list[dict]], Awaitable[int]],
+        rows: list[tuple[int, dict]],
+        row_errors: dict[int, str],
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        分块批量写入导入数据，每块使用保存点，块写入失败时回退为逐行写入以定位错误行
+        
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - writer (Callable[[list[dict]], Awaitable[int]]): 批量写入方法，接收字段字典列表，返回写入条数
+        - rows (list[tuple[int, dict]]): (行号, 字段字典) 列表
+        - row_errors (dict[int, str]): 行级错误，失败行写入其中
+        - chunk_size (int): 每块条数
+        
+        返回:
+        - int: 写入成功的条数
+        """
+        success_count = 0
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i:i + chunk_size]
+            try:
+                async with auth.db.begin_nested():
+                    success_count += await writer([data for _, data in chunk])
+                continue
+            except Exception:
+                pass
+            for row_no, data in chunk:
+                try:
+                    async with auth.db.begin_nested():
+                        success_count += await writer([data])
+                except Exception as e:
+                    row_errors[row_no] = f"异常{str(e)}"
+        return success_count
+
     @classmethod
     async def get_import_template_user_service(cls) -> bytes:
         """
@@ -608,19 +690,19 @@ class UserService:
         )
 
     @classmethod
-    async def export_user_list_service(cls, user_list: list[dict[str, Any]]) -> bytes:
+    async def export_user_list_service(cls, auth: AuthSchema, search: UserQueryParam | None = None, order_by: list[dict[str, str]] | None = None, export_format: ExportFormat = 'xlsx') -> AsyncIterator[bytes]:
         """
         导出用户列表为Excel文件
         
         参数:
-        - user_list (List[Dict[str, Any]]): 用户列表
+        - auth (AuthSchema): 认证信息模型
+        - search (UserQueryParam | None): 查询参数模型
+        - order_by (list[dict[str, str]] | None): 排序字段列表
+        - export_format (ExportFormat): 导出格式(xlsx/csv/ndjson)
         
         返回:
-        - bytes: Excel文件字节流
+        - AsyncIterator[bytes]: 导出文件字节流
         """
-        if not user_list:
-            raise CustomException(msg="没有数据可导出")
-            
         # 定义字段映射
         mapping_dict = {
             'id': '用户编号',
@@ -640,14 +722,13 @@ class UserService:
             'updated_id': '更新者ID',
         }
 
-        # 复制数据并转换
-        # creator = {'id': 1, 'name': '管理员', 'username': 'admin'}
-        data = user_list.copy()
-        for item in data:
+        def convert(item: dict) -> dict:
             item['status'] = '启用' if item.get('status') == "0" else '停用'
             gender = item.get('gender')
             item['gender'] = '男' if gender == '1' else ('女' if gender == '2' else '未知')
             item['is_superuser'] = '是' if item.get('is_superuser') else '否'
             item['creator'] = item.get('creator', {}).get('name', '未知') if isinstance(item.get('creator'), dict) else '未知'
+            return item
 
-        return ExcelUtil.export_list2excel(list_data=data, mapping_dict=mapping_dict)
+        rows = UserCRUD(auth).stream(search=search.__dict__ if search else None, order_by=order_by, profile="list", out_schema=UserOutSchema)
+        return ExcelUtil.stream_export(rows, mapping_dict=mapping_dict, export_format=export_format, convert=convert)
@@ -46,6 +46,17 @@ class RedisInitKeyConfig(Enum):
     CAPTCHA_CODES = {'key': 'captcha_codes', 'remark': '图片验证码'}
     SYSTEM_CONFIG = {'key': 'system_config', 'remark': '系统配置'}
     SYSTEM_DICT = {'key':'system_dict','remark': '数据字典'}
+    PRINCIPAL = {'key': 'principal', 'remark': '用户权限快照'}
+    ROLE_PERMISSION = {'key': 'role_permission', 'remark': '角色权限索引'}
+    DEPT_CLOSURE = {'key': 'dept_closure', 'remark': '部门闭包'}
+    IP_LOCATION = {'key': 'ip_location', 'remark': 'IP归属地'}
+    KEY_INDEX = {'key': 'key_index', 'remark': '缓存键索引'}
+    ONLINE_SESSION = {'key': 'online_session', 'remark': '在线会话登记'}
+    SYSTEM_CONFIG_VERSION = {'key': 'system_config_version', 'remark': '系统配置版本'}
+    SYSTEM_DICT_VERSION = {'key': 'system_dict_version', 'remark': '数据字典版本'}
+    SYSTEM_MENU_VERSION = {'key': 'system_menu_version', 'remark': '菜单版本'}
+    MENU_TREE = {'key': 'menu_tree', 'remark': '登录菜单树'}
+    PAGE_TOTAL = {'key': 'page_total', 'remark': '分页总数缓存'}
     
     @property
     def key(self) -> str:
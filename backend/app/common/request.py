@@ -14,8 +14,10 @@ class PageResultSchema(BaseModel):
 
     page_no: int | None = Field(default=None, ge=1, description="页码，默认为1")
     page_size: int | None = Field(default=None, ge=1, description="页面大小，默认为10") 
-    total: int = Field(default=0, ge=0, description="总记录数")
+    total: int | None = Field(default=0, ge=0, description="总记录数，不统计时为None")
     has_next: bool | None = Field(default=False, description="是否有下一页")
+    next_cursor: str | None = Field(default=None, description="游标分页的下一页游标")
+    count_mode: str | None = Field(default="exact", description="总数统计方式(exact:精确 estimate:估算 cached:缓存 none:未统计)")
     items: list[Any] = Field(default_factory=list, description="分页后的数据列表")
 
 
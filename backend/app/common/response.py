@@ -5,6 +5,7 @@ from fastapi import status
 from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from starlette.background import BackgroundTask
 from pydantic import Field, BaseModel
+from pydantic_core import to_json
 
 from app.common.constant import RET
 
@@ -17,7 +18,19 @@ class ResponseSchema(BaseModel):
     success: bool = Field(default=True, description='操作是否成功')
 
 
-class SuccessResponse(JSONResponse):
+class FastJSONResponse(JSONResponse):
+    """
+    基于 pydantic-core 的JSON响应类
+
+    直接将 pydantic 模型序列化为字节，不生成中间字典；datetime、Decimal、UUID 等类型由 pydantic-core 原生处理，
+    模型字段上的自定义序列化器(如 DateTimeStr)同样生效。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+class SuccessResponse(FastJSONResponse):
     """成功响应类"""
 
     def __init__(
@@ -47,11 +60,11 @@ class SuccessResponse(JSONResponse):
             data=data,
             status_code=status_code,
             success=success
-        ).model_dump(mode='json')
+        )
         super().__init__(content=content, status_code=status_code)
 
 
-class ErrorResponse(JSONResponse):
+class ErrorResponse(FastJSONResponse):
     """错误响应类"""
 
     def __init__(
@@ -81,7 +94,7 @@ class ErrorResponse(JSONResponse):
             data=data,
             status_code=status_code,
             success=success
-        ).model_dump(mode='json')
+        )
         super().__init__(content=content, status_code=status_code)
 
 
@@ -65,6 +65,10 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 60 * 24 * 1                     # access_token过期时间(秒)1 天
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 60 * 24 * 7                    # refresh_token过期时间(秒)7 天
     TOKEN_TYPE: str = "bearer"                                              # token类型
+    PRINCIPAL_CACHE_EXPIRE_SECONDS: int = 60 * 30                           # 用户权限快照缓存过期时间(秒)30 分钟
+    MENU_TREE_CACHE_EXPIRE_SECONDS: int = 60 * 60 * 24                     # 登录菜单树缓存过期时间(秒)1 天
+    ROLE_PERMISSION_CACHE_EXPIRE_SECONDS: int = 60 * 60 * 24               # 角色权限索引缓存过期时间(秒)1 天
+    DEPT_CLOSURE_CACHE_EXPIRE_SECONDS: int = 60 * 60 * 24                  # 部门闭包缓存过期时间(秒)1 天
     TOKEN_REQUEST_PATH_EXCLUDE: list[str] = [                               # JWT / RBAC 路由白名单
         'api/v1/auth/login',
     ]
@@ -107,6 +111,15 @@ class Settings(BaseSettings):
     REDIS_USER: str = ''
     REDIS_PASSWORD: str = ''
 
+    # ================================================= #
+    # ******************** 密码加密配置 ****************** #
+    # ================================================= #
+    PASSWORD_HASH_ROUNDS: int = 12                                  # bcrypt 加密轮数(调高后旧哈希在登录时自动升级)
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread' # 密码运算池类型
+    PASSWORD_HASH_WORKERS: int = 4                                  # 密码运算池大小
+    PASSWORD_HASH_MAX_PENDING: int = 32                             # 同时提交到运算池的最大任务数
+    PASSWORD_DEFAULT: str = '123456'                                # 批量导入用户的默认密码
+
     # ================================================= #
     # ******************** 验证码配置 ******************* #
     # ================================================= #
@@ -121,13 +134,39 @@ class Settings(BaseSettings):
     OPERATION_LOG_RECORD: bool = True                                                               # 是否记录操作日志
     IGNORE_OPERATION_FUNCTION: List[str] = ["get_captcha_for_login"]                                # 忽略记录的函数
     OPERATION_RECORD_METHOD: List[str] = ["POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]      # 需要记录的请求方法
+    OPERATION_LOG_QUEUE_SIZE: int = 10000                                                           # 日志队列容量(超出后丢弃并计数)
+    OPERATION_LOG_BATCH_SIZE: int = 200                                                             # 单次批量写入条数
+    OPERATION_LOG_FLUSH_INTERVAL: float = 2.0                                                       # 批量写入最大间隔(秒)
+
+    # ================================================= #
+    # ******************* IP归属地配置 ****************** #
+    # ================================================= #
+    IP_LOCATION_DB_PATH: Path = BASE_DIR.joinpath('static/assets/ip/ip_range.db')  # 本地IP段数据库(IpRangeDatabase.build 生成)
+    IP_LOCATION_CACHE_SIZE: int = 4096                                              # 进程内缓存条数
+    IP_LOCATION_CACHE_TTL: int = 60 * 60 * 24                                       # 缓存有效期(秒)
+    IP_LOCATION_NEGATIVE_CACHE_TTL: int = 60 * 5                                    # 解析失败结果的缓存有效期(秒)
+    IP_LOCATION_REMOTE_ENABLE: bool = True                                          # 是否启用远程接口后台补全
+    IP_LOCATION_REMOTE_TIMEOUT: float = 3.0                                         # 远程接口超时(秒)
+    IP_LOCATION_BATCH_TIMEOUT: float = 3.0                                          # 操作日志批次等待归属地解析的总时长(秒)
+
+    # ================================================= #
+    # ***************** 系统配置缓存配置 ***************** #
+    # ================================================= #
+    SYSTEM_CONFIG_CACHE_TTL: float = 5.0    # 变更订阅未运行时比对配置版本号的间隔(秒)
+
+    # ================================================= #
+    # ******************* 分页查询配置 ******************* #
+    # ================================================= #
+    PAGE_TOTAL_CACHE_TTL: int = 30          # 分页总数缓存有效期(秒)，仅 count=cached 时使用
 
     # ================================================= #
-    # ******************* Gzip压缩配置 ******************* #
+    # ******************* 响应压缩配置 ******************* #
     # ================================================= #
-    GZIP_ENABLE: bool = True        # 是否启用Gzip
-    GZIP_MIN_SIZE: int = 1000       # 最小压缩大小(字节)
-    GZIP_COMPRESS_LEVEL: int = 9    # 压缩级别(1-9)
+    GZIP_ENABLE: bool = True                                    # 是否启用响应压缩
+    GZIP_MIN_SIZE: int = 1000                                   # 最小压缩大小(字节)
+    COMPRESSION_ENCODINGS: List[str] = ['zstd', 'br', 'gzip']   # 支持的编码(按优先级，zstd/br 需安装对应依赖)
+    COMPRESSION_LARGE_SIZE: int = 256 * 1024                    # 超过该大小(字节)使用低压缩级别
+    STATIC_PRECOMPRESS: bool = True                             # 启动时为静态文本资源生成 .gz/.br 预压缩文件
 
     # ================================================= #
     # ***************** 静态文件配置 ***************** #
@@ -177,7 +216,7 @@ class Settings(BaseSettings):
         MIDDLEWARES: List[Optional[str]] = [
             "app.core.middlewares.CustomCORSMiddleware" if self.CORS_ORIGIN_ENABLE else None,
             "app.core.middlewares.RequestLogMiddleware" if self.OPERATION_LOG_RECORD else None,
-            "app.core.middlewares.CustomGZipMiddleware" if self.GZIP_ENABLE else None,
+            "app.core.middlewares.CustomCompressionMiddleware" if self.GZIP_ENABLE else None,
         ]
         return MIDDLEWARES
 
@@ -186,6 +225,8 @@ class Settings(BaseSettings):
         """获取事件列表"""
         EVENTS: List[Optional[str]] = [
             "app.core.database.redis_connect" if self.REDIS_ENABLE else None,
+            "app.core.log_writer.operation_log_writer" if self.OPERATION_LOG_RECORD else None,
+            "app.core.config_cache.system_config_listener" if self.REDIS_ENABLE else None,
         ]
         return EVENTS
 
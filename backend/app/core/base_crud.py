@@ -1,16 +1,26 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import json
+import base64
+from datetime import date, datetime
 from pydantic import BaseModel
-from typing import TypeVar, Sequence, Generic, Dict, Any, List, Optional, Type, Union
+from typing import TypeVar, Sequence, Generic, Dict, Any, List, Optional, Type, Union, AsyncIterator
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 from sqlalchemy.engine import Result
-from sqlalchemy import asc, func, select, delete, Select, desc, update, or_, and_
+from sqlalchemy import asc, func, select, delete, insert, Select, desc, update, or_, and_, tuple_, text
 from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.core.base_model import MappedBase
+from app.core.database import after_commit, async_db_session
+from app.utils.common_util import uuid4_str, collect_tree_ids
 from app.core.exceptions import CustomException
 from app.core.permission import Permission
+from app.core.page_cache import PageTotalCache
 from app.core.base_params import PaginationQueryParam
 from app.api.v1.module_system.auth.schema import AuthSchema
 
@@ -37,12 +47,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
         self.auth = auth
     
-    async def get(self, preload: Optional[List[Union[str, Any]]] = None, **kwargs) -> Optional[ModelType]:
+    async def get(self, preload: Optional[List[Union[str, Any]]] = None, profile: Optional[str] = None, **kwargs) -> Optional[ModelType]:
         """
         根据条件获取单个对象
         
         参数:
         - preload (Optional[List[Union[str, Any]]]): 预加载关系，支持关系名字符串或SQLAlchemy loader option
+        - profile (Optional[str]): 预加载配置名称，见模型 __loader_profiles__
         - **kwargs: 查询条件
             
         返回:
@@ -55,7 +66,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             conditions = await self.__build_conditions(**kwargs)
             sql = select(self.model).where(*conditions)
             # 应用可配置的预加载选项
-            for opt in self.__loader_options(preload):
+            for opt in self.__loader_options(preload, profile):
                 sql = sql.options(opt)
             
             sql = await self.__filter_permissions(sql)
@@ -66,7 +77,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"获取查询失败: {str(e)}")
 
-    async def list(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, preload: Optional[List[Union[str, Any]]] = None) -> Sequence[ModelType]:
+    async def list(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, preload: Optional[List[Union[str, Any]]] = None, profile: Optional[str] = None) -> Sequence[ModelType]:
         """
         根据条件获取对象列表
         
@@ -74,6 +85,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         - search (Optional[Dict]): 查询条件,格式为 {'id': value, 'name': value}
         - order_by (Optional[List[Dict[str, str]]]): 排序字段,格式为 [{'id': 'asc'}, {'name': 'desc'}]
         - preload (Optional[List[Union[str, Any]]]): 预加载关系，支持关系名字符串或SQLAlchemy loader option
+        - profile (Optional[str]): 预加载配置名称，见模型 __loader_profiles__
             
         返回:
         - Sequence[ModelType]: 对象列表
@@ -86,7 +98,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             order = order_by or [{'id': 'asc'}]
             sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
             # 应用可配置的预加载选项
-            for opt in self.__loader_options(preload):
+            for opt in self.__loader_options(preload, profile):
                 sql = sql.options(opt)
             sql = await self.__filter_permissions(sql)
             result: Result = await self.auth.db.execute(sql)
@@ -94,6 +106,48 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"列表查询失败: {str(e)}")
 
+    async def stream(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, preload: Optional[List[Union[str, Any]]] = None, profile: Optional[str] = None, out_schema: Optional[Type[OutSchemaType]] = None, chunk_size: int = 1000) -> AsyncIterator[List[Any]]:
+        """
+        按块流式读取对象列表(服务端游标)，内存占用与块大小相关、与结果集大小无关
+        
+        使用独立数据库会话：StreamingResponse 在请求依赖(及其会话)释放后才消费数据。
+        每块处理完成后从会话中移除已读取对象。
+        
+        参数:
+        - search (Optional[Dict]): 查询条件
+        - order_by (Optional[List[Dict[str, str]]]): 排序字段
+        - preload (Optional[List[Union[str, Any]]]): 预加载关系
+        - profile (Optional[str]): 预加载配置名称，见模型 __loader_profiles__
+        - out_schema (Optional[Type[OutSchemaType]]): 输出数据模型，指定时每块为字典列表，否则为对象列表
+        - chunk_size (int): 每块行数
+            
+        返回:
+        - AsyncIterator[List[Any]]: 数据块迭代器
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        async with async_db_session() as session:
+            crud = copy.copy(self)
+            crud.auth = self.auth.model_copy(update={"db": session})
+            try:
+                conditions = await crud.__build_conditions(**search) if search else []
+                order = order_by or [{'id': 'asc'}]
+                sql = select(self.model).where(*conditions).order_by(*crud.__order_by(order))
+                for opt in crud.__loader_options(preload, profile):
+                    sql = sql.options(opt)
+                sql = await crud.__filter_permissions(sql)
+                result = await session.stream_scalars(sql.execution_options(yield_per=chunk_size))
+            except CustomException:
+                raise
+            except Exception as e:
+                raise CustomException(msg=f"流式查询失败: {str(e)}")
+
+            async for partition in result.partitions():
+                objs = list(partition)
+                yield [out_schema.model_validate(obj).model_dump() for obj in objs] if out_schema else objs
+                session.expunge_all()
+
     async def tree_list(self, search: Optional[Dict] = None, order_by: Optional[List[Dict[str, str]]] = None, children_attr: str = 'children', preload: Optional[List[Union[str, Any]]] = None) -> Sequence[ModelType]:
         """
         获取树形结构数据列表
@@ -134,15 +188,19 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"树形列表查询失败: {str(e)}")
     
-    async def page(self, page: PaginationQueryParam, search: Dict, out_schema: Type[OutSchemaType], preload: Optional[List[Union[str, Any]]] = None) -> Dict:
+    async def page(self, page: PaginationQueryParam, search: Dict, out_schema: Type[OutSchemaType], preload: Optional[List[Union[str, Any]]] = None, profile: Optional[str] = None) -> Dict:
         """
         获取分页数据
         
+        page.mode 为 cursor 时按 (首个排序字段, id) 做键集分页，返回 next_cursor，翻页耗时与页深无关；
+        page.count 控制总数统计方式(exact/estimate/cached/none)，返回的 count_mode 为实际使用的方式(缓存命中时为 cached)。
+        
         参数:
         - page (PaginationQueryParam): 分页查询参数模型
         - search (Dict): 查询条件
         - out_schema (Type[OutSchemaType]): 输出数据模型
         - preload (Optional[List[Union[str, Any]]]): 预加载关系
+        - profile (Optional[str]): 预加载配置名称，见模型 __loader_profiles__
             
         返回:
         - Dict: 分页数据
@@ -152,42 +210,47 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         try:
             conditions = await self.__build_conditions(**search) if search else []
-            order = page.order_by or [{'id': 'asc'}]
-            sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
+            cursor_mode = page.mode == 'cursor' and page.page_size > 0
+            if cursor_mode:
+                cursor_field, cursor_direction = self.__cursor_order(page.order_by)
+                order_columns = self.__order_by([{cursor_field: cursor_direction}, {'id': cursor_direction}])
+            else:
+                order_columns = self.__order_by(page.order_by or [{'id': 'asc'}])
+            sql = select(self.model).where(*conditions).order_by(*order_columns)
             # 应用预加载选项
-            for opt in self.__loader_options(preload):
+            for opt in self.__loader_options(preload, profile):
                 sql = sql.options(opt)
             sql = await self.__filter_permissions(sql)
 
             # 获取总数
-            count_sql = select(func.count()).select_from(self.model)
-            if conditions:
-                count_sql = count_sql.where(*conditions)
-            count_sql = await self.__filter_permissions(count_sql)
-            
-            total_result = await self.auth.db.execute(count_sql)
-            total = total_result.scalar() or 0
+            total, count_mode = await self.__count(conditions, page.count)
 
-            # 获取分页数据
-            offset = (page.page_no - 1) * page.page_size
-            limit = page.page_size
-            has_next = False
-
-            # page_size = -1 表示不分页，获取所有数据
-            if page.page_size > 0:
-                sql = sql.limit(limit).offset(offset)
-                has_next = offset + limit < total
+            # page_size = -1 表示不分页，获取所有数据；多取一条用于判断是否有下一页
+            if cursor_mode:
+                if page.cursor:
+                    sql = sql.where(self.__cursor_condition(cursor_field, cursor_direction, page.cursor))
+                sql = sql.limit(page.page_size + 1)
+            elif page.page_size > 0:
+                sql = sql.limit(page.page_size + 1).offset((page.page_no - 1) * page.page_size)
 
             result: Result = await self.auth.db.execute(sql)
-            objs = result.scalars().all()
+            objs = list(result.scalars().all())
+            has_next = page.page_size > 0 and len(objs) > page.page_size
+            if has_next:
+                objs = objs[:page.page_size]
 
             return {
                 "page_no": page.page_no,
                 "page_size": page.page_size,
                 "total": total,
                 "has_next": has_next,
+                "next_cursor": self.__encode_cursor(cursor_field, objs[-1]) if cursor_mode and has_next else None,
+                "count_mode": count_mode,
+                # 返回字典，调用方(含代码生成模板)按键读取与修改分页数据
                 "items": [out_schema.model_validate(obj).model_dump() for obj in objs]
             }
+        except CustomException:
+            raise
         except Exception as e:
             raise CustomException(msg=f"分页查询失败: {str(e)}")
     
@@ -218,6 +281,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             self.auth.db.add(obj)
             await self.auth.db.flush()
             await self.auth.db.refresh(obj)
+            await self.__invalidate_totals()
             return obj
         except Exception as e:
             raise CustomException(msg=f"创建失败: {str(e)}")
@@ -253,6 +317,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                     
             await self.auth.db.flush()
             await self.auth.db.refresh(obj)
+            await self.__invalidate_totals()
             return obj
         except Exception as e:
             raise CustomException(msg=f"更新失败: {str(e)}")
@@ -277,6 +342,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             sql = delete(self.model).where(pk_cols[0].in_(ids))
             await self.auth.db.execute(sql)
             await self.auth.db.flush()
+            await self.__invalidate_totals()
         except Exception as e:
             raise CustomException(msg=f"删除失败: {str(e)}")
 
@@ -291,6 +357,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             sql = delete(self.model)
             await self.auth.db.execute(sql)
             await self.auth.db.flush()
+            await self.__invalidate_totals()
         except Exception as e:
             raise CustomException(msg=f"清空失败: {str(e)}")
 
@@ -315,9 +382,520 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             sql = update(self.model).where(pk_cols[0].in_(ids)).values(**kwargs)
             await self.auth.db.execute(sql)
             await self.auth.db.flush()
+            await self.__invalidate_totals()
         except Exception as e:
             raise CustomException(msg=f"批量更新失败: {str(e)}")
 
+    async def exist_ids(self, ids: List[int]) -> List[int]:
+        """
+        批量查询存在的对象ID
+        
+        参数:
+        - ids (List[int]): 对象ID列表
+            
+        返回:
+        - List[int]: 存在的对象ID列表
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        if not ids:
+            return []
+        try:
+            sql = await self.__filter_permissions(select(self.model.id).where(self.model.id.in_(ids)))
+            result = await self.auth.db.execute(sql)
+            return list(result.scalars().all())
+        except Exception as e:
+            raise CustomException(msg=f"查询失败: {str(e)}")
+
+    async def has_children(self, ids: List[int], parent_attr: str = 'parent_id') -> bool:
+        """
+        判断节点是否存在子节点(仅统计数据权限范围内的子节点)
+        
+        参数:
+        - ids (List[int]): 节点ID列表
+        - parent_attr (str): 父节点ID字段名
+            
+        返回:
+        - bool: 任一节点存在子节点时返回True
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        if not ids:
+            return False
+        try:
+            sql = select(self.model.id).where(getattr(self.model, parent_attr).in_(ids)).limit(1)
+            result = await self.auth.db.execute(await self.__filter_permissions(sql))
+            return result.first() is not None
+        except Exception as e:
+            raise CustomException(msg=f"查询失败: {str(e)}")
+
+    async def hierarchy_ids(self, ids: List[int], direction: str = 'descendants', parent_attr: str = 'parent_id') -> List[int]:
+        """
+        获取节点及其全部祖先或后代节点ID(含自身，不存在的ID忽略)
+        
+        支持递归CTE的数据库(MySQL 8+/MariaDB 10.2+/PostgreSQL/SQLite)使用一次递归查询，
+        否则只查询 id/parent_id 两列并在内存中迭代遍历。两种方式在层级存在环路时均可终止。
+        与列表查询一致只遍历数据权限范围内的节点，范围外的节点及经由它才能到达的节点不在结果中。
+        
+        参数:
+        - ids (List[int]): 起始节点ID列表
+        - direction (str): ancestors 祖先；descendants 后代
+        - parent_attr (str): 父节点ID字段名
+            
+        返回:
+        - List[int]: 节点ID列表
+            
+        异常:
+        - CustomException: 查询失败时抛出异常
+        """
+        if not ids:
+            return []
+        try:
+            id_col = self.model.id
+            parent_col = getattr(self.model, parent_attr)
+            if not self.__supports_recursive_cte():
+                result = await self.auth.db.execute(await self.__filter_permissions(select(id_col, parent_col)))
+                return collect_tree_ids(ids, dict(result.all()), direction)
+
+            anchor = await self.__filter_permissions(
+                select(id_col.label('id'), parent_col.label('parent_id')).where(id_col.in_(ids))
+            )
+            nodes = anchor.cte('hierarchy_nodes', recursive=True)
+            if direction == 'ancestors':
+                step = select(id_col, parent_col).join(nodes, id_col == nodes.c.parent_id)
+            else:
+                step = select(id_col, parent_col).join(nodes, parent_col == nodes.c.id)
+            # UNION 去重，层级存在环路时递归在重复行处终止
+            nodes = nodes.union(await self.__filter_permissions(step))
+            result = await self.auth.db.execute(select(nodes.c.id))
+            return list(dict.fromkeys(result.scalars().all()))
+        except Exception as e:
+            raise CustomException(msg=f"层级查询失败: {str(e)}")
+
+    async def bulk_create(self, rows: List[Dict], chunk_size: int = 1000, return_ids: bool = True) -> List[int]:
+        """
+        批量创建对象(分块多行 INSERT，不逐行 refresh)
+        
+        自动补全 uuid、创建/更新时间及创建人/更新人字段(行内已提供的值优先)。
+        支持 RETURNING 的数据库直接返回主键；MySQL 按 uuid 回查主键。
+        同一批次的行应包含相同的字段。
+        
+        参数:
+        - rows (List[Dict]): 对象字段字典列表
+        - chunk_size (int): 每条 INSERT 语句的最大行数
+        - return_ids (bool): 是否返回主键，为False时返回空列表
+            
+        返回:
+        - List[int]: 按输入顺序排列的新对象主键列表
+            
+        异常:
+        - CustomException: 创建失败时抛出异常
+        """
+        if not rows:
+            return []
+        try:
+            pk = self.__primary_key()
+            dialect = self.auth.db.get_bind().dialect
+            use_returning = return_ids and dialect.insert_returning and dialect.insert_executemany_returning
+            values = self.__fill_audit_fields(rows, create=True)
+            ids: List[int] = []
+            for i in range(0, len(values), chunk_size):
+                chunk = values[i:i + chunk_size]
+                if use_returning:
+                    result = await self.auth.db.execute(
+                        insert(self.model).returning(pk, sort_by_parameter_order=True), chunk
+                    )
+                    ids.extend(result.scalars().all())
+                    continue
+                result = await self.auth.db.execute(insert(self.model).values(chunk))
+                if not return_ids:
+                    continue
+                if hasattr(self.model, 'uuid'):
+                    uuids = [row['uuid'] for row in chunk]
+                    id_result = await self.auth.db.execute(select(self.model.uuid, pk).where(self.model.uuid.in_(uuids)))
+                    id_map = dict(id_result.all())
+                    ids.extend(id_map[uuid] for uuid in uuids)
+                else:
+                    # 单条多行 INSERT 的自增主键连续分配，lastrowid 为首行主键
+                    first_id = result.lastrowid
+                    ids.extend(range(first_id, first_id + len(chunk)))
+            await self.__invalidate_totals()
+            return ids
+        except Exception as e:
+            raise CustomException(msg=f"批量创建失败: {str(e)}")
+
+    async def bulk_update(self, rows: List[Dict], chunk_size: int = 1000) -> List[int]:
+        """
+        按主键批量更新对象(每行使用各自的值，不逐行查询和 refresh)
+        
+        与 update 一致受数据权限限制：存在数据权限条件时每块先查询一次可见主键，
+        权限范围外(或不存在)的行被跳过，不出现在返回值中。
+        
+        参数:
+        - rows (List[Dict]): 包含主键的对象字段字典列表
+        - chunk_size (int): 每次 executemany 的最大行数
+            
+        返回:
+        - List[int]: 已更新对象的主键列表
+            
+        异常:
+        - CustomException: 更新失败时抛出异常
+        """
+        if not rows:
+            return []
+        try:
+            pk = self.__primary_key()
+            if any(pk.key not in row for row in rows):
+                raise CustomException(msg=f"批量更新的每行数据必须包含主键 {pk.key}")
+            values = self.__fill_audit_fields(rows, create=False)
+            ids: List[int] = []
+            for i in range(0, len(values), chunk_size):
+                chunk = values[i:i + chunk_size]
+                visible = await self.__visible_ids([row[pk.key] for row in chunk])
+                if visible is not None:
+                    chunk = [row for row in chunk if row[pk.key] in visible]
+                if not chunk:
+                    continue
+                await self.auth.db.execute(update(self.model), chunk)
+                ids.extend(row[pk.key] for row in chunk)
+            await self.__invalidate_totals()
+            return ids
+        except Exception as e:
+            raise CustomException(msg=f"批量更新失败: {str(e)}")
+
+    async def upsert(self, rows: List[Dict], index_elements: List[str], update_fields: Optional[List[str]] = None, chunk_size: int = 1000) -> List[int]:
+        """
+        批量插入或更新对象
+        
+        MySQL 使用 ON DUPLICATE KEY UPDATE，PostgreSQL/SQLite 使用 ON CONFLICT DO UPDATE。
+        冲突时保留原有的主键、uuid、创建时间和创建人。
+        存在数据权限条件时，唯一键命中权限范围外已有对象的行被跳过，不会覆盖该对象。
+        
+        参数:
+        - rows (List[Dict]): 对象字段字典列表
+        - index_elements (List[str]): 判定冲突的唯一键字段(MySQL 依赖表上对应的唯一索引)
+        - update_fields (Optional[List[str]]): 冲突时更新的字段，默认更新行内除唯一键外的全部字段
+        - chunk_size (int): 每条语句的最大行数
+            
+        返回:
+        - List[int]: 按输入顺序排列的对象主键列表
+            
+        异常:
+        - CustomException: 数据库不支持或写入失败时抛出异常
+        """
+        if not rows:
+            return []
+        try:
+            pk = self.__primary_key()
+            dialect_name = self.auth.db.get_bind().dialect.name
+            values = self.__fill_audit_fields(rows, create=True)
+            if update_fields is None:
+                keep = {pk.key, 'uuid', 'created_time', 'created_id', *index_elements}
+                update_fields = [key for key in rows[0].keys() if key not in keep]
+            update_fields = list(dict.fromkeys([*update_fields, *(f for f in ('updated_time', 'updated_id') if hasattr(self.model, f))]))
+            
+            ids: List[int] = []
+            for i in range(0, len(values), chunk_size):
+                chunk = await self.__drop_hidden_conflicts(values[i:i + chunk_size], index_elements)
+                if not chunk:
+                    continue
+                if dialect_name == 'mysql':
+                    stmt = mysql_insert(self.model).values(chunk)
+                    stmt = stmt.on_duplicate_key_update({field: stmt.inserted[field] for field in update_fields})
+                    await self.auth.db.execute(stmt)
+                    ids.extend(await self.__ids_by_keys(chunk, index_elements))
+                elif dialect_name in ('postgresql', 'sqlite'):
+                    dialect_insert = postgresql_insert if dialect_name == 'postgresql' else sqlite_insert
+                    stmt = dialect_insert(self.model).values(chunk)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=index_elements,
+                        set_={field: stmt.excluded[field] for field in update_fields}
+                    ).returning(pk)
+                    result = await self.auth.db.execute(stmt)
+                    ids.extend(result.scalars().all())
+                else:
+                    raise CustomException(msg=f"数据库 {dialect_name} 不支持批量插入或更新")
+            await self.__invalidate_totals()
+            return ids
+        except Exception as e:
+            raise CustomException(msg=f"批量插入或更新失败: {str(e)}")
+
+    def __primary_key(self) -> Any:
+        """
+        获取模型的单列主键
+        
+        返回:
+        - Any: 主键列
+            
+        异常:
+        - CustomException: 模型缺少主键或为复合主键时抛出异常
+        """
+        pk_cols = list(getattr(sa_inspect(self.model), "primary_key", []))
+        if not pk_cols:
+            raise CustomException(msg="模型缺少主键")
+        if len(pk_cols) > 1:
+            raise CustomException(msg="暂不支持复合主键的批量操作")
+        return pk_cols[0]
+
+    def __fill_audit_fields(self, rows: List[Dict], create: bool) -> List[Dict]:
+        """
+        补全批量写入所需的通用字段，行内已提供的值优先
+        
+        参数:
+        - rows (List[Dict]): 对象字段字典列表
+        - create (bool): 是否为新增，新增时补全 uuid、创建时间与创建人
+            
+        返回:
+        - List[Dict]: 补全后的字段字典列表(新列表，不修改入参)
+        """
+        now = datetime.now()
+        user_id = self.auth.user.id if self.auth.user else None
+        defaults: Dict[str, Any] = {}
+        if hasattr(self.model, 'updated_time'):
+            defaults['updated_time'] = now
+        if user_id is not None and hasattr(self.model, 'updated_id'):
+            defaults['updated_id'] = user_id
+        if create:
+            if hasattr(self.model, 'created_time'):
+                defaults['created_time'] = now
+            if user_id is not None and hasattr(self.model, 'created_id'):
+                defaults['created_id'] = user_id
+        has_uuid = create and hasattr(self.model, 'uuid')
+        values = []
+        for row in rows:
+            value = {**defaults, **row}
+            if has_uuid and not value.get('uuid'):
+                value['uuid'] = uuid4_str()
+            values.append(value)
+        return values
+
+    async def __visible_ids(self, ids: List[Any]) -> Optional[set]:
+        """
+        查询数据权限范围内的主键
+        
+        参数:
+        - ids (List[Any]): 主键列表
+            
+        返回:
+        - Optional[set]: 可见的主键集合，无数据权限条件时返回None(不额外查询)
+        """
+        pk = self.__primary_key()
+        sql = select(pk).where(pk.in_(ids))
+        filtered = await self.__filter_permissions(sql)
+        # 无数据权限条件时 filter_query 原样返回查询
+        if filtered is sql:
+            return None
+        result = await self.auth.db.execute(filtered)
+        return set(result.scalars().all())
+
+    async def __drop_hidden_conflicts(self, rows: List[Dict], index_elements: List[str]) -> List[Dict]:
+        """
+        剔除唯一键命中数据权限范围外已有对象的行(用于 upsert)
+        
+        参数:
+        - rows (List[Dict]): 对象字段字典列表
+        - index_elements (List[str]): 唯一键字段
+            
+        返回:
+        - List[Dict]: 可写入的行
+        """
+        columns = [getattr(self.model, key) for key in index_elements]
+        keys = [tuple(row[key] for key in index_elements) for row in rows]
+        condition = columns[0].in_([key[0] for key in keys]) if len(columns) == 1 else tuple_(*columns).in_(keys)
+        sql = select(*columns).where(condition)
+        filtered = await self.__filter_permissions(sql)
+        if filtered is sql:
+            return rows
+        existing = {tuple(row) for row in (await self.auth.db.execute(sql)).all()}
+        visible = {tuple(row) for row in (await self.auth.db.execute(filtered)).all()}
+        hidden = existing - visible
+        return [row for row, key in zip(rows, keys) if key not in hidden]
+
+    async def __ids_by_keys(self, rows: List[Dict], index_elements: List[str]) -> List[int]:
+        """
+        按唯一键回查主键(用于不支持 RETURNING 的数据库)
+        
+        参数:
+        - rows (List[Dict]): 对象字段字典列表
+        - index_elements (List[str]): 唯一键字段
+            
+        返回:
+        - List[int]: 按输入顺序排列的主键列表
+        """
+        pk = self.__primary_key()
+        columns = [getattr(self.model, key) for key in index_elements]
+        keys = [tuple(row[key] for key in index_elements) for row in rows]
+        if len(columns) == 1:
+            condition = columns[0].in_([key[0] for key in keys])
+        else:
+            condition = tuple_(*columns).in_(keys)
+        result = await self.auth.db.execute(select(pk, *columns).where(condition))
+        id_map = {tuple(row[1:]): row[0] for row in result.all()}
+        return [id_map[key] for key in keys if key in id_map]
+
+    async def __count(self, conditions: List[ColumnElement], mode: str) -> tuple[Optional[int], str]:
+        """
+        统计分页总数
+        
+        统计查询不带预加载与排序，数据权限的关系条件改写为连接(见 Permission.filter_count_query)。
+        
+        参数:
+        - conditions (List[ColumnElement]): 查询条件
+        - mode (str): exact 精确统计；estimate 无过滤条件时读取表统计信息；cached 短时间内复用相同条件的精确总数；none 不统计
+            
+        返回:
+        - tuple[Optional[int], str]: (总数, 实际使用的统计方式: exact/estimate/cached/none)
+        """
+        if mode == 'none':
+            return None, 'none'
+        count_sql = select(func.count()).select_from(self.model)
+        if conditions:
+            count_sql = count_sql.where(*conditions)
+        count_sql = await Permission(model=self.model, auth=self.auth).filter_count_query(count_sql)
+        # 存在查询条件或数据权限过滤时估算值不可用，退回精确统计
+        if mode == 'estimate' and count_sql.whereclause is None:
+            estimated = await self.__estimate_count()
+            if estimated is not None:
+                return estimated, 'estimate'
+        # 未提供Redis客户端时退回精确统计
+        redis = self.auth.redis if mode == 'cached' else None
+        if redis is not None:
+            digest = PageTotalCache.digest(count_sql, self.auth.db.get_bind().dialect)
+            cached = await PageTotalCache.get(redis, self.model.__tablename__, digest)
+            if cached is not None:
+                return cached, 'cached'
+        total_result = await self.auth.db.execute(count_sql)
+        total = total_result.scalar() or 0
+        if redis is not None:
+            await PageTotalCache.set(redis, self.model.__tablename__, digest, total)
+        return total, 'exact'
+
+    async def __estimate_count(self) -> Optional[int]:
+        """
+        读取数据库统计信息中的表行数估算值
+        
+        返回:
+        - Optional[int]: 估算行数，数据库不支持或尚无统计信息时返回None
+        """
+        dialect_name = self.auth.db.get_bind().dialect.name
+        if dialect_name == 'mysql':
+            sql = text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table")
+        elif dialect_name == 'postgresql':
+            sql = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)")
+        else:
+            return None
+        result = await self.auth.db.execute(sql, {"table": self.model.__tablename__})
+        estimated = result.scalar()
+        # PostgreSQL 未 ANALYZE 的表 reltuples 为 -1
+        return int(estimated) if estimated is not None and estimated >= 0 else None
+
+    def __supports_recursive_cte(self) -> bool:
+        """
+        判断当前数据库是否支持递归CTE
+        
+        返回:
+        - bool: 是否支持
+        """
+        dialect = self.auth.db.get_bind().dialect
+        if dialect.name == 'mysql':
+            version = dialect.server_version_info or ()
+            return version >= ((10, 2) if getattr(dialect, 'is_mariadb', False) else (8,))
+        return dialect.name in ('postgresql', 'sqlite')
+
+    def __cursor_order(self, order_by: Optional[List[Dict[str, str]]]) -> tuple[str, str]:
+        """
+        取游标分页的排序字段与方向(仅使用首个排序字段，id 作为同值时的次级排序)
+        
+        排序字段须为非空列，且取值可编码进游标(整数/浮点/文本/布尔/日期时间)：
+        可空列的 NULL 无法用比较条件定位，Decimal 等类型无法写入JSON游标。
+        
+        参数:
+        - order_by (Optional[List[Dict[str, str]]]): 排序字段列表
+            
+        返回:
+        - tuple[str, str]: (排序字段, asc/desc)
+            
+        异常:
+        - CustomException: 排序字段不支持游标分页时抛出异常
+        """
+        if not order_by:
+            return 'id', 'asc'
+        field, direction = next(iter(order_by[0].items()))
+        column = self.model.__table__.columns.get(field)
+        try:
+            python_type = column.type.python_type if column is not None else None
+        except NotImplementedError:
+            python_type = None
+        if column is None or column.nullable or python_type not in (int, float, str, bool, datetime, date):
+            raise CustomException(msg=f"字段 {field} 不支持游标分页，请按非空的数值、文本或时间字段排序")
+        return field, 'desc' if direction.lower() == 'desc' else 'asc'
+
+    def __encode_cursor(self, field: str, obj: ModelType) -> str:
+        """
+        生成指向对象之后位置的不透明游标
+        
+        参数:
+        - field (str): 排序字段
+        - obj (ModelType): 当前页最后一个对象
+            
+        返回:
+        - str: base64url 编码的游标
+        """
+        value = getattr(obj, field)
+        kind = None
+        if isinstance(value, (datetime, date)):
+            kind = 'datetime' if isinstance(value, datetime) else 'date'
+            value = value.isoformat()
+        payload = json.dumps({"f": field, "v": value, "k": kind, "id": obj.id}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def __cursor_condition(self, field: str, direction: str, cursor: str) -> ColumnElement:
+        """
+        将游标解析为 (排序字段, id) 的定位条件
+        
+        参数:
+        - field (str): 排序字段
+        - direction (str): 排序方向 asc/desc
+        - cursor (str): 上一页返回的游标
+            
+        返回:
+        - ColumnElement: 定位条件
+            
+        异常:
+        - CustomException: 游标无效或与排序字段不一致时抛出异常
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            value, last_id = payload["v"], payload["id"]
+            if payload.get("k") == 'datetime':
+                value = datetime.fromisoformat(value)
+            elif payload.get("k") == 'date':
+                value = date.fromisoformat(value)
+        except Exception:
+            raise CustomException(msg="无效的分页游标")
+        if payload.get("f") != field:
+            raise CustomException(msg="分页游标与排序字段不一致")
+
+        pk = getattr(self.model, 'id')
+        if field == 'id':
+            return pk < last_id if direction == 'desc' else pk > last_id
+        column = getattr(self.model, field)
+        if direction == 'desc':
+            return or_(column < value, and_(column == value, pk < last_id))
+        return or_(column > value, and_(column == value, pk > last_id))
+
+    async def __invalidate_totals(self) -> None:
+        """
+        登记事务提交后删除当前模型的分页总数缓存(写操作后调用)
+        
+        提交前删除会让并发的 count=cached 读取把提交前的总数重新写入缓存。
+        AuthSchema 未提供 redis 的写入不失效缓存，最多在 PAGE_TOTAL_CACHE_TTL 秒内读到旧总数。
+        """
+        if self.auth.redis is not None:
+            after_commit(self.auth.db, PageTotalCache.invalidate, self.auth.redis, self.model.__tablename__)
+
     async def __filter_permissions(self, sql: Select) -> Select:
         """
         过滤数据权限（仅用于Select）。
@@ -391,38 +969,81 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 columns.append(desc(column) if direction.lower() == 'desc' else asc(column))
         return columns
 
-    def __loader_options(self, preload: Optional[List[Union[str, Any]]] = None) -> List[Any]:
+    def __loader_options(self, preload: Optional[List[Union[str, Any]]] = None, profile: Optional[str] = None) -> List[Any]:
         """
         构建预加载选项
         
+        未指定 profile 时合并模型默认加载项(__loader_options__)与 preload；
+        指定 profile 时只加载配置中声明的关系(支持 "roles.menus" 形式的嵌套路径)，
+        其余关系一律 raiseload，防止经由 lazy="selectin" 的关系图级联加载。
+        
         参数:
         - preload (Optional[List[Union[str, Any]]]): 预加载关系，支持关系名字符串或SQLAlchemy loader option
+        - profile (Optional[str]): 预加载配置名称，见模型 __loader_profiles__
             
         返回:
         - List[Any]: 预加载选项列表
+        
+        异常:
+        - CustomException: 预加载配置不存在时抛出异常
         """
         options = []
-        # 获取模型定义的默认加载选项
-        model_loader_options = getattr(self.model, '__loader_options__', [])
-        
+        strict = profile is not None
+        if strict:
+            model_profiles = getattr(self.model, '__loader_profiles__', {})
+            if profile not in model_profiles:
+                raise CustomException(msg=f"{self.model.__name__} 未定义预加载配置: {profile}")
+            all_preloads = list(model_profiles[profile])
+            # 未声明的关系禁止隐式加载
+            options.append(raiseload('*', sql_only=True))
+        else:
+            # 获取模型定义的默认加载选项
+            all_preloads = list(getattr(self.model, '__loader_options__', []))
+
         # 合并所有需要预加载的选项
-        all_preloads = set(model_loader_options)
         if preload:
-            for opt in preload:
-                if isinstance(opt, str):
-                    all_preloads.add(opt)
-        elif preload == []:
+            all_preloads.extend(preload)
+        elif preload == [] and not strict:
             # 如果明确指定空列表，则不使用任何预加载
-            all_preloads = set()
+            all_preloads = []
         
         # 处理所有预加载选项
+        seen = set()
         for opt in all_preloads:
             if isinstance(opt, str):
-                # 使用selectinload来避免在异步环境中的MissingGreenlet错误
-                if hasattr(self.model, opt):
-                    options.append(selectinload(getattr(self.model, opt)))
+                if opt in seen:
+                    continue
+                seen.add(opt)
+                loader = self.__relationship_loader(opt, strict=strict)
+                if loader is not None:
+                    options.append(loader)
             else:
                 # 直接使用非字符串的加载选项
                 options.append(opt)
                 
         return options
+
+    def __relationship_loader(self, path: str, strict: bool = False) -> Optional[Any]:
+        """
+        根据关系路径构建 selectinload 链
+        
+        参数:
+        - path (str): 关系路径，如 "roles" 或 "roles.menus"
+        - strict (bool): 是否对路径末端对象的其余关系启用 raiseload
+            
+        返回:
+        - Optional[Any]: 加载选项，路径无效时返回None
+        """
+        model = self.model
+        loader = None
+        for name in path.split('.'):
+            attr = getattr(model, name, None)
+            prop = getattr(attr, 'property', None)
+            if prop is None or not hasattr(prop, 'mapper'):
+                return None
+            # 使用selectinload来避免在异步环境中的MissingGreenlet错误
+            loader = selectinload(attr) if loader is None else loader.selectinload(attr)
+            model = prop.mapper.class_
+        if strict and loader is not None:
+            loader = loader.raiseload('*', sql_only=True)
+        return loader
@@ -11,6 +11,9 @@ class PaginationQueryParam:
         page_no: int = Query(default=1, description="当前页码", ge=1),
         page_size: int = Query(default=10, description="每页数量", le=100), 
         order_by: str | None = Query(default=None, description="排序字段,格式:field1,asc;field2,desc"),
+        mode: str = Query(default="offset", pattern="^(offset|cursor)$", description="分页模式: offset(页码) / cursor(游标)"),
+        cursor: str | None = Query(default=None, description="游标分页时上一页返回的 next_cursor，首页不传"),
+        count: str = Query(default="exact", pattern="^(exact|estimate|cached|none)$", description="总数统计: exact(精确) / estimate(估算) / cached(短时缓存) / none(不统计)"),
     ) -> None:
         """
         初始化分页查询参数。
@@ -19,14 +22,21 @@ class PaginationQueryParam:
         - page_no (int | None): 当前页码，默认 None。
         - page_size (int | None): 每页数量，默认 None，最大 100。
         - order_by (str | None): 排序字段，格式 'field,asc;field2,desc'。
+        - mode (str): 分页模式，cursor 模式按 (排序字段, id) 定位，不使用 OFFSET。
+        - cursor (str | None): 游标分页时上一页返回的 next_cursor。
+        - count (str): 总数统计方式，estimate 仅在无过滤条件时使用表统计信息，cached 短时间内复用相同条件的精确总数。
         
         返回:
         - None
         """
         self.page_no = page_no
         self.page_size = page_size
+        # 直接实例化(非依赖注入)时未传入的参数为 Query 对象，按默认值处理
+        self.mode = mode if isinstance(mode, str) else "offset"
+        self.cursor = cursor if isinstance(cursor, str) and cursor else None
+        self.count = count if isinstance(count, str) else "exact"
         # 将字符串格式的order_by转换为服务层需要的List[Dict[str, str]]格式
-        if order_by:
+        if isinstance(order_by, str) and order_by:
             try:
                 self.order_by = []
                 for item in order_by.split(';'):
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import asyncio
+import ipaddress
+from fastapi import FastAPI
+from redis.asyncio.client import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+
+
+class IpMatcher:
+    """
+    IP/网段匹配器
+
+    单个IP存入集合；网段按(IP版本, 前缀长度)分组存储网络地址，
+    匹配时对每种前缀长度做一次掩码与集合查找，耗时只与不同前缀长度的数量有关。
+    """
+
+    def __init__(self, entries: list[str] | None = None) -> None:
+        """
+        编译IP/网段列表
+
+        参数:
+        - entries (list[str] | None): IP或CIDR网段列表，无效项忽略
+        """
+        self.addresses: set[str] = set()
+        self.networks: dict[tuple[int, int], set[int]] = {}
+        for entry in entries or []:
+            entry = str(entry).strip()
+            if not entry:
+                continue
+            if '/' not in entry:
+                self.addresses.add(entry)
+                continue
+            try:
+                network = ipaddress.ip_network(entry, strict=False)
+            except ValueError:
+                log.error(f"无效的IP网段配置: {entry}")
+                continue
+            self.networks.setdefault((network.version, network.prefixlen), set()).add(int(network.network_address))
+
+    def __contains__(self, ip: str | None) -> bool:
+        if not ip:
+            return False
+        if ip in self.addresses:
+            return True
+        if not self.networks:
+            return False
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        value = int(address)
+        width = address.max_prefixlen
+        for (version, prefixlen), networks in self.networks.items():
+            if version != address.version:
+                continue
+            mask = ((1 << prefixlen) - 1) << (width - prefixlen)
+            if value & mask in networks:
+                return True
+        return False
+
+
+class PathMatcher:
+    """
+    接口路径匹配器
+
+    普通路径精确匹配；以 * 结尾的路径按前缀匹配。
+    """
+
+    def __init__(self, entries: list[str] | None = None) -> None:
+        """
+        编译路径列表
+
+        参数:
+        - entries (list[str] | None): 路径列表
+        """
+        paths = [str(entry).strip() for entry in entries or [] if str(entry).strip()]
+        self.exact: frozenset[str] = frozenset(path for path in paths if not path.endswith('*'))
+        self.prefixes: tuple[str, ...] = tuple(path.rstrip('*') for path in paths if path.endswith('*'))
+
+    def __contains__(self, path: str | None) -> bool:
+        if not path:
+            return False
+        return path in self.exact or (bool(self.prefixes) and path.startswith(self.prefixes))
+
+
+class SystemConfigSnapshot:
+    """中间件使用的系统配置快照(已预编译)"""
+
+    def __init__(self, version: int = 0, config: dict | None = None) -> None:
+        """
+        由 SystemConfigCache.fetch 的结果构建快照
+
+        参数:
+        - version (int): 配置版本号
+        - config (dict | None): 系统配置字典
+        """
+        config = config or {}
+        self.version = version
+        self.demo_enable: bool = str(config.get("demo_enable", False)) in ("true", "True")
+        self.ip_white_list = IpMatcher(config.get("ip_white_list"))
+        self.ip_black_list = IpMatcher(config.get("ip_black_list"))
+        self.white_api_list_path = PathMatcher(config.get("white_api_list_path"))
+
+
+class SystemConfigCache:
+    """
+    系统配置进程内缓存
+
+    配置写操作后调用 publish 递增版本号并通过 Redis 发布订阅通知各进程重新加载；
+    订阅任务未运行时按 SYSTEM_CONFIG_CACHE_TTL 周期比对版本号兜底。
+    """
+
+    VERSION_KEY: str = RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key
+    CHANNEL: str = RedisInitKeyConfig.SYSTEM_CONFIG_VERSION.key
+
+    _snapshot: SystemConfigSnapshot | None = None
+    _checked_at: float = 0.0
+    _task: asyncio.Task | None = None
+    _lock: asyncio.Lock | None = None
+
+    @classmethod
+    def listening(cls) -> bool:
+        """订阅任务是否运行中"""
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    async def get(cls, redis: Redis) -> SystemConfigSnapshot:
+        """
+        获取系统配置快照，常规情况下不访问Redis
+
+        参数:
+        - redis (Redis): Redis客户端对象
+
+        返回:
+        - SystemConfigSnapshot: 系统配置快照
+        """
+        snapshot = cls._snapshot
+        if snapshot is not None and (cls.listening() or time.monotonic() - cls._checked_at < settings.SYSTEM_CONFIG_CACHE_TTL):
+            return snapshot
+        if snapshot is not None:
+            cls._checked_at = time.monotonic()
+            version = int(await redis.get(cls.VERSION_KEY) or 0)
+            if version == snapshot.version:
+                return snapshot
+        return await cls.reload(redis)
+
+    @classmethod
+    async def reload(cls, redis: Redis) -> SystemConfigSnapshot:
+        """
+        从Redis重新加载并编译系统配置
+
+        参数:
+        - redis (Redis): Redis客户端对象
+
+        返回:
+        - SystemConfigSnapshot: 系统配置快照
+        """
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            version = int(await redis.get(cls.VERSION_KEY) or 0)
+            if cls._snapshot is not None and cls._snapshot.version == version and cls.listening():
+                return cls._snapshot
+            config = await cls.fetch(redis)
+            cls._snapshot = SystemConfigSnapshot(version=version, config=config)
+            cls._checked_at = time.monotonic()
+            return cls._snapshot
+
+    @classmethod
+    async def fetch(cls, redis: Redis) -> dict:
+        """
+        从Redis读取中间件所需的系统配置
+        
+        参数:
+        - redis (Redis): Redis客户端对象
+        
+        返回:
+        - dict: 包含演示模式、IP白名单、API白名单和IP黑名单的配置字典
+        """
+        config_names = ["demo_enable", "ip_white_list", "white_api_list_path", "ip_black_list"]
+        config_values = await RedisCURD(redis).mget([f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:{name}" for name in config_names])
+
+        # 初始化默认配置
+        config_result = {
+            "demo_enable": False,
+            "ip_white_list": [],
+            "white_api_list_path": [],
+            "ip_black_list": []
+        }
+        for name, value in zip(config_names, config_values):
+            if not value:
+                continue
+            try:
+                config = json.loads(value)
+                if name == "demo_enable":
+                    config_result[name] = config.get("config_value", False) if isinstance(config, dict) else False
+                else:
+                    # 列表类配置的 config_value 为JSON字符串
+                    config_result[name] = json.loads(config.get("config_value", "[]"))
+            except (ValueError, TypeError, AttributeError):
+                log.error(f"解析系统配置 {name} 失败")
+        return config_result
+
+    @classmethod
+    async def publish(cls, redis: Redis) -> None:
+        """
+        递增配置版本号并通知所有进程重新加载
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        try:
+            version = await redis.incr(cls.VERSION_KEY)
+            await redis.publish(cls.CHANNEL, version)
+        except Exception as e:
+            log.error(f"发布系统配置变更失败: {str(e)}")
+
+    @classmethod
+    async def start(cls, redis: Redis) -> None:
+        """启动配置变更订阅任务"""
+        if not cls.listening():
+            cls._task = asyncio.create_task(cls._listen(redis))
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止配置变更订阅任务"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    async def _listen(cls, redis: Redis) -> None:
+        """订阅配置变更频道，连接异常时重连"""
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.CHANNEL)
+                    # 订阅建立后重新加载一次，避免遗漏订阅前的变更
+                    await cls.reload(redis)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            await cls.reload(redis)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"系统配置变更订阅异常: {str(e)}")
+                await asyncio.sleep(1)
+
+
+async def system_config_listener(app: FastAPI, status: bool) -> None:
+    """
+    启动或停止系统配置变更订阅
+
+    参数:
+    - app (FastAPI): FastAPI应用实例
+    - status (bool): True为启动，False为停止
+    """
+    if status:
+        await SystemConfigCache.start(app.state.redis)
+        log.info("✅️ 系统配置变更订阅已启动")
+    else:
+        await SystemConfigCache.stop()
+        log.info("✅️ 系统配置变更订阅已停止")
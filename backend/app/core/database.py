@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from typing import Any, Awaitable, Callable
 from redis.asyncio import Redis
 from redis import exceptions
 from fastapi import FastAPI
@@ -84,6 +85,41 @@ def create_async_engine_and_session(
 engine, db_session = create_engine_and_session(settings.DB_URI)
 async_engine, async_db_session = create_async_engine_and_session(settings.ASYNC_DB_URI)
 
+
+AFTER_COMMIT_KEY = 'after_commit'
+
+
+def after_commit(session: AsyncSession, callback: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    """
+    登记事务提交后执行的异步回调，用于缓存失效等必须在新数据可见后执行的操作。
+
+    同一回调与参数在一个事务内只登记一次；事务回滚时回调被丢弃。
+
+    参数:
+    - session (AsyncSession): 数据库会话
+    - callback (Callable[..., Awaitable[Any]]): 异步回调
+    - args (Any): 回调参数
+    """
+    callbacks: list = session.info.setdefault(AFTER_COMMIT_KEY, [])
+    if (callback, args) not in callbacks:
+        callbacks.append((callback, args))
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """
+    按登记顺序执行事务提交后回调，单个回调失败只记录日志。
+
+    参数:
+    - session (AsyncSession): 数据库会话
+    """
+    callbacks: list = session.info.pop(AFTER_COMMIT_KEY, [])
+    for callback, args in callbacks:
+        try:
+            await callback(*args)
+        except Exception as e:
+            log.error(f"执行事务提交后回调失败 {getattr(callback, '__qualname__', callback)}: {e}")
+
+
 async def redis_connect(app: FastAPI, status: str) -> Redis | None:
     """
     创建或关闭Redis连接。
@@ -3,26 +3,22 @@
 import json
 from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from typing import AsyncGenerator
 from fastapi import Depends, Request
-from fastapi import Depends
 
-from app.common.enums import RedisInitKeyConfig
 from app.core.exceptions import CustomException
-from app.core.database import async_db_session
-from app.core.redis_crud import RedisCURD
+from app.core.database import async_db_session, run_after_commit
+from app.core.principal import DeptClosure, PermissionSet, PrincipalCache, RolePermissionIndex
 from app.core.security import OAuth2Schema, decode_access_token
 from app.core.logger import log
+from app.core.permission import Permission
 
-from app.api.v1.module_system.user.model import UserModel
-from app.api.v1.module_system.role.model import RoleModel
 from app.api.v1.module_system.user.crud import UserCRUD
 from app.api.v1.module_system.auth.schema import AuthSchema
 
 
 async def db_getter() -> AsyncGenerator[AsyncSession, None]:
-    """获取数据库会话连接
+    """获取数据库会话连接，事务提交后执行经 after_commit 登记的回调
     
     返回:
     - AsyncSession: 数据库会话连接
@@ -30,6 +26,7 @@ async def db_getter() -> AsyncGenerator[AsyncSession, None]:
     async with async_db_session() as session:
         async with session.begin():
             yield session
+        await run_after_commit(session)
 
 async def redis_getter(request: Request) -> Redis:
     """获取Redis连接
@@ -78,42 +75,49 @@ async def get_current_user(
     if not session_id:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
-    # 检查用户是否在线
-    online_ok = await RedisCURD(redis).exists(key=f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
+    # 一次Redis往返: 检查用户是否在线并获取权限快照
+    online_ok, principal, version = await PrincipalCache.load(redis=redis, session_id=session_id)
     if not online_ok:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
     # 关闭数据权限过滤，避免当前用户查询被拦截
-    auth = AuthSchema(db=db, check_data_scope=False)
-    username = user_info.get("user_name")
-    if not username:
-        raise CustomException(msg="认证已失效", code=10401, status_code=401)
-    # 获取用户信息，使用深层预加载确保RoleModel.creator被正确加载
-    user = await UserCRUD(auth).get_by_username_crud(
-        username=username, 
-        preload=[
-            "dept", 
-            selectinload(UserModel.roles).selectinload(RoleModel.created_by),
-            "positions", 
-            "created_by"
-        ]
-    )
-    if not user:
-        raise CustomException(msg="用户不存在", code=10401, status_code=401)
-    if not user.status:
+    auth = AuthSchema(db=db, redis=redis, check_data_scope=False)
+
+    if not principal:
+        # 快照缺失或版本过期时回源数据库重建
+        username = user_info.get("user_name")
+        if not username:
+            raise CustomException(msg="认证已失效", code=10401, status_code=401)
+        user = await UserCRUD(auth).get_by_username_crud(username=username, profile="auth")
+        if not user:
+            raise CustomException(msg="用户不存在", code=10401, status_code=401)
+        # 权限标识取自按角色预编译的索引,无需加载 role.menus
+        roles = PrincipalCache.active_roles(user)
+        role_permissions = await RolePermissionIndex.load(
+            redis=redis,
+            auth=auth,
+            role_ids=[role.id for role in roles]
+        )
+        # "本部门及以下"数据权限所需的部门子树取自部门闭包缓存
+        dept_subtree_ids = None
+        if user.dept_id and any(role.data_scope == Permission.DATA_SCOPE_DEPT_AND_CHILD for role in roles):
+            dept_subtree_ids = await DeptClosure.descendants(redis=redis, auth=auth, dept_id=user.dept_id)
+        principal = PrincipalCache.build(
+            user=user,
+            role_permissions=role_permissions,
+            version=version,
+            dept_subtree_ids=dept_subtree_ids
+        )
+        await PrincipalCache.save(redis=redis, session_id=session_id, principal=principal)
+
+    if not principal.status:
         raise CustomException(msg="用户已被停用", code=10401, status_code=401)
     
     # 设置请求上下文
-    request.scope["user_id"] = user.id
-    request.scope["user_username"] = user.username
-    
-    # 过滤可用的角色和职位
-    if hasattr(user, 'roles'):
-        user.roles = [role for role in user.roles if role and role.status]
-    if hasattr(user, 'positions'):
-        user.positions = [pos for pos in user.positions if pos and pos.status]
+    request.scope["user_id"] = principal.id
+    request.scope["user_username"] = principal.username
 
-    auth.user = user
+    auth.user = principal
     return auth
 
 
@@ -156,19 +160,14 @@ class AuthPermission:
             return auth
 
         # 检查用户是否有角色
-        if not auth.user or not auth.user.roles:
+        if not auth.user or not auth.user.role_ids:
             raise CustomException(msg="无权限操作", code=10403, status_code=403)
         
-        # 获取用户权限集合
-        user_permissions = {
-            menu.permission 
-            for role in auth.user.roles
-            for menu in role.menus 
-            if role.status and menu.permission and menu.status
-        }
+        # 获取用户权限集合(支持通配符/前缀匹配)
+        user_permissions = PermissionSet(auth.user.permissions)
 
         # 权限验证 - 满足任一权限即可
-        if not any(perm in user_permissions for perm in self.permissions):
+        if not user_permissions.has_any(self.permissions):
             log.error(f"用户缺少任何所需的权限: {self.permissions}")
             raise CustomException(msg="无权限操作", code=10403, status_code=403)
 
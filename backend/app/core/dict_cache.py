@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import json
+from types import MappingProxyType
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Mapping
+import pandas as pd
+from redis.asyncio.client import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+
+
+class DictLabelCache:
+    """
+    字典标签查找表进程内缓存
+
+    字典数据写操作后调用 publish 递增版本号；读取时比对版本号，版本变化则丢弃全部查找表。
+    缓存缺失时补写单个字典类型只调用 discard 丢弃本进程的该类型，不影响其他类型与其他进程。
+    缺失的字典类型一次 MGET 批量读取，并编译为只读的 {字典键值: 字典标签} 映射。
+    """
+
+    VERSION_KEY: str = RedisInitKeyConfig.SYSTEM_DICT_VERSION.key
+
+    _version: int | None = None
+    _tables: dict[str, Mapping[str, Any]] = {}
+
+    @classmethod
+    def compile(cls, value: str | list | None) -> Mapping[str, Any]:
+        """
+        将缓存中的字典数据列表编译为只读查找表
+
+        参数:
+        - value (str | list | None): 字典数据列表或其JSON字符串
+
+        返回:
+        - Mapping[str, Any]: {字典键值: 字典标签}
+        """
+        if isinstance(value, str):
+            value = json.loads(value)
+        return MappingProxyType({str(item.get('dict_value')): item.get('dict_label') for item in value or []})
+
+    @classmethod
+    async def tables(cls, redis: Redis, dict_types: Iterable[str]) -> dict[str, Mapping[str, Any]]:
+        """
+        获取字典类型的查找表，Redis中不存在的字典类型不返回
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - dict_types (Iterable[str]): 字典类型
+
+        返回:
+        - dict[str, Mapping[str, Any]]: {字典类型: 查找表}
+        """
+        types = list(dict.fromkeys(dict_type for dict_type in dict_types if dict_type))
+        if not types:
+            return {}
+        version = int(await redis.get(cls.VERSION_KEY) or 0)
+        if version != cls._version:
+            cls._tables = {}
+            cls._version = version
+
+        missing = [dict_type for dict_type in types if dict_type not in cls._tables]
+        if missing:
+            values = await RedisCURD(redis).mget([f"{RedisInitKeyConfig.SYSTEM_DICT.key}:{dict_type}" for dict_type in missing])
+            for dict_type, value in zip(missing, values):
+                if not value:
+                    continue
+                try:
+                    cls._tables[dict_type] = cls.compile(value)
+                except (ValueError, TypeError, AttributeError):
+                    log.error(f"解析字典数据缓存失败: {dict_type}")
+        return {dict_type: cls._tables[dict_type] for dict_type in types if dict_type in cls._tables}
+
+    @classmethod
+    async def publish(cls, redis: Redis) -> None:
+        """
+        递增字典版本号，使各进程的查找表失效
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        try:
+            await redis.incr(cls.VERSION_KEY)
+        except Exception as e:
+            log.error(f"发布字典数据变更失败: {str(e)}")
+        cls._tables = {}
+        cls._version = None
+
+    @classmethod
+    def discard(cls, dict_type: str) -> None:
+        """
+        丢弃本进程中单个字典类型的查找表，下次读取时从Redis重新编译
+
+        参数:
+        - dict_type (str): 字典类型
+        """
+        cls._tables.pop(dict_type, None)
+
+    @staticmethod
+    def translate(values: Iterable[Any] | pd.Series, table: Mapping[str, Any]) -> list[Any] | pd.Series:
+        """
+        按查找表将一列字典键值翻译为字典标签，无对应标签的值保持原样
+
+        参数:
+        - values (Iterable[Any] | pd.Series): 字典键值列表或 pandas Series
+        - table (Mapping[str, Any]): 查找表
+
+        返回:
+        - list[Any] | pd.Series: 翻译后的列表或 Series
+        """
+        if isinstance(values, pd.Series):
+            return values.astype(str).map(table).fillna(values)
+        return [value if value is None else table.get(str(value), value) for value in values]
+
+    @classmethod
+    def translate_rows(cls, rows: list[dict], columns: Mapping[str, Mapping[str, Any]]) -> list[dict]:
+        """
+        按列翻译字典行数据(原地修改)
+
+        参数:
+        - rows (list[dict]): 行数据
+        - columns (Mapping[str, Mapping[str, Any]]): {字段名: 查找表}
+
+        返回:
+        - list[dict]: 翻译后的行数据
+        """
+        for field, table in columns.items():
+            for row, label in zip(rows, cls.translate([row.get(field) for row in rows], table)):
+                if field in row:
+                    row[field] = label
+        return rows
+
+    @classmethod
+    async def translate_chunks(cls, chunks: AsyncIterable[list[dict]], columns: Mapping[str, Mapping[str, Any]]) -> AsyncIterator[list[dict]]:
+        """
+        按列翻译流式数据块，用于导出
+
+        参数:
+        - chunks (AsyncIterable[list[dict]]): 数据块迭代器
+        - columns (Mapping[str, Mapping[str, Any]]): {字段名: 查找表}
+
+        返回:
+        - AsyncIterator[list[dict]]: 翻译后的数据块迭代器
+        """
+        async for chunk in chunks:
+            yield cls.translate_rows(chunk, columns) if columns else chunk
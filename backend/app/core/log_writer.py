@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+from datetime import datetime
+from fastapi import FastAPI
+from pydantic import ValidationError
+from redis.asyncio.client import Redis
+from user_agents import parse
+
+from app.core.logger import log
+from app.core.database import async_db_session, run_after_commit
+from app.config.setting import settings
+from app.utils.common_util import uuid4_str
+from app.utils.ip_local_util import IpLocalUtil
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.log.crud import OperationLogCRUD
+from app.api.v1.module_system.log.schema import OperationLogCreateSchema
+
+
+class OperationLogWriter:
+    """
+    操作日志异步批量写入器
+
+    请求路径上只把原始日志记录放入有界队列后立即返回；
+    后台任务在达到批量条数或时间阈值时解析UA、补全IP归属地并以多行INSERT落库。
+    队列满时丢弃新记录并计数(背压)，应用关闭时排空队列后再退出。
+    """
+
+    _queue: asyncio.Queue | None = None
+    _task: asyncio.Task | None = None
+    _redis: Redis | None = None
+
+    # 运行指标
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+    @classmethod
+    def running(cls) -> bool:
+        """写入任务是否运行中"""
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    def enqueue(cls, record: dict) -> bool:
+        """
+        放入一条日志记录(非阻塞)
+
+        参数:
+        - record (dict): 原始日志记录，字段同 OperationLogCreateSchema，额外包含 user_agent
+
+        返回:
+        - bool: 是否入队成功，队列已满时丢弃并返回False
+        """
+        if cls._queue is None:
+            return False
+        try:
+            cls._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            cls.dropped += 1
+            if cls.dropped % 1000 == 1:
+                log.warning(f"操作日志队列已满，已丢弃 {cls.dropped} 条日志")
+            return False
+        cls.enqueued += 1
+        return True
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        获取运行指标
+
+        返回:
+        - dict: 入队、写入、丢弃、失败条数及当前积压
+        """
+        return {
+            "enqueued": cls.enqueued,
+            "written": cls.written,
+            "dropped": cls.dropped,
+            "failed": cls.failed,
+            "pending": cls._queue.qsize() if cls._queue else 0,
+        }
+
+    @classmethod
+    async def start(cls, redis: Redis | None = None) -> None:
+        """
+        启动后台写入任务
+
+        参数:
+        - redis (Redis | None): Redis客户端,用于IP归属地二级缓存
+        """
+        if cls.running():
+            return
+        cls._redis = redis
+        cls._queue = asyncio.Queue(maxsize=settings.OPERATION_LOG_QUEUE_SIZE)
+        cls._task = asyncio.create_task(cls._run(), name="operation-log-writer")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止后台写入任务，并写入队列中剩余的日志"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        # 排空剩余日志
+        while cls._queue is not None and not cls._queue.empty():
+            batch = [cls._queue.get_nowait() for _ in range(min(cls._queue.qsize(), settings.OPERATION_LOG_BATCH_SIZE))]
+            await cls.flush(batch)
+        cls._queue = None
+
+    @classmethod
+    async def _run(cls) -> None:
+        """后台循环：按条数或时间阈值批量写入"""
+        assert cls._queue is not None
+        while True:
+            batch = [await cls._queue.get()]
+            deadline = time.monotonic() + settings.OPERATION_LOG_FLUSH_INTERVAL
+            while len(batch) < settings.OPERATION_LOG_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(cls._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await cls.flush(batch)
+            except asyncio.CancelledError:
+                # 关闭时未写入的批次放回队列，由 stop 排空
+                for record in batch:
+                    if cls._queue.full():
+                        cls.dropped += 1
+                    else:
+                        cls._queue.put_nowait(record)
+                raise
+
+    @classmethod
+    async def flush(cls, batch: list[dict]) -> None:
+        """
+        解析并批量写入一批日志
+
+        参数:
+        - batch (list[dict]): 原始日志记录列表
+        """
+        if not batch:
+            return
+        rows: list[dict] | None = None
+        try:
+            # 校验失败的单条记录在 _build_rows 中计入 failed 并丢弃
+            rows = await cls._build_rows(batch)
+            if not rows:
+                return
+            async with async_db_session() as session:
+                async with session.begin():
+                    auth = AuthSchema(db=session, redis=cls._redis)
+                    cls.written += await OperationLogCRUD(auth).create_batch_crud(rows=rows)
+                await run_after_commit(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            count = len(batch) if rows is None else len(rows)
+            cls.failed += count
+            log.error(f"批量写入操作日志失败({count}条): {str(e)}")
+
+    @classmethod
+    async def _build_rows(cls, batch: list[dict]) -> list[dict]:
+        """
+        补全UA、IP归属地与默认字段
+
+        参数:
+        - batch (list[dict]): 原始日志记录列表
+
+        返回:
+        - list[dict]: 可直接插入的字段字典列表
+        """
+        # 同一批次内相同IP只解析一次归属地，并发解析且整批最多等待 IP_LOCATION_BATCH_TIMEOUT 秒
+        ips = list({record.get("request_ip") for record in batch if record.get("request_ip")})
+        try:
+            resolved = await asyncio.wait_for(
+                asyncio.gather(*(IpLocalUtil.get_ip_location(ip, redis=cls._redis, wait_remote=True) for ip in ips)),
+                timeout=settings.IP_LOCATION_BATCH_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            # 超时后远程解析仍在后台补全缓存，本批次只取已缓存的结果
+            resolved = await asyncio.gather(*(IpLocalUtil.get_ip_location(ip, redis=cls._redis) for ip in ips))
+        locations: dict[str, str | None] = dict(zip(ips, resolved))
+
+        rows = []
+        for record in batch:
+            record = dict(record)
+            user_agent = parse(record.pop("user_agent", None) or "")
+            created_time = record.pop("created_time", None) or datetime.now()
+            fields = dict(
+                record,
+                login_location=locations.get(record.get("request_ip")),
+                request_os=user_agent.os.family,
+                request_browser=user_agent.browser.family,
+            )
+            # 逐条校验，单条记录不合法不影响同批次其他记录
+            try:
+                data = OperationLogCreateSchema(**fields).model_dump()
+            except ValidationError as e:
+                data = cls._sanitize(fields, e)
+            if data is None:
+                cls.failed += 1
+                log.error(f"操作日志记录校验失败，已丢弃: {record.get('request_method')} {record.get('request_path')}")
+                continue
+            data.update(uuid=uuid4_str(), created_time=created_time, updated_time=created_time)
+            rows.append(data)
+        return rows
+
+    @classmethod
+    def _sanitize(cls, fields: dict, error: ValidationError) -> dict | None:
+        """
+        清洗校验失败的日志记录: 超长的描述截断，其余不合法字段(如客户端可伪造的请求IP)置空后重新校验
+
+        参数:
+        - fields (dict): 日志字段
+        - error (ValidationError): 首次校验的错误
+
+        返回:
+        - dict | None: 清洗后的字段字典，仍不合法时返回None
+        """
+        fields = dict(fields)
+        for item in error.errors():
+            field = item["loc"][0] if item["loc"] else None
+            if field == "description" and isinstance(fields.get(field), str):
+                fields[field] = fields[field][:255]
+            elif field in fields:
+                fields[field] = None
+        try:
+            return OperationLogCreateSchema(**fields).model_dump()
+        except ValidationError:
+            return None
+
+
+async def operation_log_writer(app: FastAPI, status: bool) -> None:
+    """
+    启动或关闭操作日志写入器。
+
+    参数:
+    - app (FastAPI): FastAPI应用实例。
+    - status (bool): True为启动,False为关闭并写入剩余日志。
+    """
+    if status:
+        await OperationLogWriter.start(redis=getattr(app.state, "redis", None))
+        log.info("✅️ 操作日志写入器已启动")
+    else:
+        await OperationLogWriter.stop()
+        log.info(f"✅️ 操作日志写入器已关闭 {OperationLogWriter.stats()}")
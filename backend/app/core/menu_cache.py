@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import json
+import hashlib
+from typing import Any, Awaitable, Callable, Iterable
+from pydantic_core import to_json
+from redis.asyncio.client import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+
+
+class MenuTreeCache:
+    """
+    登录菜单树缓存(进程内 + Redis)
+
+    拥有相同有效角色集合的用户菜单树相同，缓存键为 (排序后的角色ID, 菜单版本号) 的摘要，超级管理员共用一份。
+    菜单或角色菜单授权变更的事务提交后调用 publish 递增版本号，旧版本的缓存不再命中并在过期后由Redis回收。
+    缓存的菜单树为共享对象，调用方不得修改。
+    """
+
+    VERSION_KEY: str = RedisInitKeyConfig.SYSTEM_MENU_VERSION.key
+    PREFIX: str = RedisInitKeyConfig.MENU_TREE.key
+    MAX_SIZE: int = 256
+
+    _version: int | None = None
+    _trees: dict[str, list[dict[str, Any]]] = {}
+
+    @classmethod
+    def digest(cls, role_ids: Iterable[int] | None, version: int) -> str:
+        """
+        计算角色集合与菜单版本号的摘要
+
+        参数:
+        - role_ids (Iterable[int] | None): 有效角色ID，None 表示超级管理员
+        - version (int): 菜单版本号
+
+        返回:
+        - str: 摘要
+        """
+        roles = '*' if role_ids is None else ','.join(str(role_id) for role_id in sorted(set(role_ids)))
+        return hashlib.sha1(f'{roles}|{version}'.encode('utf-8')).hexdigest()
+
+    @classmethod
+    async def get(
+        cls,
+        redis: Redis,
+        role_ids: Iterable[int] | None,
+        loader: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        """
+        获取角色集合的菜单树，进程内与Redis均未命中时调用 loader 构造并写入缓存
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - role_ids (Iterable[int] | None): 有效角色ID，None 表示超级管理员
+        - loader (Callable[[], Awaitable[list[dict[str, Any]]]]): 菜单树构造函数
+
+        返回:
+        - list[dict[str, Any]]: 菜单树
+        """
+        version = int(await redis.get(cls.VERSION_KEY) or 0)
+        if version != cls._version:
+            cls._trees = {}
+            cls._version = version
+
+        digest = cls.digest(role_ids, version)
+        tree = cls._trees.get(digest)
+        if tree is not None:
+            return tree
+
+        key = f'{cls.PREFIX}:{digest}'
+        value = await RedisCURD(redis).get(key)
+        if value:
+            try:
+                tree = json.loads(value)
+            except ValueError:
+                log.error(f"解析登录菜单树缓存失败: {key}")
+        if tree is None:
+            tree = await loader()
+            await RedisCURD(redis).set(key, to_json(tree).decode('utf-8'), expire=settings.MENU_TREE_CACHE_EXPIRE_SECONDS)
+
+        if len(cls._trees) >= cls.MAX_SIZE:
+            cls._trees = {}
+        cls._trees[digest] = tree
+        return tree
+
+    @classmethod
+    async def publish(cls, redis: Redis) -> None:
+        """
+        递增菜单版本号，使各进程及Redis中的菜单树缓存失效
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        try:
+            await redis.incr(cls.VERSION_KEY)
+        except Exception as e:
+            log.error(f"发布菜单变更失败: {str(e)}")
+        cls._trees = {}
+        cls._version = None
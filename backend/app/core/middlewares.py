@@ -2,17 +2,15 @@
 
 import time
 from starlette.middleware.cors import CORSMiddleware
-from starlette.types import ASGIApp
-from starlette.requests import Request
-from starlette.middleware.gzip import GZipMiddleware
-from starlette.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.datastructures import Headers, MutableHeaders
 
 from app.common.response import ErrorResponse
 from app.config.setting import settings
 from app.core.logger import log
 from app.core.exceptions import CustomException
-from app.api.v1.module_system.params.service import ParamsService
+from app.core.config_cache import SystemConfigCache
+from app.utils.compress_util import CompressUtil
 
 
 class CustomCORSMiddleware(CORSMiddleware):
@@ -28,128 +26,199 @@ class CustomCORSMiddleware(CORSMiddleware):
         )
 
 
-class RequestLogMiddleware(BaseHTTPMiddleware):
+class RequestLogMiddleware:
     """
-    记录请求日志中间件: 提供一个基础的中间件类，允许你自定义请求和响应处理逻辑。
+    记录请求日志中间件(纯ASGI实现): 负责请求日志、IP黑白名单、演示模式拦截与 X-Process-Time 响应头。
+    
+    只在发送响应头时注入处理时间，不缓冲、不包装响应体，流式响应与文件下载按原样透传。
     """
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start_time = time.time()
-        session_id = request.scope.get('session_id')
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        client_host = client[0] if client else None
         # 组装请求日志字段
-        log_fields = [
-            f"会话ID: {session_id}",
-            f"请求来源: {request.client.host if request.client else '未知'}",
-            f"请求方法: {request.method}",
-            f"请求路径: {request.url.path}",
-        ]
-        log.info(log_fields)
+        log.info([
+            f"会话ID: {scope.get('session_id')}",
+            f"请求来源: {client_host or '未知'}",
+            f"请求方法: {method}",
+            f"请求路径: {path}",
+        ])
+
+        # 尝试获取客户端真实IP: 优先取 X-Forwarded-For 的第一个地址
+        x_forwarded_for = headers.get('x-forwarded-for')
+        request_ip = x_forwarded_for.split(',')[0].strip() if x_forwarded_for else client_host
+
+        block_reason, demo_enable = await self._check_block(scope, method, path, request_ip)
+        if block_reason:
+            # 增强安全审计：记录详细的拦截日志
+            log.warning([
+                f"请求被拦截: {block_reason}",
+                f"请求来源: {request_ip}",
+                f"请求方法: {method}",
+                f"请求路径: {path}",
+                f"用户代理: {headers.get('user-agent', '未知')}",
+                f"演示模式: {demo_enable}"
+            ])
+            await ErrorResponse(msg="演示环境，禁止操作")(scope, receive, send)
+            return
+
+        response_started = False
+        status_code = 0
+        content_length = '0'
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started, status_code, content_length
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                # 计算处理时间并添加到响应头
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append("X-Process-Time", str(round(time.perf_counter() - start_time, 5)))
+                content_length = response_headers.get('content-length', '0')
+            await send(message)
 
         try:
-            # 初始化响应变量
-            response = None
-            
-            # 获取请求路径
-            path = request.scope.get("path")
-            
-            # 尝试获取客户端真实IP
-            request_ip = None
-            x_forwarded_for = request.headers.get('X-Forwarded-For')
-            if x_forwarded_for:
-                # 取第一个 IP 地址，通常为客户端真实 IP
-                request_ip = x_forwarded_for.split(',')[0].strip()
-            else:
-                # 若没有 X-Forwarded-For 头，则使用 request.client.host
-                request_ip = request.client.host if request.client else None
-            
-            # 检查是否启用演示模式
-            demo_enable = False
-            ip_white_list = []
-            white_api_list_path = []
-            ip_black_list = []
-            
-            try:
-                # 从应用实例获取Redis连接
-                redis = request.app.state.redis
-                if not redis:
-                    raise Exception("无法获取Redis连接")
-                
-                # 使用ParamsService获取系统配置
-                system_config = await ParamsService.get_system_config_for_middleware(redis)
-                # 提取配置值
-                demo_enable = system_config["demo_enable"]
-                ip_white_list = system_config["ip_white_list"]
-                white_api_list_path = system_config["white_api_list_path"]
-                ip_black_list = system_config["ip_black_list"]
-                
-            except Exception as e:
-                log.error(f"获取系统配置失败: {e}")
-            
-            # 检查是否需要拦截请求
-            should_block = False
-            block_reason = ""
-            
-            # 1. 首先检查IP是否在黑名单中
-            if request_ip and request_ip in ip_black_list:
-                should_block = True
-                block_reason = f"IP地址 {request_ip} 在黑名单中"
-            
-            # 2. 如果不在黑名单中，检查是否在演示模式下需要拦截
-            elif demo_enable in ["true", "True"] and request.method != "GET":
-                # 在演示模式下，非GET请求需要检查白名单
-                is_ip_whitelisted = request_ip in ip_white_list
-                is_path_whitelisted = path in white_api_list_path
-                
-                if not is_ip_whitelisted and not is_path_whitelisted:
-                    should_block = True
-                    block_reason = f"演示模式下拦截非GET请求，IP: {request_ip}, 路径: {path}"
-            
-            if should_block:
-                # 增强安全审计：记录详细的拦截日志
-                log.warning([
-                    f"请求被拦截: {block_reason}",
-                    f"请求来源: {request_ip}",
-                    f"请求方法: {request.method}",
-                    f"请求路径: {path}",
-                    f"用户代理: {request.headers.get('user-agent', '未知')}",
-                    f"演示模式: {demo_enable}"
-                ])
-                # 拦截请求
-                return ErrorResponse(msg="演示环境，禁止操作")
-            else:
-                # 正常处理请求
-                response = await call_next(request)
-            
-            # 计算处理时间并添加到响应头
-            process_time = round(time.time() - start_time, 5)
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            # 构建响应日志信息
-            
-            content_length = response.headers.get('content-length', '0')
-            response_info = (
-                f"响应状态: {response.status_code}, "
-                f"响应内容长度: {content_length}, "
-                f"处理时间: {round(process_time * 1000, 3)}ms"
-            )
-            log.info(response_info)
-            
-            return response
-        
+            await self.app(scope, receive, send_wrapper)
         except CustomException as e:
             log.error(f"中间件处理异常: {str(e)}")
-            return ErrorResponse(msg=f"系统异常，请联系管理员", data=str(e))
+            if response_started:
+                raise
+            await ErrorResponse(msg=f"系统异常，请联系管理员", data=str(e))(scope, receive, send)
+            return
+
+        process_time = time.perf_counter() - start_time
+        log.info(
+            f"响应状态: {status_code}, "
+            f"响应内容长度: {content_length}, "
+            f"处理时间: {round(process_time * 1000, 3)}ms"
+        )
+
+    @staticmethod
+    async def _check_block(scope: Scope, method: str, path: str, request_ip: str | None) -> tuple[str, bool]:
+        """
+        检查请求是否需要拦截
+        
+        参数:
+        - scope (Scope): ASGI 连接信息
+        - method (str): 请求方法
+        - path (str): 请求路径
+        - request_ip (str | None): 客户端IP
+        
+        返回:
+        - tuple[str, bool]: (拦截原因，无需拦截时为空字符串, 是否演示模式)
+        """
+        try:
+            # 从应用实例获取Redis连接
+            redis = scope["app"].state.redis
+            if not redis:
+                raise Exception("无法获取Redis连接")
+            # 读取进程内预编译的系统配置快照
+            system_config = await SystemConfigCache.get(redis)
+        except Exception as e:
+            log.error(f"获取系统配置失败: {e}")
+            return "", False
 
+        # 1. 首先检查IP是否在黑名单中
+        if request_ip in system_config.ip_black_list:
+            return f"IP地址 {request_ip} 在黑名单中", system_config.demo_enable
 
-class CustomGZipMiddleware(GZipMiddleware):
-    """GZip压缩中间件"""
+        # 2. 如果不在黑名单中，演示模式下非GET请求需要检查白名单
+        if (
+            system_config.demo_enable and method != "GET"
+            and request_ip not in system_config.ip_white_list
+            and path not in system_config.white_api_list_path
+        ):
+            return f"演示模式下拦截非GET请求，IP: {request_ip}, 路径: {path}", True
+        return "", system_config.demo_enable
+
+
+class CustomCompressionMiddleware:
+    """
+    响应压缩中间件(纯ASGI实现): 按 Accept-Encoding 协商 zstd/br/gzip，按负载大小选择压缩级别。
+    
+    已设置 Content-Encoding 或媒体类型已压缩(图片、xlsx、zip 等)的响应原样透传；
+    流式响应逐块压缩并刷新，不缓冲完整响应体。
+    """
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(
-            app,
-            minimum_size=settings.GZIP_MIN_SIZE,
-            compresslevel=settings.GZIP_COMPRESS_LEVEL
-        )
\ No newline at end of file
+        self.app = app
+        self.encodings = CompressUtil.available()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = CompressUtil.negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        # None: 尚未决定；True: 压缩；False: 透传
+        compressing: bool | None = None
+        compress_chunk = finish = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressing, compress_chunk, finish
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not CompressUtil.compressible(headers.get("content-type")):
+                    compressing = False
+                    await send(message)
+                else:
+                    # 等待第一块响应体以判断是否为流式响应
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or compressing is False:
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if compressing is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body:
+                    # 完整响应体：过小则不压缩，否则按大小选择级别
+                    if len(body) < settings.GZIP_MIN_SIZE:
+                        compressing = False
+                        await send(start_message)
+                        await send(message)
+                        return
+                    compressed = CompressUtil.compress(body, encoding, CompressUtil.level(encoding, len(body)))
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(compressed))
+                    headers.add_vary_header("Accept-Encoding")
+                    compressing = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                # 流式响应：逐块压缩并刷新
+                compress_chunk, finish = CompressUtil.stream_compressor(encoding, CompressUtil.level(encoding, None))
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                compressing = True
+                await send(start_message)
+
+            if finish is None:
+                # 完整响应体已发送，忽略多余的空消息
+                return
+            chunk = compress_chunk(body) if body else b""
+            if not more_body:
+                chunk += finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+        # 应用未发送响应体时补发已缓存的响应头
+        if compressing is None and start_message is not None:
+            await send(start_message)
+            await send({"type": "http.response.body", "body": b""})
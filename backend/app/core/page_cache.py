@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import time
+import hashlib
+from typing import Any
+from redis.asyncio.client import Redis
+from sqlalchemy import Select
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import log
+
+
+class PageTotalCache:
+    """
+    分页总数缓存
+
+    每个表一个哈希 page_total:{表名}，字段为统计SQL(含查询条件与数据权限条件)及参数的摘要，值为 "总数:过期时间戳"。
+    经 CRUDBase 的写操作删除整个哈希；绕过 CRUDBase 的写入最多在 PAGE_TOTAL_CACHE_TTL 秒内读到旧总数。
+    """
+
+    PREFIX: str = RedisInitKeyConfig.PAGE_TOTAL.key
+
+    @classmethod
+    def key(cls, table: str) -> str:
+        """
+        获取表的缓存键名
+
+        参数:
+        - table (str): 表名
+
+        返回:
+        - str: 缓存键名
+        """
+        return f'{cls.PREFIX}:{table}'
+
+    @classmethod
+    def digest(cls, count_sql: Select, dialect: Any) -> str:
+        """
+        计算统计SQL及其参数的摘要
+
+        参数:
+        - count_sql (Select): 统计查询
+        - dialect (Any): 数据库方言
+
+        返回:
+        - str: 摘要
+        """
+        compiled = count_sql.compile(dialect=dialect)
+        params = sorted(compiled.params.items())
+        return hashlib.sha1(f'{compiled}|{params!r}'.encode('utf-8')).hexdigest()
+
+    @classmethod
+    async def get(cls, redis: Redis, table: str, digest: str) -> int | None:
+        """
+        读取未过期的缓存总数
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - table (str): 表名
+        - digest (str): 统计SQL摘要
+
+        返回:
+        - int | None: 总数，未命中或已过期时返回None
+        """
+        try:
+            value = await redis.hget(cls.key(table), digest)
+        except Exception as e:
+            log.error(f"读取分页总数缓存失败: {str(e)}")
+            return None
+        if not value:
+            return None
+        total, _, expires_at = value.partition(':')
+        try:
+            return int(total) if float(expires_at) > time.time() else None
+        except ValueError:
+            return None
+
+    @classmethod
+    async def set(cls, redis: Redis, table: str, digest: str, total: int) -> None:
+        """
+        写入缓存总数
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - table (str): 表名
+        - digest (str): 统计SQL摘要
+        - total (int): 总数
+        """
+        ttl = settings.PAGE_TOTAL_CACHE_TTL
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.hset(cls.key(table), digest, f'{total}:{time.time() + ttl}')
+            pipe.expire(cls.key(table), ttl)
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"写入分页总数缓存失败: {str(e)}")
+
+    @classmethod
+    async def invalidate(cls, redis: Redis, table: str) -> None:
+        """
+        删除表的全部缓存总数
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - table (str): 表名
+        """
+        try:
+            await redis.delete(cls.key(table))
+        except Exception as e:
+            log.error(f"删除分页总数缓存失败: {str(e)}")
@@ -1,13 +1,10 @@
 # -*- coding: utf-8 -*-
 
 from typing import Any
+from sqlalchemy.orm import MANYTOONE
 from sqlalchemy.sql.elements import ColumnElement
-from sqlalchemy import select, and_
 from app.api.v1.module_system.user.model import UserModel
-from app.api.v1.module_system.dept.model import DeptModel
-from app.api.v1.module_system.role.model import RoleModel
 from app.api.v1.module_system.auth.schema import AuthSchema
-from app.utils.common_util import get_child_id_map, get_child_recursion
 
 
 class Permission:
@@ -21,6 +18,11 @@ class Permission:
     DATA_SCOPE_DEPT_AND_CHILD = 3  # 本部门及以下数据
     DATA_SCOPE_ALL = 4  # 全部数据
     DATA_SCOPE_CUSTOM = 5  # 自定义数据
+
+    # 请求内缓存中数据权限部门集合的键(与模型类键区分)
+    DEPT_IDS_KEY = ('dept_ids',)
+    # 请求内缓存中统计查询连接改写的键后缀: (模型类, JOIN_KEY) -> (关系属性, 连接后条件)
+    JOIN_KEY = 'join'
     
     def __init__(self, model: Any, auth: AuthSchema):
         """
@@ -48,8 +50,77 @@ class Permission:
         """
         condition = await self.__permission_condition()
         return query.where(condition) if condition is not None else query
+
+    async def filter_count_query(self, query: Any) -> Any:
+        """
+        异步过滤统计查询对象
+        
+        创建人部门条件(关系 has 子查询)改写为与用户表的内连接，避免统计时对每一行执行相关 EXISTS 子查询；
+        多对一关系的内连接不改变行数，结果与 filter_query 一致。
+        
+        Args:
+            query: SQLAlchemy统计查询对象(select_from 为当前模型)
+            
+        Returns:
+            过滤后的查询对象
+        """
+        condition = await self.__permission_condition()
+        if condition is None:
+            return query
+        join = self.auth.permission_cache.get((self.model, self.JOIN_KEY))
+        if join is not None:
+            relationship, criterion = join
+            return query.join(relationship).where(criterion)
+        return query.where(condition)
     
     async def __permission_condition(self) -> ColumnElement | None:
+        """
+        获取数据权限过滤表达式，返回None表示不限制。
+        同一请求内按模型缓存于 AuthSchema，分页的数据查询与统计查询、服务层的多次CRUD调用只构造一次。
+        """
+        # 如果不需要检查数据权限,则不限制
+        if not self.auth.user:
+            return None
+        
+        # 如果检查数据权限为False,则不限制
+        if not self.auth.check_data_scope:
+            return None
+
+        cache = self.auth.permission_cache
+        if self.model not in cache:
+            cache[self.model] = self.__build_condition()
+        return cache[self.model]
+
+    def __scope_dept_ids(self) -> frozenset[int]:
+        """
+        获取本部门/本部门及以下/自定义数据权限汇总的部门ID集合，同一请求内各模型共用
+        """
+        cache = self.auth.permission_cache
+        if self.DEPT_IDS_KEY not in cache:
+            data_scopes = set(self.auth.user.data_scopes)
+            dept_ids = set(self.auth.user.dept_ids)
+            dept_id_val = getattr(self.auth.user, "dept_id", None)
+            if dept_id_val is not None and (self.DATA_SCOPE_DEPT in data_scopes or self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes):
+                # 本部门数据
+                dept_ids.add(dept_id_val)
+            if dept_id_val is not None and self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes:
+                # 本部门及以下数据（部门闭包已在构建权限快照时解析）
+                dept_ids.update(self.auth.user.dept_subtree_ids)
+            cache[self.DEPT_IDS_KEY] = frozenset(dept_ids)
+        return cache[self.DEPT_IDS_KEY]
+
+    def __creator_dept_condition(self, creator_rel: Any, dept_ids: Any) -> ColumnElement:
+        """
+        构造"创建人属于指定部门"条件，多对一关系同时记录统计查询使用的连接改写
+        """
+        criterion = getattr(UserModel, 'dept_id').in_(list(dept_ids))
+        # 自关联(如用户表)连接需要别名，不做改写
+        prop = creator_rel.property
+        if getattr(prop, 'direction', None) is MANYTOONE and prop.mapper.class_ is not self.model:
+            self.auth.permission_cache[(self.model, self.JOIN_KEY)] = (creator_rel, criterion)
+        return creator_rel.has(criterion)
+
+    def __build_condition(self) -> ColumnElement | None:
         """
         应用数据范围权限隔离
         基于角色的五种数据权限范围过滤
@@ -61,14 +132,6 @@ class Permission:
         5. 自定义数据权限 - 通过role_dept_relation表定义可访问的部门列表
         构造权限过滤表达式，返回None表示不限制。
         """
-        # 如果不需要检查数据权限,则不限制
-        if not self.auth.user:
-            return None
-        
-        # 如果检查数据权限为False,则不限制
-        if not self.auth.check_data_scope:
-            return None
-
         # 如果模型没有创建人creator_id字段,则不限制
         if not hasattr(self.model, "creator_id"):
             return None
@@ -78,23 +141,15 @@ class Permission:
             return None
             
         # 如果用户没有部门或角色,则只能查看自己的数据
-        if not getattr(self.auth.user, "dept_id", None) or not getattr(self.auth.user, "roles", None):
+        if not getattr(self.auth.user, "dept_id", None) or not getattr(self.auth.user, "role_ids", None):
             creator_id_attr = getattr(self.model, "creator_id", None)
             if creator_id_attr is not None:
                 return creator_id_attr == self.auth.user.id
             return None
         
-        # 获取用户所有角色的权限范围
-        data_scopes = set()
-        dept_ids = set()
-        roles = getattr(self.auth.user, "roles", []) or []
-        
-        for role in roles:
-            # 角色的部门集合
-            if hasattr(role, 'depts') and role.depts:
-                for dept in role.depts:
-                    dept_ids.add(dept.id)
-            data_scopes.add(role.data_scope)
+        # 获取用户所有角色的权限范围(来自权限快照)
+        data_scopes = set(self.auth.user.data_scopes)
+        dept_ids = set(self.auth.user.dept_ids)
         
         # 如果有全部数据权限，直接返回
         if self.DATA_SCOPE_ALL in data_scopes:
@@ -106,7 +161,7 @@ class Permission:
             # 自定义数据权限
             creator_rel = getattr(self.model, "creator", None)
             if hasattr(UserModel, 'dept_id') and creator_rel is not None:
-                return creator_rel.has(getattr(UserModel, 'dept_id').in_(list(dept_ids)))
+                return self.__creator_dept_condition(creator_rel, dept_ids)
             else:
                 creator_id_attr = getattr(self.model, "creator_id", None)
                 if creator_id_attr is not None:
@@ -114,8 +169,6 @@ class Permission:
                 return None
 
         # 处理其他数据权限范围
-        dept_id_val = getattr(self.auth.user, "dept_id", None)
-        
         if self.DATA_SCOPE_SELF in data_scopes:
             # 仅本人数据
             creator_id_attr = getattr(self.model, "creator_id", None)
@@ -123,27 +176,15 @@ class Permission:
                 return creator_id_attr == self.auth.user.id
             return None
 
-        if self.DATA_SCOPE_DEPT in data_scopes and dept_id_val is not None:
-            # 本部门数据
-            dept_ids.add(dept_id_val)
-            
-        if self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes and dept_id_val is not None:
-            # 本部门及以下数据（查询所有部门并递归）
-            dept_sql = select(DeptModel)
-            dept_result = await self.auth.db.execute(dept_sql)
-            dept_objs = dept_result.scalars().all()
-            id_map = get_child_id_map(dept_objs)
-            dept_child_ids = get_child_recursion(id=dept_id_val, id_map=id_map)
-            dept_ids.add(dept_id_val)  # 包含本部门
-            for child_id in dept_child_ids:
-                dept_ids.add(child_id)
+        # 本部门、本部门及以下的部门集合(请求内各模型共用)
+        dept_ids = self.__scope_dept_ids()
 
         # 处理2、3汇总的数据权限
         if (self.DATA_SCOPE_DEPT in data_scopes or self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes) and dept_ids:
             # 使用关系creator进行筛选（若存在），否则回退到仅本人数据
             creator_rel = getattr(self.model, "creator", None)
             if hasattr(UserModel, 'dept_id') and creator_rel is not None and dept_ids:
-                return creator_rel.has(getattr(UserModel, 'dept_id').in_(list(dept_ids)))
+                return self.__creator_dept_condition(creator_rel, dept_ids)
             else:
                 creator_id_attr = getattr(self.model, "creator_id", None)
                 if creator_id_attr is not None:
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+import json
+from typing import Iterable
+from redis.asyncio.client import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.config.setting import settings
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+from app.api.v1.module_system.user.model import UserModel
+from app.api.v1.module_system.auth.schema import AuthSchema, PrincipalSchema
+from app.api.v1.module_system.role.crud import RoleCRUD
+from app.api.v1.module_system.dept.crud import DeptCRUD
+
+
+class PermissionSet:
+    """
+    编译后的权限标识集合
+
+    支持精确匹配与通配符/前缀匹配(如 module_system:user:*、module_system:*、*:*:*),
+    判断单个权限只需按段生成候选键做常数次集合查找。
+    """
+
+    WILDCARD: str = '*'
+    SEPARATOR: str = ':'
+
+    __slots__ = ('_permissions',)
+
+    def __init__(self, permissions: Iterable[str]) -> None:
+        """
+        初始化权限集合
+
+        参数:
+        - permissions (Iterable[str]): 权限标识(可包含通配符)
+        """
+        self._permissions = frozenset(perm.strip() for perm in permissions if perm and perm.strip())
+
+    def __contains__(self, permission: str) -> bool:
+        """
+        判断是否拥有指定权限
+
+        参数:
+        - permission (str): 权限标识
+
+        返回:
+        - bool: 是否拥有
+        """
+        if permission in self._permissions:
+            return True
+        parts = permission.split(self.SEPARATOR)
+        for i in range(len(parts) - 1, -1, -1):
+            prefix = parts[:i]
+            # 前缀通配: module_system:user:* / module_system:*
+            if self.SEPARATOR.join(prefix + [self.WILDCARD]) in self._permissions:
+                return True
+            # 逐段通配: module_system:*:* / *:*:*
+            if self.SEPARATOR.join(prefix + [self.WILDCARD] * (len(parts) - i)) in self._permissions:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._permissions)
+
+    def has_any(self, permissions: Iterable[str]) -> bool:
+        """
+        判断是否拥有任一权限
+
+        参数:
+        - permissions (Iterable[str]): 权限标识列表
+
+        返回:
+        - bool: 满足任一权限返回True
+        """
+        return any(perm in self for perm in permissions)
+
+
+class RolePermissionIndex:
+    """
+    角色权限索引
+
+    以角色为单位缓存预编译的权限标识集合(role_permission:<role_id>),
+    由角色授权与菜单变更在事务提交后增量刷新,重建用户权限快照时无需遍历 role.menus。
+    缓存带过期时间,绕过服务层的直接改库最多在 ROLE_PERMISSION_CACHE_EXPIRE_SECONDS 内读到旧权限。
+    """
+
+    @classmethod
+    def role_key(cls, role_id: int) -> str:
+        """
+        获取角色权限缓存键名
+
+        参数:
+        - role_id (int): 角色ID
+
+        返回:
+        - str: 缓存键名
+        """
+        return f'{RedisInitKeyConfig.ROLE_PERMISSION.key}:{role_id}'
+
+    @classmethod
+    async def load(cls, redis: Redis, auth: AuthSchema, role_ids: list[int]) -> dict[int, list[str]]:
+        """
+        批量获取角色权限,未命中的角色回源数据库并回写缓存
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - auth (AuthSchema): 认证信息模型
+        - role_ids (list[int]): 角色ID列表
+
+        返回:
+        - dict[int, list[str]]: {角色ID: 权限标识列表}
+        """
+        if not role_ids:
+            return {}
+        values = await RedisCURD(redis).mget([cls.role_key(role_id) for role_id in role_ids])
+        permission_map: dict[int, list[str]] = {}
+        missing: list[int] = []
+        for role_id, value in zip(role_ids, values or [None] * len(role_ids)):
+            if value is None:
+                missing.append(role_id)
+                continue
+            try:
+                permission_map[role_id] = json.loads(value)
+            except json.JSONDecodeError:
+                missing.append(role_id)
+
+        if missing:
+            permission_map.update(await cls.refresh(redis=redis, auth=auth, role_ids=missing))
+        return permission_map
+
+    @classmethod
+    async def refresh(cls, redis: Redis, auth: AuthSchema, role_ids: list[int]) -> dict[int, list[str]]:
+        """
+        重新编译指定角色的权限并写入缓存
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - auth (AuthSchema): 认证信息模型
+        - role_ids (list[int]): 角色ID列表
+
+        返回:
+        - dict[int, list[str]]: {角色ID: 权限标识列表}
+        """
+        permission_map = await RoleCRUD(auth).get_role_permissions_crud(role_ids=list(role_ids))
+        for role_id, permissions in permission_map.items():
+            permission_map[role_id] = sorted(set(permissions))
+            await RedisCURD(redis).set(
+                key=cls.role_key(role_id),
+                value=json.dumps(permission_map[role_id]),
+                expire=settings.ROLE_PERMISSION_CACHE_EXPIRE_SECONDS,
+            )
+        return permission_map
+
+    @classmethod
+    async def remove(cls, redis: Redis, role_ids: list[int]) -> None:
+        """
+        删除指定角色的权限缓存
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - role_ids (list[int]): 角色ID列表
+        """
+        if role_ids:
+            await RedisCURD(redis).delete(*[cls.role_key(role_id) for role_id in role_ids])
+
+
+class DeptClosure:
+    """
+    部门闭包缓存
+
+    以Redis哈希(dept_closure)保存每个部门的全部后代部门ID(含自身),
+    一次两列查询即可重建整张闭包,部门增删改的事务提交后整体失效,
+    并设置过期时间兜底绕过服务层的直接改库。
+    数据权限"本部门及以下"只需一次HGET,不再全表查询部门并递归。
+    """
+
+    KEY: str = RedisInitKeyConfig.DEPT_CLOSURE.key
+
+    @classmethod
+    def build(cls, parent_map: dict[int, int | None]) -> dict[int, list[int]]:
+        """
+        根据 id -> parent_id 映射计算闭包
+
+        参数:
+        - parent_map (dict[int, int | None]): 部门ID到父部门ID的映射
+
+        返回:
+        - dict[int, list[int]]: {部门ID: 后代部门ID列表(含自身)}
+        """
+        children: dict[int, list[int]] = {}
+        for dept_id, parent_id in parent_map.items():
+            if parent_id is not None:
+                children.setdefault(parent_id, []).append(dept_id)
+
+        closure: dict[int, list[int]] = {}
+        for dept_id in parent_map:
+            subtree, stack, visited = [], [dept_id], set()
+            while stack:
+                node = stack.pop()
+                if node in visited:
+                    # 脏数据中的循环引用不应导致死循环
+                    continue
+                visited.add(node)
+                subtree.append(node)
+                stack.extend(children.get(node, []))
+            closure[dept_id] = subtree
+        return closure
+
+    @classmethod
+    async def descendants(cls, redis: Redis, auth: AuthSchema, dept_id: int) -> list[int]:
+        """
+        获取部门及其全部后代部门ID
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - auth (AuthSchema): 认证信息模型
+        - dept_id (int): 部门ID
+
+        返回:
+        - list[int]: 部门ID列表(含自身)
+        """
+        try:
+            value = await redis.hget(cls.KEY, str(dept_id))
+            if value is not None:
+                return json.loads(value)
+        except Exception as e:
+            log.error(f"获取部门闭包缓存失败: {str(e)}")
+
+        closure = await cls.refresh(redis=redis, auth=auth)
+        return closure.get(dept_id, [dept_id])
+
+    @classmethod
+    async def refresh(cls, redis: Redis, auth: AuthSchema) -> dict[int, list[int]]:
+        """
+        重建部门闭包并写入缓存
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - auth (AuthSchema): 认证信息模型
+
+        返回:
+        - dict[int, list[int]]: {部门ID: 后代部门ID列表(含自身)}
+        """
+        closure = cls.build(await DeptCRUD(auth).get_parent_map_crud())
+        if closure:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(cls.KEY)
+                    pipe.hset(cls.KEY, mapping={str(k): json.dumps(v) for k, v in closure.items()})
+                    pipe.expire(cls.KEY, settings.DEPT_CLOSURE_CACHE_EXPIRE_SECONDS)
+                    await pipe.execute()
+            except Exception as e:
+                log.error(f"写入部门闭包缓存失败: {str(e)}")
+        return closure
+
+    @classmethod
+    async def invalidate(cls, redis: Redis) -> None:
+        """
+        删除部门闭包缓存,下次访问时重建
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        await RedisCURD(redis).delete(cls.KEY)
+
+
+class PrincipalCache:
+    """
+    用户权限快照缓存
+
+    以会话编号为键缓存当前用户的精简快照(角色、数据权限、权限标识等),
+    鉴权热路径只需一次Redis往返即可完成认证。
+    用户、角色、菜单、部门、岗位写操作通过递增全局版本号使所有快照失效，
+    版本号须在事务提交后递增(经 after_commit 登记)，否则并发请求可能用提交前的数据重建快照并写入新版本。
+    """
+
+    VERSION_KEY: str = f'{RedisInitKeyConfig.PRINCIPAL.key}:version'
+
+    @classmethod
+    def snapshot_key(cls, session_id: str) -> str:
+        """
+        获取快照缓存键名
+
+        参数:
+        - session_id (str): 会话编号
+
+        返回:
+        - str: 缓存键名
+        """
+        return f'{RedisInitKeyConfig.PRINCIPAL.key}:{session_id}'
+
+    @classmethod
+    async def load(cls, redis: Redis, session_id: str) -> tuple[bool, PrincipalSchema | None, int]:
+        """
+        一次MGET同时获取会话令牌、权限快照与当前版本号
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - session_id (str): 会话编号
+
+        返回:
+        - tuple[bool, PrincipalSchema | None, int]: (会话是否在线, 版本有效的快照或None, 当前版本号)
+        """
+        values = await RedisCURD(redis).mget([
+            f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
+            cls.snapshot_key(session_id),
+            cls.VERSION_KEY,
+        ])
+        if len(values) != 3:
+            return False, None, 0
+
+        token, snapshot, version = values
+        version = int(version or 0)
+        if not token:
+            return False, None, version
+        if not snapshot:
+            return True, None, version
+
+        try:
+            principal = PrincipalSchema.model_validate_json(snapshot)
+        except Exception as e:
+            log.error(f"解析用户权限快照失败: {str(e)}")
+            return True, None, version
+
+        if principal.version != version:
+            return True, None, version
+        return True, principal, version
+
+    @classmethod
+    async def save(cls, redis: Redis, session_id: str, principal: PrincipalSchema) -> None:
+        """
+        写入权限快照
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - session_id (str): 会话编号
+        - principal (PrincipalSchema): 权限快照
+        """
+        await RedisCURD(redis).set(
+            key=cls.snapshot_key(session_id),
+            value=principal.model_dump_json(),
+            expire=settings.PRINCIPAL_CACHE_EXPIRE_SECONDS
+        )
+
+    @classmethod
+    async def invalidate(cls, redis: Redis) -> None:
+        """
+        递增版本号,使所有会话的权限快照失效
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        try:
+            await redis.incr(cls.VERSION_KEY)
+        except Exception as e:
+            log.error(f"刷新用户权限快照版本失败: {str(e)}")
+
+    @classmethod
+    async def discard(cls, redis: Redis, *session_ids: str) -> None:
+        """
+        删除指定会话的权限快照
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - session_ids (str): 会话编号
+        """
+        if session_ids:
+            await RedisCURD(redis).delete(*[cls.snapshot_key(session_id) for session_id in session_ids])
+
+    @classmethod
+    def build(
+        cls,
+        user: UserModel,
+        role_permissions: dict[int, list[str]],
+        version: int,
+        dept_subtree_ids: list[int] | None = None
+    ) -> PrincipalSchema:
+        """
+        根据用户模型(需预加载roles.depts、positions)与角色权限索引构建权限快照
+
+        参数:
+        - user (UserModel): 用户模型对象
+        - role_permissions (dict[int, list[str]]): {角色ID: 权限标识列表}
+        - version (int): 快照版本号
+        - dept_subtree_ids (list[int] | None): 本部门及以下部门ID集合
+
+        返回:
+        - PrincipalSchema: 权限快照
+        """
+        roles = cls.active_roles(user)
+        positions = [pos for pos in user.positions or [] if pos and pos.status]
+        return PrincipalSchema(
+            id=user.id,
+            username=user.username,
+            name=user.name,
+            status=user.status,
+            is_superuser=user.is_superuser,
+            dept_id=user.dept_id,
+            role_ids=sorted(role.id for role in roles),
+            position_ids=sorted(pos.id for pos in positions),
+            data_scopes=sorted({role.data_scope for role in roles}),
+            dept_ids=sorted({dept.id for role in roles for dept in role.depts or []}),
+            dept_subtree_ids=sorted(dept_subtree_ids or []),
+            permissions=sorted({
+                permission
+                for role in roles
+                for permission in role_permissions.get(role.id, [])
+            }),
+            version=version,
+        )
+
+    @staticmethod
+    def active_roles(user: UserModel) -> list:
+        """
+        获取用户的可用角色
+
+        参数:
+        - user (UserModel): 用户模型对象
+
+        返回:
+        - list: 可用角色列表
+        """
+        return [role for role in user.roles or [] if role and role.status]
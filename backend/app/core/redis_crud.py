@@ -1,18 +1,203 @@
 # -*- coding: utf-8 -*-
 
 import pickle
-from typing import Any, Awaitable
+from typing import Any, AsyncIterator, Awaitable
 from redis.asyncio.client import Redis
 
 from app.core.logger import log
+from app.common.enums import RedisInitKeyConfig
 
 
 class RedisCURD:
-    """缓存工具类"""
+    """
+    缓存工具类
+
+    键名遍历一律使用 SCAN，删除使用分批流水线 UNLINK，避免 KEYS/DEL 阻塞 Redis。
+    INDEXED_NAMESPACES 中的命名空间({namespace}:{name})在 set/delete 时同步维护索引集合，
+    列出或清理该命名空间时只读取索引，不遍历整个键空间。
+    升级前写入的键不在索引中，启动时由 backfill_indexes 以 SCAN 为每个命名空间补录一次(完成标记见 MIGRATED_KEY)。
+    访问/刷新令牌数量随登录无限增长且由 SessionRegistry 单独登记，不进入索引，避免索引集合膨胀。
+    """
+
+    SCAN_COUNT: int = 1000
+    UNLINK_BATCH: int = 500
+    INDEXED_NAMESPACES: frozenset[str] = frozenset({
+        RedisInitKeyConfig.SYSTEM_CONFIG.key,
+        RedisInitKeyConfig.SYSTEM_DICT.key,
+    })
+    # 曾经建立过索引、现已停用的命名空间，启动时删除其遗留索引集合
+    RETIRED_NAMESPACES: frozenset[str] = frozenset({
+        RedisInitKeyConfig.ACCESS_TOKEN.key,
+        RedisInitKeyConfig.REFRESH_TOKEN.key,
+    })
+
+    # 已完成索引补录的命名空间集合
+    MIGRATED_KEY: str = f"{RedisInitKeyConfig.KEY_INDEX.key}:migrated"
 
     def __init__(self, redis: Redis) -> None:
         """初始化"""
         self.redis = redis
+
+    @classmethod
+    def index_key(cls, namespace: str) -> str:
+        """命名空间索引集合的键名"""
+        return f"{RedisInitKeyConfig.KEY_INDEX.key}:{namespace}"
+
+    @classmethod
+    def namespace_of(cls, key: str) -> str | None:
+        """返回键所属的已索引命名空间，未索引时返回None"""
+        namespace = str(key).split(':', 1)[0]
+        return namespace if namespace in cls.INDEXED_NAMESPACES and ':' in str(key) else None
+
+    @staticmethod
+    def __encode(value: Any) -> bytes:
+        """根据数据类型选择序列化方式: 数值与字符串按UTF-8编码，其余使用pickle"""
+        if isinstance(value, (int, float, str)):
+            return str(value).encode('utf-8')
+        return pickle.dumps(value)
+
+    async def scan_iter(self, pattern: str = "*", count: int | None = None) -> AsyncIterator[str]:
+        """增量遍历匹配的键名(SCAN)
+        
+        参数:
+        - pattern (str, optional): 匹配模式,默认值为"*"。
+        - count (int | None, optional): 每次 SCAN 的 COUNT 提示,默认值为 SCAN_COUNT。
+            
+        返回:
+        - AsyncIterator[str]: 键名异步迭代器,遍历期间新增或删除的键可能出现也可能不出现
+        """
+        async for key in self.redis.scan_iter(match=pattern, count=count or self.SCAN_COUNT):
+            yield key
+
+    async def unlink(self, *keys: str) -> int:
+        """分批流水线删除缓存(UNLINK,由 Redis 后台线程回收内存)
+        
+        参数:
+        - keys (str): 缓存键名
+            
+        返回:
+        - int: 实际删除的键数量
+        """
+        if not keys:
+            return 0
+        pipe = self.redis.pipeline(transaction=False)
+        indexed: dict[str, list[str]] = {}
+        unlink_calls = 0
+        for i in range(0, len(keys), self.UNLINK_BATCH):
+            pipe.unlink(*keys[i:i + self.UNLINK_BATCH])
+            unlink_calls += 1
+        for key in keys:
+            namespace = self.namespace_of(key)
+            if namespace:
+                indexed.setdefault(namespace, []).append(key)
+        for namespace, members in indexed.items():
+            for i in range(0, len(members), self.UNLINK_BATCH):
+                pipe.srem(self.index_key(namespace), *members[i:i + self.UNLINK_BATCH])
+        results = await pipe.execute()
+        return sum(results[:unlink_calls])
+
+    async def index_members(self, namespace: str) -> list[str]:
+        """获取命名空间下仍然存在的键名
+        
+        命名空间尚未补录索引时先通过 SCAN 补录；已过期的键从索引中剔除。
+        
+        参数:
+        - namespace (str): 命名空间
+            
+        返回:
+        - list[str]: 键名列表
+        """
+        try:
+            index_key = self.index_key(namespace)
+            if namespace not in self.INDEXED_NAMESPACES:
+                return [key async for key in self.scan_iter(f"{namespace}:*")]
+            if not await self.redis.sismember(self.MIGRATED_KEY, namespace):
+                await self.backfill_index(namespace)
+
+            members = [key async for key in self.redis.sscan_iter(index_key, count=self.SCAN_COUNT)]
+            if not members:
+                return []
+            pipe = self.redis.pipeline(transaction=False)
+            for key in members:
+                pipe.exists(key)
+            exists = await pipe.execute()
+            alive = [key for key, flag in zip(members, exists) if flag]
+            stale = [key for key, flag in zip(members, exists) if not flag]
+            for i in range(0, len(stale), self.UNLINK_BATCH):
+                await self.redis.srem(index_key, *stale[i:i + self.UNLINK_BATCH])
+            return alive
+        except Exception as e:
+            log.error(f"获取命名空间键名失败: {str(e)}")
+            return []
+
+    async def backfill_index(self, namespace: str) -> int:
+        """通过 SCAN 将命名空间下已有的键补录到索引，并记录补录完成
+        
+        参数:
+        - namespace (str): 命名空间
+            
+        返回:
+        - int: 补录的键数量
+        """
+        index_key = self.index_key(namespace)
+        keys: list[str] = []
+        async for key in self.scan_iter(f"{namespace}:*"):
+            keys.append(key)
+            if len(keys) >= self.UNLINK_BATCH:
+                await self.redis.sadd(index_key, *keys)
+                keys.clear()
+        if keys:
+            await self.redis.sadd(index_key, *keys)
+        await self.redis.sadd(self.MIGRATED_KEY, namespace)
+        return await self.redis.scard(index_key)
+
+    async def backfill_indexes(self) -> None:
+        """为尚未补录的全部索引命名空间补录一次索引，并删除已停用命名空间的遗留索引(应用启动时调用)"""
+        try:
+            retired = sorted(self.RETIRED_NAMESPACES)
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.unlink(*[self.index_key(namespace) for namespace in retired])
+            pipe.srem(self.MIGRATED_KEY, *retired)
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"删除停用的缓存键索引失败: {str(e)}")
+        for namespace in sorted(self.INDEXED_NAMESPACES):
+            try:
+                if not await self.redis.sismember(self.MIGRATED_KEY, namespace):
+                    count = await self.backfill_index(namespace)
+                    log.info(f"缓存键索引补录完成: {namespace} ({count} 个键)")
+            except Exception as e:
+                log.error(f"缓存键索引补录失败 {namespace}: {str(e)}")
+
+    async def clear_namespace(self, namespace: str) -> int:
+        """清空命名空间下的全部键及其索引
+        
+        已完成补录的索引命名空间只删除索引中的键；未索引或尚未补录的命名空间以 SCAN 遍历删除，
+        保证强制下线等安全相关场景不会遗漏索引之外的键。
+        
+        参数:
+        - namespace (str): 命名空间
+            
+        返回:
+        - int: 删除的键数量
+        """
+        try:
+            if namespace in self.INDEXED_NAMESPACES and await self.redis.sismember(self.MIGRATED_KEY, namespace):
+                deleted = await self.unlink(*await self.index_members(namespace))
+            else:
+                deleted = 0
+                remaining: list[str] = []
+                async for key in self.scan_iter(f"{namespace}:*"):
+                    remaining.append(key)
+                    if len(remaining) >= self.UNLINK_BATCH:
+                        deleted += await self.unlink(*remaining)
+                        remaining.clear()
+                deleted += await self.unlink(*remaining)
+            await self.redis.unlink(self.index_key(namespace))
+            return deleted
+        except Exception as e:
+            log.error(f"清空命名空间缓存失败: {str(e)}")
+            return 0
         
     async def mget(self, keys: list) -> list:
         """批量获取缓存
@@ -31,7 +216,7 @@ class RedisCURD:
             return []
     
     async def get_keys(self, pattern: str = "*") -> list:
-        """获取缓存键名
+        """获取缓存键名(SCAN 增量遍历，不阻塞 Redis)
         
         参数:
         - pattern (str, optional): 匹配模式,默认值为"*"。
@@ -40,8 +225,7 @@ class RedisCURD:
         - list: 返回匹配的缓存键名列表,如果获取失败则返回空列表
         """
         try:
-            keys = await self.redis.keys(f"{pattern}")
-            return keys
+            return [key async for key in self.scan_iter(pattern)]
         except Exception as e:
             log.error(f"获取缓存键名失败: {str(e)}")
             return []
@@ -80,27 +264,63 @@ class RedisCURD:
         - bool: 如果设置缓存成功则返回True,否则返回False
         """
         try:
-            # 根据数据类型选择序列化方式
-            if isinstance(value, (int, float, str)):
-                data = str(value).encode('utf-8')
-            else:
-                try:
-                    data = pickle.dumps(value)
-                except Exception as e:
-                    log.error(f"序列化数据失败: {str(e)}")
-                    return False
+            try:
+                data = self.__encode(value)
+            except Exception as e:
+                log.error(f"序列化数据失败: {str(e)}")
+                return False
                     
-            await self.redis.set(
-                name = key,
-                value = data,
-                ex=expire
-            )
+            namespace = self.namespace_of(key)
+            if namespace:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.set(name=key, value=data, ex=expire)
+                pipe.sadd(self.index_key(namespace), key)
+                await pipe.execute()
+            else:
+                await self.redis.set(
+                    name = key,
+                    value = data,
+                    ex=expire
+                )
             return True
             
         except Exception as e:
             log.error(f"设置缓存失败: {str(e)}")
             return False
 
+    async def mset(self, mapping: dict[str, Any], expire: int | None = None) -> bool:
+        """批量设置缓存，单次流水线完成写入与索引维护
+        
+        参数:
+        - mapping (dict[str, Any]): 键名 -> 缓存值
+        - expire (int | None, optional): 过期时间,单位为秒,默认值为None。
+            
+        返回:
+        - bool: 如果设置缓存成功则返回True,否则返回False
+        """
+        if not mapping:
+            return True
+        try:
+            data = {str(key): self.__encode(value) for key, value in mapping.items()}
+            pipe = self.redis.pipeline(transaction=False)
+            if expire is None:
+                pipe.mset(data)
+            else:
+                for key, value in data.items():
+                    pipe.set(name=key, value=value, ex=expire)
+            indexed: dict[str, list[str]] = {}
+            for key in data:
+                namespace = self.namespace_of(key)
+                if namespace:
+                    indexed.setdefault(namespace, []).append(key)
+            for namespace, keys in indexed.items():
+                pipe.sadd(self.index_key(namespace), *keys)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            log.error(f"批量设置缓存失败: {str(e)}")
+            return False
+
     async def delete(self, *keys: str) -> bool:
         """删除缓存
         
@@ -111,7 +331,7 @@ class RedisCURD:
         - bool: 如果删除缓存成功则返回True,否则返回False
         """
         try:
-            await self.redis.delete(*keys)
+            await self.unlink(*keys)
             return True
         except Exception as e:
             log.error(f"删除缓存失败: {str(e)}")
@@ -127,9 +347,13 @@ class RedisCURD:
         - bool: 如果清空缓存成功则返回True,否则返回False
         """
         try:
-            keys = await self.redis.keys(f"{pattern}")
-            if keys:
-                await self.redis.delete(*keys)
+            batch: list[str] = []
+            async for key in self.scan_iter(pattern):
+                batch.append(key)
+                if len(batch) >= self.SCAN_COUNT:
+                    await self.unlink(*batch)
+                    batch = []
+            await self.unlink(*batch)
             return True
         except Exception as e:
             log.error(f"清空缓存失败: {str(e)}")
@@ -228,7 +452,7 @@ class RedisCURD:
         - bool: 如果设置哈希缓存成功则返回True,否则返回False
         """
         try:
-            self.redis.hset(name=name, key=key, value=value)
+            await self.redis.hset(name=name, key=key, value=value)
             return True
         except Exception as e:
             log.error(f"设置哈希缓存失败: {str(e)}")
@@ -245,7 +469,7 @@ class RedisCURD:
         - Awaitable[list[Any]] | list[Any]: 返回哈希缓存值列表,如果获取失败则返回空列表
         """
         try:
-            data = self.redis.hmget(name=name, keys=keys)
+            data = await self.redis.hmget(name=name, keys=keys)
             return data
         except Exception as e:
             log.error(f"获取哈希缓存失败: {str(e)}")
@@ -2,17 +2,13 @@
 
 import time
 import json
+from datetime import datetime
 from typing import Any, Callable, Coroutine
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
-from user_agents import parse
 
-from app.core.database import async_db_session
 from app.config.setting import settings
-from app.utils.ip_local_util import IpLocalUtil
-from app.api.v1.module_system.auth.schema import AuthSchema
-from app.api.v1.module_system.log.schema import OperationLogCreateSchema
-from app.api.v1.module_system.log.service import OperationLogService
+from app.core.log_writer import OperationLogWriter
 
 """
 在 FastAPI 中，route_class 参数用于自定义路由的行为。
@@ -58,7 +54,6 @@ class OperationLogRoute(APIRoute):
             if route.name in settings.IGNORE_OPERATION_FUNCTION:
                 return response
             
-            user_agent = parse(request.headers.get("user-agent"))
             payload = b"{}"
             req_content_type = request.headers.get("Content-Type", "")
             
@@ -112,8 +107,6 @@ class OperationLogRoute(APIRoute):
                 if request.client:
                     request_ip = request.client.host
             
-            login_location = await IpLocalUtil.get_ip_location(request_ip) if request_ip else None
-            
             # 判断请求是否来自api文档
             referer = request.headers.get('referer')
             request_from_swagger = referer and referer.endswith('docs')
@@ -123,25 +116,27 @@ class OperationLogRoute(APIRoute):
                 # 如果请求来自api文档，则不记录日志
                 pass
             else:
-                async with async_db_session() as session:
-                    async with session.begin():
-                        auth = AuthSchema(db=session)
-                        await OperationLogService.create_log_service(data=OperationLogCreateSchema(
-                            type = log_type,
-                            request_path = request.url.path,
-                            request_method = request.method,
-                            request_payload = payload,
-                            request_ip = request_ip,
-                            login_location=login_location,
-                            request_os = user_agent.os.family,
-                            request_browser = user_agent.browser.family,
-                            response_code = response.status_code,
-                            response_json = response_data.decode() if isinstance(response_data, (bytes, bytearray)) else str(response_data),
-                            process_time = process_time,
-                            description = route.summary,
-                            created_id = current_user_id,
-                            updated_id = current_user_id,
-                        ), auth = auth) 
+                # UA解析、IP归属地与落库均由后台写入器批量完成，不阻塞请求
+                record = dict(
+                    type = log_type,
+                    request_path = request.url.path,
+                    request_method = request.method,
+                    request_payload = payload,
+                    request_ip = request_ip,
+                    user_agent = request.headers.get("user-agent"),
+                    response_code = response.status_code,
+                    response_json = response_data.decode() if isinstance(response_data, (bytes, bytearray)) else str(response_data),
+                    process_time = process_time,
+                    description = route.summary,
+                    created_id = current_user_id,
+                    updated_id = current_user_id,
+                    created_time = datetime.now(),
+                )
+                if OperationLogWriter.running():
+                    OperationLogWriter.enqueue(record)
+                else:
+                    # 写入器未启动(如未执行lifespan的测试环境)时直接写入
+                    await OperationLogWriter.flush([record])
             
             return response
 
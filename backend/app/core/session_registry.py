@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+from datetime import datetime
+from typing import Any
+from redis.asyncio.client import Redis
+
+from app.common.enums import RedisInitKeyConfig
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+from app.core.principal import PrincipalCache
+from app.core.security import decode_access_token
+
+
+class SessionRegistry:
+    """
+    在线会话登记表
+
+    登录/刷新令牌时登记会话，退出或强制下线时注销，在线用户监控无需遍历令牌键、也无需解码JWT:
+    - online_session:login  有序集合，成员为会话编号，分值为登录时间戳，用于按登录时间倒序分页
+    - online_session:expire 有序集合，分值为访问令牌过期时间戳，用于清理已过期会话
+    - online_session:info   哈希，会话编号 -> 会话信息JSON
+    - online_session:user:{user_id} 集合，用户的全部会话编号
+    """
+
+    PREFIX: str = RedisInitKeyConfig.ONLINE_SESSION.key
+    LOGIN_KEY: str = f'{PREFIX}:login'
+    EXPIRE_KEY: str = f'{PREFIX}:expire'
+    INFO_KEY: str = f'{PREFIX}:info'
+    SCAN_CHUNK: int = 500
+
+    @classmethod
+    def user_key(cls, user_id: int) -> str:
+        """
+        获取用户会话集合键名
+
+        参数:
+        - user_id (int): 用户ID
+
+        返回:
+        - str: 缓存键名
+        """
+        return f'{cls.PREFIX}:user:{user_id}'
+
+    @classmethod
+    async def register(cls, redis: Redis, session_info: dict[str, Any], expire_at: float, login_at: float | None = None) -> None:
+        """
+        登记或续期会话(重复登记保留原登录时间)
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - session_info (dict[str, Any]): 会话信息，需包含 session_id、user_id
+        - expire_at (float): 访问令牌过期时间戳
+        - login_at (float | None): 登录时间戳，默认为当前时间
+        """
+        session_id = session_info["session_id"]
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.zadd(cls.LOGIN_KEY, {session_id: login_at or time.time()}, nx=True)
+            pipe.zadd(cls.EXPIRE_KEY, {session_id: expire_at})
+            pipe.hset(cls.INFO_KEY, session_id, json.dumps(session_info, ensure_ascii=False, default=str))
+            pipe.sadd(cls.user_key(session_info["user_id"]), session_id)
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"登记在线会话失败: {str(e)}")
+
+    @classmethod
+    async def backfill(cls, redis: Redis) -> int:
+        """
+        为未登记的在线会话补登记，启动时调用。
+
+        登记表上线前签发的访问令牌仍然有效但不在登记表中，在线用户列表看不到、按用户强制下线也无法结束这些会话；
+        此处遍历访问令牌键，解码未登记会话的令牌取得会话信息，按令牌剩余有效期补登记。
+
+        参数:
+        - redis (Redis): Redis客户端对象
+
+        返回:
+        - int: 补登记的会话数量
+        """
+        prefix = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:'
+        keys = await RedisCURD(redis).get_keys(f'{prefix}*')
+        count = 0
+        for i in range(0, len(keys), cls.SCAN_CHUNK):
+            chunk = keys[i:i + cls.SCAN_CHUNK]
+            session_ids = [key[len(prefix):] for key in chunk]
+            infos = await redis.hmget(cls.INFO_KEY, session_ids)
+            missing = [(key, session_id) for key, session_id, info in zip(chunk, session_ids, infos) if not info]
+            if not missing:
+                continue
+            pipe = redis.pipeline(transaction=False)
+            for key, _ in missing:
+                pipe.get(key)
+                pipe.ttl(key)
+            values = await pipe.execute()
+            now = time.time()
+            for (_, session_id), token, ttl in zip(missing, values[::2], values[1::2]):
+                if not token or ttl is None or ttl <= 0:
+                    continue
+                try:
+                    session_info = json.loads(decode_access_token(token).sub)
+                except Exception as e:
+                    log.warning(f"补登记在线会话 {session_id} 失败: {str(e)}")
+                    continue
+                if session_info.get("session_id") != session_id or not session_info.get("user_id"):
+                    continue
+                try:
+                    login_at = datetime.fromisoformat(str(session_info.get("login_time"))).timestamp()
+                except ValueError:
+                    login_at = None
+                await cls.register(redis, session_info, expire_at=now + ttl, login_at=login_at)
+                count += 1
+        return count
+
+    @classmethod
+    async def unregister(cls, redis: Redis, *session_ids: str) -> None:
+        """
+        注销会话登记(不删除令牌)
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - session_ids (str): 会话编号
+        """
+        if not session_ids:
+            return
+        infos = await redis.hmget(cls.INFO_KEY, list(session_ids))
+        pipe = redis.pipeline(transaction=False)
+        pipe.zrem(cls.LOGIN_KEY, *session_ids)
+        pipe.zrem(cls.EXPIRE_KEY, *session_ids)
+        pipe.hdel(cls.INFO_KEY, *session_ids)
+        for session_id, info in zip(session_ids, infos):
+            if info:
+                pipe.srem(cls.user_key(json.loads(info)["user_id"]), session_id)
+        await pipe.execute()
+
+    @classmethod
+    async def terminate(cls, redis: Redis, *session_ids: str) -> None:
+        """
+        结束会话: 删除访问/刷新令牌、权限快照并注销登记
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - session_ids (str): 会话编号
+        """
+        if not session_ids:
+            return
+        await RedisCURD(redis).delete(*[
+            f'{config.key}:{session_id}'
+            for session_id in session_ids
+            for config in (RedisInitKeyConfig.ACCESS_TOKEN, RedisInitKeyConfig.REFRESH_TOKEN)
+        ])
+        await PrincipalCache.discard(redis, *session_ids)
+        await cls.unregister(redis, *session_ids)
+
+    @classmethod
+    async def terminate_user(cls, redis: Redis, *user_ids: int) -> int:
+        """
+        结束用户的全部会话，只读取该用户自身的会话集合
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - user_ids (int): 用户ID
+
+        返回:
+        - int: 结束的会话数量
+        """
+        session_ids: list[str] = []
+        for user_id in user_ids:
+            session_ids.extend(await redis.smembers(cls.user_key(user_id)))
+        await cls.terminate(redis, *session_ids)
+        return len(session_ids)
+
+    @classmethod
+    async def prune(cls, redis: Redis) -> None:
+        """
+        清理访问令牌已过期的会话登记
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        expired = await redis.zrangebyscore(cls.EXPIRE_KEY, '-inf', time.time())
+        for i in range(0, len(expired), cls.SCAN_CHUNK):
+            await cls.unregister(redis, *expired[i:i + cls.SCAN_CHUNK])
+
+    @classmethod
+    async def page(cls, redis: Redis, page_no: int, page_size: int, matcher=None) -> tuple[int, list[dict]]:
+        """
+        按登录时间倒序分页获取在线会话
+
+        无过滤条件时只读取当前页(ZREVRANGE + HMGET)；有过滤条件时分块读取会话信息并过滤，均不解码JWT。
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        - page_no (int): 页码
+        - page_size (int): 每页数量
+        - matcher (Callable[[dict], bool] | None): 过滤函数
+
+        返回:
+        - tuple[int, list[dict]]: (总数, 当前页会话信息列表)
+        """
+        await cls.prune(redis)
+        start = (page_no - 1) * page_size
+        if matcher is None:
+            total = await redis.zcard(cls.LOGIN_KEY)
+            session_ids = await redis.zrevrange(cls.LOGIN_KEY, start, start + page_size - 1)
+            infos = await redis.hmget(cls.INFO_KEY, session_ids) if session_ids else []
+            return total, [json.loads(info) for info in infos if info]
+
+        total = 0
+        items: list[dict] = []
+        offset = 0
+        while True:
+            session_ids = await redis.zrevrange(cls.LOGIN_KEY, offset, offset + cls.SCAN_CHUNK - 1)
+            if not session_ids:
+                break
+            offset += len(session_ids)
+            for info in await redis.hmget(cls.INFO_KEY, session_ids):
+                if not info:
+                    continue
+                session_info = json.loads(info)
+                if not matcher(session_info):
+                    continue
+                if start <= total < start + page_size:
+                    items.append(session_info)
+                total += 1
+        return total, items
+
+    @classmethod
+    async def clear(cls, redis: Redis) -> None:
+        """
+        清空全部会话登记
+
+        参数:
+        - redis (Redis): Redis客户端对象
+        """
+        user_keys = {cls.user_key(json.loads(info)["user_id"]) for info in await redis.hvals(cls.INFO_KEY)}
+        await RedisCURD(redis).unlink(cls.LOGIN_KEY, cls.EXPIRE_KEY, cls.INFO_KEY, *user_keys)
@@ -13,7 +13,7 @@ from app.core.exceptions import CustomException
 DateTimeStr = Annotated[
     datetime,
     AfterValidator(lambda x: datetime_validator(x)),
-    PlainSerializer(lambda x: x.strftime('%Y-%m-%d %H:%M:%S') if isinstance(x, datetime) else str(x), return_type=str),
+    PlainSerializer(lambda x: datetime_str(x), return_type=str),
     WithJsonSchema({'type': 'string'}, mode='serialization')
 ]
 
@@ -33,6 +33,20 @@ Email = Annotated[
     WithJsonSchema({'type': 'string'}, mode='serialization')
 ]
 
+def datetime_str(value: datetime | None) -> str | None:
+    """
+    日期时间格式化为 "YYYY-mm-dd HH:MM:SS"，与 DateTimeStr 的序列化结果一致。
+
+    参数:
+    - value (datetime | None): 日期时间。
+
+    返回:
+    - str | None: 格式化后的字符串，None 原样返回。
+    """
+    if value is None:
+        return None
+    return value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else str(value)
+
 def datetime_validator(value: str | datetime) -> datetime:
     """
     日期格式验证器。
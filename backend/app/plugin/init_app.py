@@ -3,7 +3,6 @@
 from starlette.responses import HTMLResponse
 from typing import Any, AsyncGenerator
 from fastapi import Depends, FastAPI, Request, Response
-from fastapi.staticfiles import StaticFiles
 from fastapi.concurrency import asynccontextmanager
 from fastapi.openapi.docs import (
     get_redoc_html,
@@ -14,11 +13,17 @@ from fastapi_limiter import FastAPILimiter
 from fastapi_limiter.depends import RateLimiter
 from math import ceil
 
+from app.config.path_conf import BASE_DIR
 from app.config.setting import settings
 from app.core.logger import log
 from app.core.discover import router
 from app.core.exceptions import CustomException, handle_exception
+from app.core.redis_crud import RedisCURD
+from app.core.session_registry import SessionRegistry
 from app.utils.common_util import import_module, import_modules_async
+from app.utils.ip_local_util import IpLocalUtil
+from app.utils.compress_util import CompressUtil, PrecompressedStaticFiles
+from app.utils.hash_bcrpy_util import PwdUtil
 from app.scripts.initialize import InitializeData
 
 from app.api.v1.module_application.job.tools.ap_scheduler import SchedulerUtil
@@ -42,6 +47,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
         log.info(f"✅ {settings.DATABASE_TYPE}数据库初始化完成")
         await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=True)
         log.info("✅ 全局事件模块加载完成")
+        await RedisCURD(app.state.redis).backfill_indexes()
+        log.info("✅ 缓存键索引检查完成")
+        backfilled = await SessionRegistry.backfill(app.state.redis)
+        log.info(f"✅ 在线会话登记检查完成，补登记 {backfilled} 个会话")
         await ParamsService().init_config_service(redis=app.state.redis)
         log.info("✅ Redis系统配置初始化完成")
         await DictDataService().init_dict_service(redis=app.state.redis)
@@ -78,12 +87,17 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     yield
     
     try:
-        await import_modules_async(modules=settings.EVENT_LIST, desc="全局事件", app=app, status=False)
-        log.info("✅ 全局事件模块卸载完成")
         await SchedulerUtil.close_system_scheduler()
         log.info("✅ 定时任务调度器已关闭")
+        # 按加载的逆序卸载，操作日志写入器等依赖Redis的模块先于Redis连接关闭
+        await import_modules_async(modules=settings.EVENT_LIST[::-1], desc="全局事件", app=app, status=False)
+        log.info("✅ 全局事件模块卸载完成")
         await FastAPILimiter.close()
         log.info("✅ 请求限制器已关闭")
+        await IpLocalUtil.close()
+        log.info("✅ IP归属地解析器已关闭")
+        PwdUtil.shutdown()
+        log.info("✅ 密码运算池已关闭")
 
     except Exception as e:
         log.error(f"❌ 应用关闭过程中发生错误: {str(e)}")
@@ -143,7 +157,12 @@ def register_files(app: FastAPI) -> None:
     if settings.STATIC_ENABLE:
         # 确保日志目录存在
         settings.STATIC_ROOT.mkdir(parents=True, exist_ok=True)
-        app.mount(path=settings.STATIC_URL, app=StaticFiles(directory=settings.STATIC_ROOT), name=settings.STATIC_DIR)
+        # 预先生成 .gz/.br 文件，请求时直接返回，不做实时压缩
+        if settings.STATIC_PRECOMPRESS:
+            # 上传目录的文件在运行期由资源管理增删改，不做预压缩
+            generated = CompressUtil.precompress_dir(settings.STATIC_ROOT, exclude=[BASE_DIR.joinpath(settings.UPLOAD_FILE_PATH)])
+            log.info(f"✅️ 静态资源预压缩完成，新生成 {generated} 个文件")
+        app.mount(path=settings.STATIC_URL, app=PrecompressedStaticFiles(directory=settings.STATIC_ROOT), name=settings.STATIC_DIR)
 
 def reset_api_docs(app: FastAPI) -> None:
     """
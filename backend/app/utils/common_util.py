@@ -4,7 +4,7 @@ import importlib
 import re
 import uuid
 from pathlib import Path
-from typing import Any, Literal, Sequence, Generator
+from typing import Any, Callable, Literal, Mapping, Sequence, Generator
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.engine.row import Row
 from sqlalchemy.orm.collections import InstrumentedList
@@ -153,49 +153,174 @@ def get_child_recursion(id: int, id_map: dict[int, list[int]], ids: list[int] |
     return ids
 
 
-def traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def collect_tree_ids(
+    ids: Sequence[int],
+    parent_map: dict[int, int | None],
+    direction: Literal['ancestors', 'descendants'] = 'descendants',
+) -> list[int]:
     """
-    通过遍历算法构造树形结构
+    迭代收集节点及其全部祖先或后代节点ID(含自身)，不受递归深度限制，存在环路时同样终止
 
     参数:
-    - nodes (list[dict[str, Any]]): 树节点列表。
+    - ids (Sequence[int]): 起始节点ID，不在 parent_map 中的ID忽略。
+    - parent_map (dict[int, int | None]): {id: parent_id} 映射。
+    - direction (Literal['ancestors', 'descendants']): 收集祖先或后代。
+
+    返回:
+    - list[int]: 节点ID列表(广度优先顺序)。
+    """
+    if direction == 'ancestors':
+        step = lambda node_id: [parent_map[node_id]] if parent_map.get(node_id) is not None else []
+    else:
+        children: dict[int, list[int]] = {}
+        for node_id, parent_id in parent_map.items():
+            if parent_id is not None:
+                children.setdefault(parent_id, []).append(node_id)
+        step = lambda node_id: children.get(node_id, [])
+
+    result = list(dict.fromkeys(node_id for node_id in ids if node_id in parent_map))
+    visited = set(result)
+    index = 0
+    while index < len(result):
+        for next_id in step(result[index]):
+            if next_id in parent_map and next_id not in visited:
+                visited.add(next_id)
+                result.append(next_id)
+        index += 1
+    return result
+
+
+def _tree_node(node: Any, fields: Sequence[str] | None) -> dict[str, Any]:
+    """
+    将树节点统一转换为字典(字典原样返回)
+
+    参数:
+    - node (Any): 字典、ORM对象、查询结果行(Row)或元组。
+    - fields (Sequence[str] | None): 读取的字段名，元组按位置对应，ORM对象按属性名读取。
+
+    返回:
+    - dict[str, Any]: 节点字典。
+    """
+    if isinstance(node, dict):
+        return node
+    if fields is not None:
+        if isinstance(node, tuple):
+            return dict(zip(fields, node))
+        return {field: getattr(node, field, None) for field in fields}
+    if isinstance(node, Row):
+        return dict(node._mapping)
+    if isinstance(node, DeclarativeBase):
+        return {column.key: getattr(node, column.key) for column in node.__table__.columns}
+    raise CustomException(msg=f"无法识别的树节点类型: {type(node).__name__}")
+
+
+def build_tree(
+    nodes: Sequence[Any],
+    *,
+    fields: Sequence[str] | None = None,
+    formatters: Mapping[str, Callable[[Any], Any]] | None = None,
+    id_key: str = 'id',
+    parent_key: str = 'parent_id',
+) -> list[dict[str, Any]]:
+    """
+    按ID索引一次遍历构造树形结构，时间复杂度 O(n)
+
+    - 兄弟节点保持输入顺序，叶子节点的 children 为 None
+    - 重复ID只保留第一个节点
+    - 父节点不在列表中的孤儿节点作为根节点
+    - 存在环路时在环上首个节点处断开，该节点作为根节点
+
+    参数:
+    - nodes (Sequence[Any]): 树节点列表，可为字典、ORM对象、查询结果行(Row)或元组。
+    - fields (Sequence[str] | None): ORM对象/元组节点读取的字段名，为空时ORM对象读取全部列、Row按列名读取。
+    - formatters (Mapping[str, Callable[[Any], Any]] | None): 字段格式化函数，如直接读取ORM对象时按 DateTimeStr 格式化时间字段。
+    - id_key (str): 节点ID字段名。
+    - parent_key (str): 父节点ID字段名。
 
     返回:
     - list[dict[str, Any]]: 构造后的树形结构列表。
     """
-    tree: list[dict[str, Any]] = []
-    node_dict = {node['id']: node for node in nodes}
+    index: dict[Any, dict[str, Any]] = {}
+    for item in nodes:
+        node = _tree_node(item, fields)
+        node_id = node[id_key]
+        if node_id in index:
+            continue
+        if formatters:
+            for key, formatter in formatters.items():
+                if key in node:
+                    node[key] = formatter(node[key])
+        node['children'] = None
+        index[node_id] = node
 
-    for node in nodes:
-        # 确保每个节点都有children字段，即使没有子节点也设置为null
-        if 'children' not in node:
-            node['children'] = None
-            
-        parent_id = node['parent_id']
-        if parent_id is None:
+    tree: list[dict[str, Any]] = []
+    orphans: list[Any] = []
+    for node in index.values():
+        parent_id = node[parent_key]
+        parent_node = index.get(parent_id) if parent_id is not None else None
+        if parent_node is None:
+            if parent_id is not None:
+                orphans.append(node[id_key])
             tree.append(node)
+        elif parent_node['children'] is None:
+            parent_node['children'] = [node]
         else:
-            parent_node = node_dict.get(parent_id)
-            if parent_node is not None:
-                if 'children' not in parent_node or parent_node['children'] is None:
-                    parent_node['children'] = []
-                if node not in parent_node['children']:
-                    parent_node['children'].append(node)
-            else:
-                if node not in tree:
-                    tree.append(node)
-    
-    # 确保所有节点都有children字段
-    for node in tree:
-        if 'children' not in node:
-            node['children'] = None
-
+            parent_node['children'].append(node)
+
+    # 从根节点出发不可达的节点位于环路上
+    visited: set[Any] = set()
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        visited.add(node[id_key])
+        if node['children']:
+            stack.extend(node['children'])
+    cycles: list[Any] = []
+    if len(visited) < len(index):
+        for node_id, node in index.items():
+            if node_id in visited:
+                continue
+            # 沿父节点上溯至首个重复节点，该节点位于环路上
+            path: set[Any] = set()
+            while node[id_key] not in path:
+                path.add(node[id_key])
+                node = index[node[parent_key]]
+            parent_node = index[node[parent_key]]
+            parent_node['children'] = [child for child in parent_node['children'] if child is not node] or None
+            cycles.append(node[id_key])
+            tree.append(node)
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                visited.add(current[id_key])
+                if current['children']:
+                    stack.extend(current['children'])
+
+    if orphans:
+        log.warning(f"构造树形结构: {len(orphans)} 个节点的父节点不存在，已作为根节点: {orphans[:10]}")
+    if cycles:
+        log.warning(f"构造树形结构: 检测到 {len(cycles)} 处父子环路，已在节点 {cycles[:10]} 处断开")
     return tree
 
 
+def traversal_to_tree(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    通过遍历算法构造树形结构(等同于 build_tree)
+
+    参数:
+    - nodes (list[dict[str, Any]]): 树节点列表。
+
+    返回:
+    - list[dict[str, Any]]: 构造后的树形结构列表。
+    """
+    return build_tree(nodes)
+
+
 def recursive_to_tree(nodes: list[dict[str, Any]], *, parent_id: int | None = None) -> list[dict[str, Any]]:
     """
-    通过递归算法构造树形结构（性能影响较大）
+    构造指定父节点下的树形结构(按父ID分组，时间复杂度 O(n))
+
+    叶子节点不设置 children 字段，父节点不可达的节点不出现在结果中。
 
     参数:
     - nodes (list[dict[str, Any]]): 树节点列表。
@@ -204,13 +329,22 @@ def recursive_to_tree(nodes: list[dict[str, Any]], *, parent_id: int | None = No
     返回:
     - list[dict[str, Any]]: 构造后的树形结构列表。
     """
-    tree: list[dict[str, Any]] = []
+    groups: dict[Any, list[dict[str, Any]]] = {}
     for node in nodes:
-        if node['parent_id'] == parent_id:
-            child_nodes = recursive_to_tree(nodes, parent_id=node['id'])
-            if child_nodes:
-                node['children'] = child_nodes
-            tree.append(node)
+        groups.setdefault(node['parent_id'], []).append(node)
+    tree = groups.get(parent_id, [])
+    # 只展开从 parent_id 可达的节点，环路上的节点不会被访问
+    stack = list(tree)
+    visited: set[Any] = set()
+    while stack:
+        node = stack.pop()
+        if node['id'] in visited:
+            continue
+        visited.add(node['id'])
+        children = groups.get(node['id'])
+        if children:
+            node['children'] = children
+            stack.extend(children)
     return tree
 
 
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+import os
+from stat import S_ISREG
+import gzip
+import zlib
+import mimetypes
+from pathlib import Path
+from typing import Callable, Iterable
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.config.setting import settings
+from app.core.logger import log
+
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时不提供 br 编码
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖，未安装时不提供 zstd 编码
+    zstandard = None
+
+
+class CompressUtil:
+    """
+    响应压缩工具类
+
+    按 Accept-Encoding 协商编码(zstd/br/gzip)，按负载大小选择压缩级别：
+    小响应用较高级别换取体积，大响应用低级别控制CPU耗时，流式响应使用低级别并逐块刷新。
+    """
+
+    # 各编码的 (小负载级别, 大负载级别, 流式级别)
+    LEVELS: dict[str, tuple[int, int, int]] = {
+        'zstd': (6, 3, 1),
+        'br': (5, 2, 1),
+        'gzip': (6, 1, 1),
+    }
+
+    # 已压缩或不适合压缩的媒体类型(前缀匹配)
+    SKIP_MEDIA_TYPES: tuple[str, ...] = (
+        'image/', 'video/', 'audio/', 'font/woff',
+        'text/event-stream',
+        'application/zip', 'application/gzip', 'application/x-gzip', 'application/x-7z-compressed',
+        'application/x-rar-compressed', 'application/x-bzip2', 'application/zstd', 'application/pdf',
+        'application/octet-stream',
+        'application/vnd.openxmlformats-officedocument', 'application/vnd.ms-excel',
+    )
+
+    # 预压缩的静态文件扩展名
+    PRECOMPRESS_SUFFIXES: frozenset[str] = frozenset({
+        '.js', '.mjs', '.css', '.html', '.htm', '.json', '.map', '.svg', '.txt', '.xml', '.ttf',
+    })
+
+    @classmethod
+    def available(cls) -> list[str]:
+        """
+        获取当前环境可用的编码(按服务端优先级排序)
+
+        返回:
+        - list[str]: 编码列表
+        """
+        encodings = []
+        for encoding in settings.COMPRESSION_ENCODINGS:
+            if encoding == 'zstd' and zstandard is None:
+                continue
+            if encoding == 'br' and brotli is None:
+                continue
+            if encoding in cls.LEVELS:
+                encodings.append(encoding)
+        return encodings
+
+    @classmethod
+    def negotiate(cls, accept_encoding: str | None, encodings: list[str] | None = None) -> str | None:
+        """
+        按 Accept-Encoding 选择编码
+
+        参数:
+        - accept_encoding (str | None): 请求头 Accept-Encoding
+        - encodings (list[str] | None): 候选编码，默认使用全部可用编码
+
+        返回:
+        - str | None: 选中的编码，客户端不接受任何候选编码时返回None
+        """
+        if not accept_encoding:
+            return None
+        accepted: dict[str, float] = {}
+        for item in accept_encoding.lower().split(','):
+            name, _, params = item.strip().partition(';')
+            quality = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+        wildcard = accepted.get('*', 0.0)
+        for encoding in encodings if encodings is not None else cls.available():
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return None
+
+    @classmethod
+    def compressible(cls, content_type: str | None) -> bool:
+        """
+        判断媒体类型是否需要压缩
+
+        参数:
+        - content_type (str | None): 响应头 Content-Type
+
+        返回:
+        - bool: 是否需要压缩
+        """
+        if not content_type:
+            return True
+        return not content_type.lower().startswith(cls.SKIP_MEDIA_TYPES)
+
+    @classmethod
+    def level(cls, encoding: str, size: int | None) -> int:
+        """
+        按负载大小选择压缩级别
+
+        参数:
+        - encoding (str): 编码
+        - size (int | None): 负载字节数，None 表示流式响应
+
+        返回:
+        - int: 压缩级别
+        """
+        small, large, streaming = cls.LEVELS[encoding]
+        if size is None:
+            return streaming
+        return small if size < settings.COMPRESSION_LARGE_SIZE else large
+
+    @classmethod
+    def compress(cls, data: bytes, encoding: str, level: int) -> bytes:
+        """
+        一次性压缩数据
+
+        参数:
+        - data (bytes): 原始数据
+        - encoding (str): 编码
+        - level (int): 压缩级别
+
+        返回:
+        - bytes: 压缩后的数据
+        """
+        if encoding == 'zstd':
+            return zstandard.ZstdCompressor(level=level).compress(data)
+        if encoding == 'br':
+            return brotli.compress(data, quality=level)
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+    @classmethod
+    def stream_compressor(cls, encoding: str, level: int) -> tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+        """
+        创建流式压缩器，每块数据压缩后立即刷新，保证流式响应的实时性
+
+        参数:
+        - encoding (str): 编码
+        - level (int): 压缩级别
+
+        返回:
+        - tuple[Callable[[bytes], bytes], Callable[[], bytes]]: (压缩一块数据, 结束并输出剩余数据)
+        """
+        if encoding == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            return (
+                lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                compressor.flush,
+            )
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=level)
+            return (lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish)
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush)
+
+    @classmethod
+    def precompress_dir(cls, root: Path, exclude: Iterable[Path] = ()) -> int:
+        """
+        为目录下的文本类静态文件生成 .gz/.br 预压缩文件(源文件未变化时跳过)
+
+        参数:
+        - root (Path): 静态文件根目录
+        - exclude (Iterable[Path]): 跳过的子目录，如运行期可增删改的上传目录
+
+        返回:
+        - int: 新生成的预压缩文件数量
+        """
+        encodings = [('gzip', '.gz')] + ([('br', '.br')] if brotli is not None else [])
+        excluded = {Path(path).resolve() for path in exclude}
+        generated = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if (Path(dirpath) / name).resolve() not in excluded]
+            for filename in filenames:
+                source = Path(dirpath) / filename
+                if source.suffix.lower() not in cls.PRECOMPRESS_SUFFIXES:
+                    continue
+                try:
+                    stat = source.stat()
+                    if stat.st_size < settings.GZIP_MIN_SIZE:
+                        continue
+                    data = None
+                    for encoding, suffix in encodings:
+                        target = source.with_name(source.name + suffix)
+                        if target.exists() and target.stat().st_mtime >= stat.st_mtime:
+                            continue
+                        data = data if data is not None else source.read_bytes()
+                        # 构建期一次性生成，使用最高压缩级别
+                        compressed = cls.compress(data, encoding, 9 if encoding == 'gzip' else 11)
+                        # 压缩收益不足时不生成，请求直接使用源文件
+                        if len(compressed) >= len(data) * 0.9:
+                            continue
+                        target.write_bytes(compressed)
+                        os.utime(target, (stat.st_atime, stat.st_mtime))
+                        generated += 1
+                except OSError as e:
+                    log.error(f"生成预压缩文件失败 {source}: {e}")
+        return generated
+
+
+    @classmethod
+    def is_sidecar(cls, path: str | Path) -> bool:
+        """
+        判断文件是否为预压缩文件(.gz/.br 且去掉后缀的源文件存在)
+
+        参数:
+        - path (str | Path): 文件路径
+
+        返回:
+        - bool: 是否为预压缩文件
+        """
+        path = Path(path)
+        if path.suffix not in ('.gz', '.br'):
+            return False
+        source = path.with_suffix('')
+        return source.suffix.lower() in cls.PRECOMPRESS_SUFFIXES and source.is_file()
+
+    @classmethod
+    def remove_sidecars(cls, path: str | Path) -> None:
+        """
+        删除文件的预压缩文件，源文件被删除、移动或覆盖时调用
+
+        参数:
+        - path (str | Path): 源文件路径
+        """
+        for suffix in ('.gz', '.br'):
+            sidecar = Path(f'{path}{suffix}')
+            try:
+                if sidecar.is_file():
+                    sidecar.unlink()
+            except OSError as e:
+                log.error(f"删除预压缩文件失败 {sidecar}: {e}")
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    支持预压缩文件的静态文件服务
+
+    客户端接受对应编码且存在 .br/.gz 预压缩文件时直接返回预压缩文件，不做实时压缩。
+    源文件不存在或比预压缩文件新(被删除、覆盖)时忽略预压缩文件。
+    """
+
+    SIDECARS: tuple[tuple[str, str], ...] = (('br', '.br'), ('gzip', '.gz'))
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        accept_encoding = Headers(scope=scope).get('accept-encoding')
+        if accept_encoding and scope['method'] in ('GET', 'HEAD'):
+            _, source_stat = self.lookup_path(path)
+            for encoding, suffix in self.SIDECARS:
+                if source_stat is None or not S_ISREG(source_stat.st_mode):
+                    break
+                if CompressUtil.negotiate(accept_encoding, [encoding]) is None:
+                    continue
+                full_path, stat_result = self.lookup_path(path + suffix)
+                if stat_result is None or not os.path.isfile(full_path):
+                    continue
+                if stat_result.st_mtime < source_stat.st_mtime:
+                    continue
+                response = self.file_response(full_path, stat_result, scope)
+                media_type, _ = mimetypes.guess_type(path)
+                response.headers['content-type'] = media_type or 'application/octet-stream'
+                response.headers['content-encoding'] = encoding
+                response.headers['vary'] = 'Accept-Encoding'
+                return response
+        return await super().get_response(path, scope)
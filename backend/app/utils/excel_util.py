@@ -1,32 +1,40 @@
 # -*- coding: utf-8 -*-
 
 import io
-import pandas as pd
-from typing import Any
+import csv
+import json
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Literal
+from fastapi.concurrency import run_in_threadpool
+from pydantic_core import to_json
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.worksheet.datavalidation import DataValidation
 
 
-class ExcelUtil:
-    """Excel文件处理工具类"""
-    
-    @classmethod
-    def __mapping_list(cls, list_data: list[dict[str, Any]], mapping_dict: dict) -> list:
-        """
-        工具方法：将列表数据中的字段名映射为对应的中文字段名。
+ExportFormat = Literal['xlsx', 'csv', 'ndjson']
 
-        参数:
-        - list_data (list[dict[str, Any]]): 数据列表。
-        - mapping_dict (dict): 字段名映射字典。
 
-        返回:
-        - list: 映射后的数据列表。
-        """
-        mapping_data = [{mapping_dict.get(key): item.get(key) for key in mapping_dict} for item in list_data]
+class ExcelUtil:
+    """Excel文件处理工具类"""
 
-        return mapping_data
+    # 导出格式对应的媒体类型
+    MEDIA_TYPES: dict[str, str] = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson',
+    }
+    # 内存中缓存的最大文件大小，超过后写入磁盘临时文件
+    SPOOL_MAX_SIZE: int = 8 * 1024 * 1024
+    # 输出文件时每次读取的字节数
+    READ_SIZE: int = 64 * 1024
+    # 列表数据转为数据块时每块行数
+    CHUNK_SIZE: int = 1000
+    # Excel 可直接写入的单元格值类型
+    CELL_TYPES: tuple[type, ...] = (str, int, float, bool, Decimal, datetime, date, time)
     
     @classmethod
     def get_excel_template(cls, header_list: list[str], selector_header_list: list[str], option_list: list[dict[str, list[str]]]) -> bytes:
@@ -80,20 +88,165 @@ class ExcelUtil:
         return excel_data
     
     @classmethod
-    def export_list2excel(cls, list_data: list[dict[str, Any]], mapping_dict: dict) -> bytes:
+    def media_type(cls, export_format: str) -> str:
+        """
+        获取导出格式对应的媒体类型。
+
+        参数:
+        - export_format (str): 导出格式(xlsx/csv/ndjson)。
+
+        返回:
+        - str: 媒体类型。
+        """
+        return cls.MEDIA_TYPES.get(export_format, cls.MEDIA_TYPES['xlsx'])
+
+    @classmethod
+    def __cell(cls, value: Any) -> Any:
+        """
+        工具方法：将值转换为 Excel 可写入的单元格值，字典与列表转为JSON字符串。
+
+        参数:
+        - value (Any): 原始值。
+
+        返回:
+        - Any: 单元格值。
+        """
+        if value is None or isinstance(value, cls.CELL_TYPES):
+            return value
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return str(value)
+
+    @classmethod
+    def __rows(cls, chunk: Iterable[dict[str, Any]], keys: list[str], convert: Callable[[dict], dict] | None) -> list[list[Any]]:
+        """
+        工具方法：将一块字典数据转换为按映射字段顺序排列的行。
+
+        参数:
+        - chunk (Iterable[dict[str, Any]]): 数据块。
+        - keys (list[str]): 字段名列表。
+        - convert (Callable[[dict], dict] | None): 行数据转换函数。
+
+        返回:
+        - list[list[Any]]: 行列表。
+        """
+        if convert:
+            chunk = (convert(item) for item in chunk)
+        return [[item.get(key) for key in keys] for item in chunk]
+
+    @classmethod
+    async def __chunks(cls, rows: Iterable[dict[str, Any]] | AsyncIterable[list[dict[str, Any]]]) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        工具方法：统一数据来源为异步数据块迭代器。
+
+        参数:
+        - rows (Iterable[dict[str, Any]] | AsyncIterable[list[dict[str, Any]]]): 字典列表或异步数据块迭代器。
+
+        返回:
+        - AsyncIterator[list[dict[str, Any]]]: 数据块迭代器。
+        """
+        if hasattr(rows, '__aiter__'):
+            async for chunk in rows:
+                yield chunk
+            return
+        chunk = []
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= cls.CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def __append_rows(cls, ws: Any, rows: Iterable[list[Any]]) -> None:
+        """
+        工具方法：向只写模式工作表追加行，逐行写出，内存占用与行数无关。
+
+        参数:
+        - ws (Any): 只写模式工作表。
+        - rows (Iterable[list[Any]]): 行数据。
+        """
+        for row in rows:
+            ws.append([cls.__cell(value) for value in row])
+
+    @classmethod
+    async def stream_export(
+        cls,
+        rows: Iterable[dict[str, Any]] | AsyncIterable[list[dict[str, Any]]],
+        mapping_dict: dict,
+        export_format: ExportFormat = 'xlsx',
+        convert: Callable[[dict], dict] | None = None
+    ) -> AsyncIterator[bytes]:
+        """
+        流式导出数据。
+
+        - xlsx: 只写模式逐块写入临时文件(超过 SPOOL_MAX_SIZE 落盘)，完成后分块输出
+        - csv/ndjson: 每块数据写出后立即输出，适合超大数据量导出
+
+        参数:
+        - rows (Iterable[dict[str, Any]] | AsyncIterable[list[dict[str, Any]]]): 字典列表或异步数据块迭代器(如 CRUDBase.stream)。
+        - mapping_dict (dict): 字段名映射字典。
+        - export_format (ExportFormat): 导出格式。
+        - convert (Callable[[dict], dict] | None): 行数据转换函数。
+
+        返回:
+        - AsyncIterator[bytes]: 文件内容字节块。
+        """
+        keys = list(mapping_dict)
+        headers = [mapping_dict[key] for key in keys]
+
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # BOM 保证 Excel 正确识别 UTF-8 编码
+            buffer.write('\ufeff')
+            writer.writerow(headers)
+            async for chunk in cls.__chunks(rows):
+                writer.writerows(cls.__rows(chunk, keys, convert))
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode('utf-8')
+            return
+
+        if export_format == 'ndjson':
+            async for chunk in cls.__chunks(rows):
+                yield b''.join(
+                    to_json(dict(zip(headers, row)), serialize_unknown=True) + b'\n'
+                    for row in cls.__rows(chunk, keys, convert)
+                )
+            return
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(headers)
+        async for chunk in cls.__chunks(rows):
+            await run_in_threadpool(cls.__append_rows, ws, cls.__rows(chunk, keys, convert))
+        with tempfile.SpooledTemporaryFile(max_size=cls.SPOOL_MAX_SIZE) as file:
+            await run_in_threadpool(wb.save, file)
+            file.seek(0)
+            while data := await run_in_threadpool(file.read, cls.READ_SIZE):
+                yield data
+
+    @classmethod
+    def export_list2excel(cls, list_data: Iterable[dict[str, Any]], mapping_dict: dict) -> bytes:
         """
         将列表数据导出为 Excel 文件。
 
         参数:
-        - list_data (list[dict[str, Any]]): 要导出的数据列表。
+        - list_data (Iterable[dict[str, Any]]): 要导出的数据列表。
         - mapping_dict (dict): 字段名映射字典。
 
         返回:
         - bytes: Excel 文件的二进制数据。
         """
-        mapping_data = cls.__mapping_list(list_data, mapping_dict)
-        df = pd.DataFrame(mapping_data)
+        keys = list(mapping_dict)
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append([mapping_dict[key] for key in keys])
+        cls.__append_rows(ws, ([item.get(key) for key in keys] for item in list_data))
         buffer = io.BytesIO()
-        df.to_excel(buffer, index=False, engine='openpyxl')
-        binary_data = buffer.getvalue()
-        return binary_data
+        wb.save(buffer)
+        return buffer.getvalue()
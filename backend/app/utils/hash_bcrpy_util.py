@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import time
+import asyncio
 import hashlib
 import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Any
 
 from passlib.context import CryptContext
@@ -11,21 +14,162 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from itsdangerous import URLSafeSerializer
 
 from app.core.logger import log
+from app.config.setting import settings
 
 
 # 密码加密配置
 PwdContext = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12  # 设置加密轮数,增加安全性
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,     # 设置加密轮数,增加安全性
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS  # 低于当前轮数的哈希在登录时自动升级
 )
 
 
+def _hash(password: str) -> str:
+    return PwdContext.hash(password)
+
+
+def _verify(plain_password: str, password_hash: str) -> bool:
+    return PwdContext.verify(plain_password, password_hash)
+
+
+def _verify_and_update(plain_password: str, password_hash: str) -> tuple[bool, str | None]:
+    return PwdContext.verify_and_update(plain_password, password_hash)
+
+
+def _timed(func, *args) -> tuple[Any, float]:
+    started = time.perf_counter()
+    return func(*args), started
+
+
 class PwdUtil:
     """
     密码工具类,提供密码加密和验证功能
+
+    bcrypt 为CPU密集运算,异步接口(*_async)将其放入有界线程/进程池执行,
+    并通过信号量限制同时排队的任务数,避免登录高峰阻塞事件循环。
     """
 
+    _executor: Executor | None = None
+    _semaphore: asyncio.Semaphore | None = None
+    _hash_cache: dict[tuple[str, int], str] = {}
+
+    # 运行指标
+    metrics: dict[str, float] = {
+        "calls": 0,
+        "queue_time_total": 0.0,
+        "queue_time_max": 0.0,
+        "run_time_total": 0.0,
+    }
+
+    @classmethod
+    def _get_executor(cls) -> Executor:
+        if cls._executor is None:
+            if settings.PASSWORD_HASH_EXECUTOR == "process":
+                cls._executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+            else:
+                cls._executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="pwd-hash")
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, func, *args) -> Any:
+        """
+        在密码运算池中执行函数并记录排队/执行耗时
+
+        参数:
+        - func (Callable): 模块级函数(进程池需可序列化)
+        - *args: 函数参数
+
+        返回:
+        - Any: 函数返回值
+        """
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+        enqueue_at = time.perf_counter()
+        async with cls._semaphore:
+            loop = asyncio.get_running_loop()
+            executor = cls._get_executor()
+            if isinstance(executor, ProcessPoolExecutor):
+                # 进程池无法回传开始时间,以提交时刻近似
+                started = time.perf_counter()
+                result = await loop.run_in_executor(executor, func, *args)
+            else:
+                result, started = await loop.run_in_executor(executor, _timed, func, *args)
+            finished = time.perf_counter()
+
+        queue_time = started - enqueue_at
+        cls.metrics["calls"] += 1
+        cls.metrics["queue_time_total"] += queue_time
+        cls.metrics["queue_time_max"] = max(cls.metrics["queue_time_max"], queue_time)
+        cls.metrics["run_time_total"] += finished - started
+        return result
+
+    @classmethod
+    async def verify_password_async(cls, plain_password: str, password_hash: str) -> bool:
+        """
+        异步校验密码是否匹配
+
+        参数:
+        - plain_password (str): 明文密码。
+        - password_hash (str): 加密后的密码哈希值。
+
+        返回:
+        - bool: 密码是否匹配。
+        """
+        return await cls._run(_verify, plain_password, password_hash)
+
+    @classmethod
+    async def verify_and_update_async(cls, plain_password: str, password_hash: str) -> tuple[bool, str | None]:
+        """
+        异步校验密码,加密参数变化时同时返回新哈希
+
+        参数:
+        - plain_password (str): 明文密码。
+        - password_hash (str): 加密后的密码哈希值。
+
+        返回:
+        - tuple[bool, str | None]: (是否匹配, 需要升级时的新哈希,否则为None)
+        """
+        return await cls._run(_verify_and_update, plain_password, password_hash)
+
+    @classmethod
+    async def set_password_hash_async(cls, password: str) -> str:
+        """
+        异步对密码进行加密
+
+        参数:
+        - password (str): 明文密码。
+
+        返回:
+        - str: 加密后的密码哈希值。
+        """
+        return await cls._run(_hash, password)
+
+    @classmethod
+    async def get_default_password_hash(cls, password: str) -> str:
+        """
+        获取默认密码的哈希(按轮数缓存),用于批量导入等大量用户共用同一初始密码的场景
+
+        参数:
+        - password (str): 默认明文密码。
+
+        返回:
+        - str: 加密后的密码哈希值。
+        """
+        key = (password, settings.PASSWORD_HASH_ROUNDS)
+        if key not in cls._hash_cache:
+            cls._hash_cache[key] = await cls.set_password_hash_async(password)
+        return cls._hash_cache[key]
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """关闭密码运算池"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+        cls._semaphore = None
+
     @classmethod
     def verify_password(cls, plain_password: str, password_hash: str) -> bool:
         """
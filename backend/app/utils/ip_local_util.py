@@ -1,24 +1,161 @@
 # -*- coding: utf-8 -*-
 
 import re
+import csv
+import mmap
+import time
+import struct
+import asyncio
+import ipaddress
 import httpx
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from redis.asyncio.client import Redis
 
 from app.core.logger import log
+from app.config.setting import settings
+from app.common.enums import RedisInitKeyConfig
+
+
+class IpRangeDatabase:
+    """
+    本地IP段数据库(只读,内存映射)
+
+    文件格式:
+    - 头部: 魔数 b'IPRG' + 记录数(uint32)
+    - 记录区: 按起始IP升序排列的 (起始IP, 结束IP, 归属地偏移, 归属地长度),均为 uint32
+    - 字符串区: UTF-8 编码的归属地文本
+
+    查询时对记录区做二分查找,无需把整库加载进内存。
+    """
+
+    MAGIC: bytes = b'IPRG'
+    HEADER = struct.Struct('<4sI')
+    RECORD = struct.Struct('<IIII')
+
+    class _StartView:
+        """记录区起始IP的只读序列视图,供 bisect 使用"""
+
+        def __init__(self, db: "IpRangeDatabase") -> None:
+            self.db = db
+
+        def __len__(self) -> int:
+            return self.db.count
+
+        def __getitem__(self, index: int) -> int:
+            return self.db.record(index)[0]
+
+    def __init__(self, path: Path) -> None:
+        """
+        打开IP段数据库文件
+
+        参数:
+        - path (Path): 数据库文件路径
+        """
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"无效的IP段数据库文件: {path}")
+        self._records_offset = self.HEADER.size
+        self._strings_offset = self._records_offset + self.count * self.RECORD.size
+        self._starts = self._StartView(self)
+
+    def record(self, index: int) -> tuple[int, int, int, int]:
+        """读取第 index 条记录"""
+        return self.RECORD.unpack_from(self._mm, self._records_offset + index * self.RECORD.size)
+
+    def lookup(self, ip: str) -> str | None:
+        """
+        查询IP归属地
+
+        参数:
+        - ip (str): IPv4地址
+
+        返回:
+        - str | None: 归属地,未收录时返回None
+        """
+        value = int(ipaddress.IPv4Address(ip))
+        index = bisect_right(self._starts, value) - 1
+        if index < 0:
+            return None
+        start, end, offset, length = self.record(index)
+        if not start <= value <= end:
+            return None
+        begin = self._strings_offset + offset
+        return self._mm[begin:begin + length].decode('utf-8')
+
+    def close(self) -> None:
+        """关闭内存映射与文件"""
+        self._mm.close()
+        self._file.close()
+
+    @classmethod
+    def build(cls, csv_path: Path, out_path: Path) -> int:
+        """
+        由CSV(起始IP,结束IP,归属地)生成数据库文件
+
+        参数:
+        - csv_path (Path): CSV文件路径
+        - out_path (Path): 输出文件路径
+
+        返回:
+        - int: 写入的记录数
+        """
+        ranges: list[tuple[int, int, str]] = []
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if len(row) < 3 or row[0].startswith('#'):
+                    continue
+                ranges.append((int(ipaddress.IPv4Address(row[0].strip())), int(ipaddress.IPv4Address(row[1].strip())), row[2].strip()))
+        ranges.sort()
+
+        strings: dict[str, tuple[int, int]] = {}
+        string_area = bytearray()
+        records = bytearray()
+        for start, end, location in ranges:
+            if location not in strings:
+                encoded = location.encode('utf-8')
+                strings[location] = (len(string_area), len(encoded))
+                string_area += encoded
+            records += cls.RECORD.pack(start, end, *strings[location])
+
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(ranges)))
+            f.write(records)
+            f.write(string_area)
+        return len(ranges)
 
 
 class IpLocalUtil:
     """
     获取IP归属地工具类
+
+    解析顺序: 进程内LRU+TTL缓存 -> Redis缓存 -> 本地IP段数据库 -> 远程接口。
+    远程接口默认在后台异步补全缓存,不阻塞当前请求。
+    远程接口均失败时以"未知"缓存 IP_LOCATION_NEGATIVE_CACHE_TTL 秒,避免同一IP反复请求远程接口。
     """
-    
+
+    UNKNOWN: str = "未知"
+    PRIVATE: str = "内网IP"
+
+    _cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+    _database: IpRangeDatabase | None = None
+    _database_loaded: bool = False
+    _client: httpx.AsyncClient | None = None
+    _pending: dict[str, asyncio.Task] = {}
+
     @classmethod
     def is_valid_ip(cls, ip: str) -> bool:
         """
         校验IP格式是否合法。
-        
+
         参数:
         - ip (str): IP地址。
-        
+
         返回:
         - bool: 是否合法。
         """
@@ -29,10 +166,10 @@ class IpLocalUtil:
     def is_private_ip(cls, ip: str) -> bool:
         """
         判断是否为内网IP。
-        
+
         参数:
         - ip (str): IP地址。
-        
+
         返回:
         - bool: 是否为内网IP。
         """
@@ -40,63 +177,167 @@ class IpLocalUtil:
         return bool(re.match(priv_pattern, ip))
 
     @classmethod
-    async def get_ip_location(cls, ip: str) -> str | None:
+    async def get_ip_location(cls, ip: str, redis: Redis | None = None, wait_remote: bool = False) -> str | None:
         """
         获取IP归属地信息。
-        
+
         参数:
         - ip (str): IP地址。
-        
+        - redis (Redis | None): Redis客户端,提供时启用二级缓存。
+        - wait_remote (bool): 本地未命中时是否等待远程接口,默认仅在后台补全。
+
         返回:
-        - str | None: IP归属地信息，失败时返回"未知"或None。
+        - str | None: IP归属地信息，失败时返回"未知"。
         """
         # 校验IP格式
-        if not cls.is_valid_ip(ip):
+        if not ip or not cls.is_valid_ip(ip):
             log.error(f"IP格式不合法: {ip}")
-            return "未知"
-        
+            return cls.UNKNOWN
+
         # 内网IP直接返回
         if cls.is_private_ip(ip):
-            return '内网IP'
-            
+            return cls.PRIVATE
+
+        location = cls._cache_get(ip)
+        if location is not None:
+            return location
+
+        if redis is not None:
+            try:
+                location = await redis.get(cls._redis_key(ip))
+            except Exception as e:
+                log.error(f"读取IP归属地缓存失败: {e}")
+            if location:
+                cls._cache_set(ip, location)
+                return location
+
+        location = cls._local_lookup(ip)
+        if location:
+            await cls._store(ip, location, redis)
+            return location
+
+        if not settings.IP_LOCATION_REMOTE_ENABLE:
+            return cls.UNKNOWN
+
+        task = cls._pending.get(ip)
+        if task is None:
+            task = asyncio.create_task(cls._remote_enrich(ip, redis))
+            cls._pending[ip] = task
+            task.add_done_callback(lambda _: cls._pending.pop(ip, None))
+        if wait_remote:
+            return await asyncio.shield(task) or cls.UNKNOWN
+        return cls.UNKNOWN
+
+    @classmethod
+    async def close(cls) -> None:
+        """关闭远程请求客户端与本地数据库"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+        if cls._database is not None:
+            cls._database.close()
+            cls._database = None
+            cls._database_loaded = False
+
+    @classmethod
+    def _redis_key(cls, ip: str) -> str:
+        return f'{RedisInitKeyConfig.IP_LOCATION.key}:{ip}'
+
+    @classmethod
+    def _cache_get(cls, ip: str) -> str | None:
+        item = cls._cache.get(ip)
+        if item is None:
+            return None
+        expire_at, location = item
+        if expire_at < time.monotonic():
+            cls._cache.pop(ip, None)
+            return None
+        cls._cache.move_to_end(ip)
+        return location
+
+    @classmethod
+    def _cache_set(cls, ip: str, location: str, ttl: int | None = None) -> None:
+        cls._cache[ip] = (time.monotonic() + (ttl or settings.IP_LOCATION_CACHE_TTL), location)
+        cls._cache.move_to_end(ip)
+        while len(cls._cache) > settings.IP_LOCATION_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+
+    @classmethod
+    async def _store(cls, ip: str, location: str, redis: Redis | None, ttl: int | None = None) -> None:
+        ttl = ttl or settings.IP_LOCATION_CACHE_TTL
+        cls._cache_set(ip, location, ttl)
+        if redis is None:
+            return
         try:
-            # 使用ip-api.com API获取IP归属地信息
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # 尝试使用 ip9.com.cn API
-                url = f'https://ip9.com.cn/get?ip={ip}'
-                response = await cls._make_api_request(client, url)
-                if response and response.json().get('ret') == 200:
-                    result = response.json().get('data', {})
-                    return f"{result.get('country','')}-{result.get('prov','')}-{result.get('city','')}-{result.get('area','')}-{result.get('isp','')}"
+            await redis.set(cls._redis_key(ip), location, ex=ttl)
+        except Exception as e:
+            log.error(f"写入IP归属地缓存失败: {e}")
 
+    @classmethod
+    def _local_lookup(cls, ip: str) -> str | None:
+        """查询本地IP段数据库,文件不存在时跳过"""
+        if not cls._database_loaded:
+            cls._database_loaded = True
+            path = Path(settings.IP_LOCATION_DB_PATH)
+            if path.exists():
+                try:
+                    cls._database = IpRangeDatabase(path)
+                except Exception as e:
+                    log.error(f"加载本地IP段数据库失败: {e}")
+        if cls._database is None:
+            return None
+        try:
+            return cls._database.lookup(ip)
+        except Exception as e:
+            log.error(f"查询本地IP段数据库失败: {e}")
+            return None
+
+    @classmethod
+    async def _remote_enrich(cls, ip: str, redis: Redis | None) -> str | None:
+        """调用远程接口获取归属地并写入缓存"""
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(timeout=settings.IP_LOCATION_REMOTE_TIMEOUT)
+        location = None
+        try:
+            # 尝试使用 ip9.com.cn API
+            url = f'https://ip9.com.cn/get?ip={ip}'
+            response = await cls._make_api_request(cls._client, url)
+            if response and response.json().get('ret') == 200:
+                result = response.json().get('data', {})
+                location = f"{result.get('country','')}-{result.get('prov','')}-{result.get('city','')}-{result.get('area','')}-{result.get('isp','')}"
+
+            if location is None:
                 # 尝试使用百度 API
                 url = f'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={ip}'
-                response = await cls._make_api_request(client, url)
+                response = await cls._make_api_request(cls._client, url)
                 if response and response.json().get('code') == "Success":
                     data = response.json().get('data', {})
-                    # 修正原代码中的格式错误
-                    return f"{data.get('country','')}-{data.get('prov','')}-{data.get('city','')}-{data.get('district','')}-{data.get('isp','')}"
-
+                    location = f"{data.get('country','')}-{data.get('prov','')}-{data.get('city','')}-{data.get('district','')}-{data.get('isp','')}"
         except Exception as e:
             log.error(f"获取IP归属地失败: {e}")
-            return "未知"
+
+        if location:
+            await cls._store(ip, location, redis)
+        else:
+            await cls._store(ip, cls.UNKNOWN, redis, ttl=settings.IP_LOCATION_NEGATIVE_CACHE_TTL)
+        return location
 
     @classmethod
     async def _make_api_request(cls, client, url):
         """
-        单独的 API 请求方法，包含重试机制。
-        
+        单独的 API 请求方法，失败时重试一次。
+
         参数:
         - client (AsyncClient): httpx 异步客户端。
         - url (str): 请求 URL。
-        
+
         返回:
         - Response | None: 响应对象，失败时返回None。
         """
-        max_retries = 3
+        max_retries = 2
         for attempt in range(max_retries):
             try:
-                response = await client.get(url, timeout=10)
+                response = await client.get(url)
                 if response.status_code == 200:
                     return response
             except Exception as e:
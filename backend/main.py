@@ -28,8 +28,9 @@ def create_app() -> FastAPI:
         lifespan
     )
     from app.config.setting import settings
+    from app.common.response import FastJSONResponse
     # 创建FastAPI应用
-    app = FastAPI(**settings.FASTAPI_CONFIG, lifespan=lifespan)
+    app = FastAPI(**settings.FASTAPI_CONFIG, default_response_class=FastJSONResponse, lifespan=lifespan)
     
     from app.core.logger import setup_logging
     # 初始化日志
@@ -0,0 +1,101 @@
+"""
+JSON序列化基准测试: 对比 1000 行分页结果的原序列化路径与 FastJSONResponse 的耗时。
+
+- 原路径: 每行 model_validate().model_dump() -> ResponseSchema.model_dump(mode='json') -> json.dumps
+- 新路径: 每行 model_validate().model_dump() -> ResponseSchema -> pydantic-core to_json
+
+不依赖数据库，在 backend 目录下运行:
+
+    python -m tests.benchmark_json --rows 1000 --rounds 200
+"""
+
+import json
+import time
+import argparse
+import statistics
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+
+from app.common.response import ResponseSchema, SuccessResponse
+from app.api.v1.module_system.log.schema import OperationLogOutSchema
+
+
+def build_rows(count: int) -> list[SimpleNamespace]:
+    """构造与 ORM 对象属性一致的操作日志行"""
+    now = datetime.now()
+    creator = SimpleNamespace(id=1, name="管理员", username="admin")
+    return [
+        SimpleNamespace(
+            id=i,
+            uuid=f"00000000-0000-0000-0000-{i:012d}",
+            status="0",
+            description=None,
+            created_time=now - timedelta(seconds=i),
+            updated_time=now,
+            type=2,
+            request_path="/api/v1/system/user/list",
+            request_method="GET",
+            request_payload=json.dumps({"page_no": 1, "page_size": 10}),
+            request_ip="127.0.0.1",
+            login_location="内网IP",
+            request_os="Linux",
+            request_browser="Chrome",
+            response_code=200,
+            response_json=json.dumps({"code": 0, "msg": "成功"}, ensure_ascii=False),
+            process_time="0.0123",
+            created_id=1,
+            created_by=creator,
+            updated_id=1,
+            updated_by=creator,
+        )
+        for i in range(count)
+    ]
+
+
+def page_result(items: list) -> dict:
+    return {"page_no": 1, "page_size": len(items), "total": len(items), "has_next": False,
+            "next_cursor": None, "count_mode": "exact", "items": items}
+
+
+def old_path(rows: list) -> bytes:
+    data = page_result([OperationLogOutSchema.model_validate(row).model_dump() for row in rows])
+    content = ResponseSchema(data=data).model_dump(mode='json')
+    return JSONResponse(content=content).body
+
+
+def new_path(rows: list) -> bytes:
+    data = page_result([OperationLogOutSchema.model_validate(row).model_dump() for row in rows])
+    return SuccessResponse(data=data).body
+
+
+def measure(fn, rows: list, rounds: int) -> list[float]:
+    for _ in range(min(20, rounds)):
+        fn(rows)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON序列化基准测试")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    assert json.loads(old_path(rows)) == json.loads(new_path(rows)), "两种序列化结果不一致"
+
+    print(f"{'路径':<12}{'p50(ms)':>10}{'p99(ms)':>10}{'字节数':>10}")
+    for name, fn in (("原路径", old_path), ("FastJSON", new_path)):
+        timings = sorted(measure(fn, rows, args.rounds))
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        print(f"{name:<12}{statistics.median(timings):>10.2f}{p99:>10.2f}{len(fn(rows)):>10}")
+
+
+if __name__ == "__main__":
+    main()
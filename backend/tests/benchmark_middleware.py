@@ -0,0 +1,107 @@
+"""
+请求日志中间件基准测试: 对比 BaseHTTPMiddleware 实现与纯ASGI实现的吞吐量(RPS)与 p99 延迟。
+
+需要可用的 Redis(读取 settings.REDIS_URI)，在 backend 目录下运行:
+
+    python -m tests.benchmark_middleware --requests 5000 --concurrency 50
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from redis.asyncio.client import Redis
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config.setting import settings
+from app.core.logger import log
+from app.core.config_cache import SystemConfigCache
+from app.core.middlewares import RequestLogMiddleware
+
+
+class BaseHTTPRequestLogMiddleware(BaseHTTPMiddleware):
+    """改造前的实现结构: BaseHTTPMiddleware 包装请求与响应，拦截判断逻辑与纯ASGI版本相同"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.perf_counter()
+        log.info([f"请求方法: {request.method}", f"请求路径: {request.url.path}"])
+        x_forwarded_for = request.headers.get('X-Forwarded-For')
+        request_ip = x_forwarded_for.split(',')[0].strip() if x_forwarded_for else (request.client.host if request.client else None)
+        await RequestLogMiddleware._check_block(request.scope, request.method, request.url.path, request_ip)
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(round(time.perf_counter() - start_time, 5))
+        log.info(f"响应状态: {response.status_code}")
+        return response
+
+
+def build_app(middleware: type | None, redis: Redis) -> FastAPI:
+    app = FastAPI()
+    app.state.redis = redis
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    @app.get("/json")
+    async def json_endpoint() -> dict:
+        return {"msg": "ok", "items": list(range(50))}
+
+    @app.get("/stream")
+    async def stream_endpoint() -> StreamingResponse:
+        async def chunks():
+            for i in range(20):
+                yield f"chunk-{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+async def run(app: FastAPI, path: str, total: int, concurrency: int) -> tuple[float, float, float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        # 预热
+        await asyncio.gather(*(one() for _ in range(min(200, total))))
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return total / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="请求日志中间件基准测试")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    redis = await Redis.from_url(settings.REDIS_URI, decode_responses=True)
+    await SystemConfigCache.reload(redis)
+    stacks = {
+        "无中间件": None,
+        "BaseHTTPMiddleware": BaseHTTPRequestLogMiddleware,
+        "纯ASGI": RequestLogMiddleware,
+    }
+    print(f"{'接口':<8}{'中间件':<20}{'RPS':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for path in ("/json", "/stream"):
+        for name, middleware in stacks.items():
+            rps, p50, p99 = await run(build_app(middleware, redis), path, args.requests, args.concurrency)
+            print(f"{path:<8}{name:<20}{rps:>10.0f}{p50:>10.2f}{p99:>10.2f}")
+    await redis.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+树形结构构造基准测试: 对比原 traversal_to_tree / recursive_to_tree 与 build_tree 在 1万、10万节点上的耗时。
+
+- 均衡树: 每个节点最多 10 个子节点
+- 宽树: 少量根节点，每个根节点下挂大量叶子(原实现的兄弟列表去重扫描为平方复杂度)
+- ORM行: 每节点 model_validate().model_dump() 后构造，与直接读取ORM对象字段构造对比
+
+原实现在节点数超过 --legacy-limit 时跳过。不依赖数据库，在 backend 目录下运行:
+
+    python -m tests.benchmark_tree --sizes 10000 100000 --rounds 5
+"""
+
+import time
+import argparse
+import statistics
+from types import SimpleNamespace
+from datetime import datetime
+
+from app.utils.common_util import build_tree
+from app.api.v1.module_system.menu.schema import MenuOutSchema
+
+
+def legacy_traversal_to_tree(nodes: list[dict]) -> list[dict]:
+    """改造前的 traversal_to_tree"""
+    tree: list[dict] = []
+    node_dict = {node['id']: node for node in nodes}
+    for node in nodes:
+        if 'children' not in node:
+            node['children'] = None
+        parent_id = node['parent_id']
+        if parent_id is None:
+            tree.append(node)
+        else:
+            parent_node = node_dict.get(parent_id)
+            if parent_node is not None:
+                if 'children' not in parent_node or parent_node['children'] is None:
+                    parent_node['children'] = []
+                if node not in parent_node['children']:
+                    parent_node['children'].append(node)
+            else:
+                if node not in tree:
+                    tree.append(node)
+    return tree
+
+
+def legacy_recursive_to_tree(nodes: list[dict], *, parent_id: int | None = None) -> list[dict]:
+    """改造前的 recursive_to_tree"""
+    tree: list[dict] = []
+    for node in nodes:
+        if node['parent_id'] == parent_id:
+            child_nodes = legacy_recursive_to_tree(nodes, parent_id=node['id'])
+            if child_nodes:
+                node['children'] = child_nodes
+            tree.append(node)
+    return tree
+
+
+def menu_row(i: int, parent_id: int | None, now: datetime) -> SimpleNamespace:
+    """构造与菜单ORM对象属性一致的节点"""
+    return SimpleNamespace(
+        id=i, uuid=f"00000000-0000-0000-0000-{i:012d}", status="0", description=None,
+        created_time=now, updated_time=now,
+        name=f"menu{i}", type=2, order=i % 100 + 1, permission=f"module:menu{i}:query", icon="menu",
+        route_name=f"Menu{i}", route_path=f"/menu{i}", component_path=f"module/menu{i}/index",
+        redirect=None, hidden=False, keep_alive=True, always_show=False, title=f"菜单{i}",
+        params=None, affix=False, parent_id=parent_id, parent_name=None,
+    )
+
+
+def build_rows(count: int, shape: str) -> list[SimpleNamespace]:
+    now = datetime.now()
+    if shape == "wide":
+        roots = max(count // 10000, 1)
+        parent = lambda i: None if i <= roots else (i % roots) + 1
+    else:
+        parent = lambda i: None if i <= 10 else (i - 1) // 10
+    return [menu_row(i, parent(i), now) for i in range(1, count + 1)]
+
+
+def measure(fn, make_input, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        data = make_input()
+        started = time.perf_counter()
+        fn(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="树形结构构造基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--legacy-limit", type=int, default=20000)
+    args = parser.parse_args()
+
+    fields = tuple(MenuOutSchema.model_fields)
+    print(f"{'节点数':>8}  {'形状':<6}{'实现':<32}{'p50(ms)':>12}")
+    for size in args.sizes:
+        for shape in ("balanced", "wide"):
+            rows = build_rows(size, shape)
+            dicts = lambda: [{field: getattr(row, field) for field in fields} for row in rows]
+            cases = [
+                ("build_tree(字典)", build_tree, dicts),
+                ("build_tree(ORM行+fields)", lambda data: build_tree(data, fields=fields), lambda: rows),
+                ("model_dump + build_tree", lambda data: build_tree(
+                    [MenuOutSchema.model_validate(row).model_dump() for row in data]), lambda: rows),
+            ]
+            if size <= args.legacy_limit:
+                cases.insert(0, ("原 traversal_to_tree", legacy_traversal_to_tree, dicts))
+                if shape == "balanced":
+                    cases.insert(1, ("原 recursive_to_tree", legacy_recursive_to_tree, dicts))
+            for name, fn, make_input in cases:
+                print(f"{size:>8}  {shape:<6}{name:<32}{measure(fn, make_input, args.rounds):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
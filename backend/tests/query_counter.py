@@ -0,0 +1,49 @@
+"""
+SQL语句计数器，用于测试中约束接口的查询次数，防止关系预加载回退为级联查询。
+
+用法:
+
+    with QueryCounter() as counter:
+        client.get("/system/user/page")
+    assert counter.count <= 11, counter.statements
+"""
+
+import re
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database import async_engine
+
+
+class QueryCounter:
+    """监听引擎执行的SQL语句并计数"""
+
+    def __init__(self, bind: Engine | AsyncEngine | None = None, ignore_tables: tuple[str, ...] = ("sys_log",)) -> None:
+        """
+        初始化计数器
+
+        参数:
+        - bind (Engine | AsyncEngine | None): 监听的数据库引擎，默认为异步引擎
+        - ignore_tables (tuple[str, ...]): 不计数的表，默认忽略后台批量写入的操作日志
+        """
+        bind = bind or async_engine
+        self.engine: Engine = bind.sync_engine if isinstance(bind, AsyncEngine) else bind
+        self.ignore = re.compile(r"\b(%s)\b" % "|".join(map(re.escape, ignore_tables))) if ignore_tables else None
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        """已执行的SQL语句数量"""
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.ignore is None or not self.ignore.search(statement):
+            self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
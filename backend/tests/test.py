@@ -6,9 +6,16 @@
 这让你可以直接使用 pytest 而不会遇到麻烦。
 """
 
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
 
 from main import create_app
+from app.config.setting import settings
+from app.core.validator import datetime_str
+from app.utils.common_util import build_tree, collect_tree_ids
+from tests.query_counter import QueryCounter
 
 app = create_app()
 
@@ -20,3 +27,249 @@ def test_check_health():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"msg": "Healthy"}
+
+
+def test_check_health_query_budget():
+    # 接口查询次数预算: 超出即说明出现了关系级联加载等回退
+    with QueryCounter() as counter:
+        response = client.get("/")
+    assert response.status_code == 200
+    assert counter.count == 0, counter.statements
+
+
+# ORM接口查询次数预算(权限快照、菜单树缓存已预热)，按各接口的语句逐条计数:
+# - 分页: 总数 1 + 数据 1 + profile="list" 的 9 个 selectin(dept, positions, created_by, updated_by,
+#   roles, roles.menus, roles.depts, roles.created_by, roles.updated_by)
+# - 详情/当前用户: 数据 1 + profile="detail" 的 9 个 selectin
+# selectin 按关系而非按行查询，预算与每个关系的行数无关；级联加载或逐行查询的回退会超出预算
+USER_PAGE_QUERY_BUDGET = 11
+USER_DETAIL_QUERY_BUDGET = 10
+CURRENT_USER_INFO_QUERY_BUDGET = 10
+
+
+def login(test_client: TestClient, username: str, password: str) -> TestClient:
+    # 以文档来源登录跳过验证码，并预热权限快照与菜单树缓存
+    response = test_client.post(
+        "/system/auth/login",
+        data={"username": username, "password": password},
+        headers={"referer": f"http://testserver{settings.DOCS_URL}"},
+    )
+    assert response.status_code == 200, response.text
+    test_client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    response = test_client.get("/system/user/current/info")
+    assert response.status_code == 200, response.text
+    return test_client
+
+
+def flatten(tree: list[dict]) -> list[dict]:
+    nodes = []
+    for node in tree:
+        nodes.append(node)
+        nodes.extend(flatten(node.get("children") or []))
+    return nodes
+
+
+@pytest.fixture(scope="module")
+def auth_client():
+    # 进入上下文以执行 lifespan(初始化Redis等)
+    with TestClient(app) as test_client:
+        yield login(test_client, "admin", "123456")
+
+
+@pytest.fixture(scope="module")
+def scoped_client(auth_client):
+    # 非超级管理员: 两个角色(自定义数据权限，各关联多个菜单与部门)、两个岗位
+    suffix = datetime.now().strftime("%H%M%S%f")
+    depts = flatten(auth_client.get("/system/dept/tree").json()["data"])
+    menus = flatten(auth_client.get("/system/menu/tree").json()["data"])
+    assert len(depts) >= 2 and menus
+    by_id = {menu["id"]: menu for menu in menus}
+    menu_ids = set()
+    for menu in menus:
+        if (menu.get("permission") or "").startswith("module_system:user:"):
+            # 连同上级目录/菜单一起授权，使菜单树包含多个节点
+            while menu and menu["id"] not in menu_ids:
+                menu_ids.add(menu["id"])
+                menu = by_id.get(menu.get("parent_id"))
+    dept_ids = [dept["id"] for dept in depts[:2]]
+
+    role_ids = []
+    for i in range(2):
+        response = auth_client.post("/system/role/create", json={"name": f"budget{suffix}{i}", "code": f"budget{suffix}{i}"})
+        assert response.status_code == 200, response.text
+        role_ids.append(response.json()["data"]["id"])
+    response = auth_client.patch(
+        "/system/role/permission/setting",
+        json={"data_scope": 5, "role_ids": role_ids, "menu_ids": sorted(menu_ids), "dept_ids": dept_ids},
+    )
+    assert response.status_code == 200, response.text
+
+    position_ids = []
+    for i in range(2):
+        response = auth_client.post("/system/position/create", json={"name": f"budget{suffix}{i}"})
+        assert response.status_code == 200, response.text
+        position_ids.append(response.json()["data"]["id"])
+
+    username, password = f"budget{suffix}", "Budget123456"
+    response = auth_client.post("/system/user/create", json={
+        "username": username,
+        "password": password,
+        "name": username,
+        "dept_id": dept_ids[0],
+        "role_ids": role_ids,
+        "position_ids": position_ids,
+    })
+    assert response.status_code == 200, response.text
+    user_id = response.json()["data"]["id"]
+
+    try:
+        yield login(TestClient(app), username, password), user_id
+    finally:
+        auth_client.request("DELETE", "/system/user/delete", json=[user_id])
+        auth_client.request("DELETE", "/system/role/delete", json=role_ids)
+        auth_client.request("DELETE", "/system/position/delete", json=position_ids)
+
+
+def test_user_page_query_budget(auth_client):
+    with QueryCounter() as counter:
+        response = auth_client.get("/system/user/page", params={"page_no": 1, "page_size": 10})
+    assert response.status_code == 200, response.text
+    assert counter.count <= USER_PAGE_QUERY_BUDGET, counter.statements
+
+
+def test_user_detail_query_budget(auth_client):
+    with QueryCounter() as counter:
+        response = auth_client.get("/system/user/detail/1")
+    assert response.status_code == 200, response.text
+    assert counter.count <= USER_DETAIL_QUERY_BUDGET, counter.statements
+
+
+def test_current_user_info_query_budget(auth_client):
+    with QueryCounter() as counter:
+        response = auth_client.get("/system/user/current/info")
+    assert response.status_code == 200, response.text
+    assert counter.count <= CURRENT_USER_INFO_QUERY_BUDGET, counter.statements
+
+
+def test_scoped_user_page_query_budget(scoped_client):
+    client, user_id = scoped_client
+    with QueryCounter() as counter:
+        response = client.get("/system/user/page", params={"page_no": 1, "page_size": 10})
+    assert response.status_code == 200, response.text
+    assert user_id in [item["id"] for item in response.json()["data"]["items"]]
+    assert counter.count <= USER_PAGE_QUERY_BUDGET, counter.statements
+
+
+def test_scoped_user_detail_query_budget(scoped_client):
+    client, user_id = scoped_client
+    with QueryCounter() as counter:
+        response = client.get(f"/system/user/detail/{user_id}")
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert len(data["roles"]) == 2 and len(data["positions"]) == 2
+    assert all(len(role["menus"]) > 1 and len(role["depts"]) == 2 for role in data["roles"])
+    assert counter.count <= USER_DETAIL_QUERY_BUDGET, counter.statements
+
+
+def test_scoped_current_user_info_query_budget(scoped_client):
+    client, _ = scoped_client
+    with QueryCounter() as counter:
+        response = client.get("/system/user/current/info")
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["menus"]
+    assert counter.count <= CURRENT_USER_INFO_QUERY_BUDGET, counter.statements
+
+
+def tree_ids(tree: list[dict]) -> list:
+    # 先序遍历节点ID，便于断言树的形状
+    ids = []
+    for node in tree:
+        ids.append(node["id"])
+        ids.extend(tree_ids(node["children"] or []))
+    return ids
+
+
+def test_build_tree_orphan_becomes_root():
+    nodes = [
+        {"id": 1, "parent_id": None},
+        {"id": 2, "parent_id": 1},
+        {"id": 3, "parent_id": 99},
+        {"id": 4, "parent_id": 3},
+    ]
+    tree = build_tree(nodes)
+    assert [node["id"] for node in tree] == [1, 3]
+    assert tree_ids(tree) == [1, 2, 3, 4]
+    assert tree[0]["children"][0]["children"] is None
+
+
+def test_build_tree_breaks_cycles():
+    nodes = [
+        {"id": 1, "parent_id": None},
+        {"id": 2, "parent_id": 3},
+        {"id": 3, "parent_id": 2},
+        {"id": 4, "parent_id": 3},
+    ]
+    tree = build_tree(nodes)
+    # 环路上的节点各出现一次，且在断开处作为根节点
+    assert sorted(tree_ids(tree)) == [1, 2, 3, 4]
+    assert len(tree) == 2
+    assert tree[0]["id"] == 1
+
+
+def test_build_tree_keeps_first_duplicate():
+    nodes = [
+        {"id": 1, "parent_id": None, "name": "first"},
+        {"id": 1, "parent_id": None, "name": "second"},
+        {"id": 2, "parent_id": 1, "name": "child"},
+    ]
+    tree = build_tree(nodes)
+    assert len(tree) == 1
+    assert tree[0]["name"] == "first"
+    assert [child["id"] for child in tree[0]["children"]] == [2]
+
+
+def test_build_tree_formats_fields():
+    now = datetime(2024, 1, 2, 3, 4, 5)
+    rows = [SimpleNamespace(id=1, parent_id=None, created_time=now, updated_time=None)]
+    tree = build_tree(
+        rows,
+        fields=("id", "parent_id", "created_time", "updated_time"),
+        formatters={"created_time": datetime_str, "updated_time": datetime_str},
+    )
+    assert tree[0]["created_time"] == "2024-01-02 03:04:05"
+    assert tree[0]["updated_time"] is None
+
+
+def test_collect_tree_ids_directions():
+    parent_map = {1: None, 2: 1, 3: 2, 4: 1, 5: None}
+    assert collect_tree_ids([2], parent_map, direction="descendants") == [2, 3]
+    assert collect_tree_ids([3], parent_map, direction="ancestors") == [3, 2, 1]
+    assert collect_tree_ids([1, 99], parent_map) == [1, 2, 4, 3]
+
+
+def test_dept_disable_cascades_to_descendants(auth_client):
+    # 禁用只级联下级部门，不再连带禁用上级；启用级联启用全部上级
+    suffix = datetime.now().strftime("%H%M%S%f")
+    ids = []
+    parent_id = None
+    for level in range(3):
+        response = auth_client.post("/system/dept/create", json={"name": f"cascade{suffix}{level}", "parent_id": parent_id})
+        assert response.status_code == 200, response.text
+        parent_id = response.json()["data"]["id"]
+        ids.append(parent_id)
+    root_id, middle_id, leaf_id = ids
+
+    def status_of(dept_id: int) -> str:
+        return auth_client.get(f"/system/dept/detail/{dept_id}").json()["data"]["status"]
+
+    try:
+        response = auth_client.patch("/system/dept/available/setting", json={"ids": [middle_id], "status": "1"})
+        assert response.status_code == 200, response.text
+        assert [status_of(dept_id) for dept_id in ids] == ["0", "1", "1"]
+
+        response = auth_client.patch("/system/dept/available/setting", json={"ids": [leaf_id], "status": "0"})
+        assert response.status_code == 200, response.text
+        assert [status_of(dept_id) for dept_id in ids] == ["0", "0", "0"]
+    finally:
+        for dept_id in reversed(ids):
+            auth_client.request("DELETE", "/system/dept/delete", json=[dept_id])